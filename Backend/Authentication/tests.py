@@ -1,7 +1,11 @@
+import asyncio
+from channels.layers import get_channel_layer
 from django.test import TestCase
 from django.test.client import Client
 from django.contrib.auth.models import User
 from django.urls import reverse
+from Backend.Authentication.views import RegisterView, LoginView, LogoutView
+from Backend.MessageTranslator.groups import LOBBY_GROUP
 # Create your tests here.
 class RegisterViewTest(TestCase):
 
@@ -98,6 +102,25 @@ class LoginViewTest(TestCase):
         self.assertEqual(response.status_code, 403)
         self.assertEqual(error_message, 'Invalid credentials')
 
+    async def test_login_is_announced_to_the_lobby(self):
+        channel_layer = get_channel_layer()
+        channel = await channel_layer.new_channel()
+        await channel_layer.group_add(LOBBY_GROUP, channel)
+
+        response = await self.async_client.post(self.login_url, data={
+            'username': 'testuser',
+            'password': 'password12345',
+        })
+        self.assertEqual(response.status_code, 200)
+
+        event = await asyncio.wait_for(channel_layer.receive(channel), timeout=1)
+        self.assertEqual(event['text'], '{"message": "testuser has logged in."}')
+        await channel_layer.group_discard(LOBBY_GROUP, channel)
+
+    def test_views_are_async(self):
+        for view in (RegisterView, LoginView, LogoutView):
+            self.assertTrue(view.view_is_async, view.__name__)
+
 
 class LogoutViewTest(TestCase):
     def setUp(self):
@@ -1,10 +1,11 @@
 # backend/authentication/views.py
-from django.contrib.auth import authenticate, login, logout
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate, alogin, alogout
 from django.contrib.auth.forms import UserCreationForm
 from django.http import JsonResponse
 from django.views import View
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from Backend.MessageTranslator.broadcast import broadcast_later
+from Backend.MessageTranslator.groups import LOBBY_GROUP
 from django.views.decorators.csrf import csrf_protect
 from django.middleware.csrf import get_token
 
@@ -21,7 +22,7 @@ class RegisterView(View):
         get(request): Returns a CSRF token for secure form submissions.
     """
 
-    def post(self, request) -> JsonResponse:
+    async def post(self, request) -> JsonResponse:
         """
         Handle user registration via POST request.
 
@@ -33,15 +34,23 @@ class RegisterView(View):
         """
         form = UserCreationForm(request.POST)  # Create a form instance with POST data
 
-        if form.is_valid():
-            user = form.save()  # Save the new user
+        # Forms have no async API, so validate and save in one trip to a worker thread
+        if await sync_to_async(self.register)(form):
             return JsonResponse({'message': 'User created successfully'}, status=201)
 
         # If the form is not valid display and return errors
         print(f"Errors: {form.errors}")  # Debug message
         return JsonResponse({'errors': form.errors}, status=400)
 
-    def get(self, request) -> JsonResponse:
+    @staticmethod
+    def register(form: UserCreationForm) -> bool:
+        """Save the new user if the form is valid, and return whether it was."""
+        if not form.is_valid():
+            return False
+        form.save()  # Save the new user
+        return True
+
+    async def get(self, request) -> JsonResponse:
         """
         Return a CSRF token for secure form submissions.
 
@@ -65,7 +74,7 @@ class LoginView(View):
         post(request): Handles user login via POST request.
     """
 
-    def post(self, request) -> JsonResponse:
+    async def post(self, request) -> JsonResponse:
         """
         Handle user login via POST request.
 
@@ -80,20 +89,13 @@ class LoginView(View):
         password = request.POST.get('password')
 
           # Authenticate user
-        user = authenticate(request, username=username, password=password)
+        user = await aauthenticate(request, username=username, password=password)
 
         if user is not None:
-            login(request, user)  # Log user in
-
-            # Notify all clients of the new login
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                "notifications",
-                {
-                    'type': 'notify',
-                    'message': f"{user.username} has logged in.",
-                }
-            )
+            await alogin(request, user)  # Log user in
+
+            # Notify all clients of the new login, without holding up the response
+            broadcast_later(LOBBY_GROUP, f"{user.username} has logged in.")
 
             return JsonResponse({'message': 'Logged in successfully'}, status=200)
 
@@ -111,7 +113,7 @@ class LogoutView(View):
         post(request): Handles user logout via POST request.
     """
 
-    def post(self, request) -> JsonResponse:
+    async def post(self, request) -> JsonResponse:
         """
         Handle user logout via POST request.
 
@@ -122,5 +124,5 @@ class LogoutView(View):
             JsonResponse: A JSON response indicating successful logout.
         """
 
-        logout(request)  # Log the user out
+        await alogout(request)  # Log the user out
         return JsonResponse({'message': 'Logged out successfully'}, status=200)  # Return success message
\ No newline at end of file
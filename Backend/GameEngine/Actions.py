@@ -0,0 +1,155 @@
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+from Backend.cardGroupings.Card import Card
+from Backend.GameEngine.player import Player
+
+if TYPE_CHECKING:
+    from Backend.GameEngine.engine import GameState
+    from Backend.GameEngine.player_turn import Player_Turn
+
+
+class Actions(ABC):
+    """
+    Base class of the actions a player can take on their turn.
+
+    validate() raises ValueError with the reason an action is not allowed, and
+    perform_action() applies a validated action to the game and returns its result.
+    """
+    p: Player
+    pt: "Player_Turn"
+    all_characters = frozenset(Card.VALID_SUSPECTS)
+    all_weapons = frozenset(Card.VALID_WEAPONS)
+    all_rooms = frozenset(Card.VALID_ROOMS)
+
+    def __init__(self, player: Player, playerTurn: "Player_Turn"):
+        self.p = player
+        self.pt = playerTurn
+
+    @abstractmethod
+    def validate(self, game: "GameState") -> None:
+        pass
+
+    @abstractmethod
+    def perform_action(self, game: "GameState") -> dict:
+        pass
+
+    def _validate_cards(self, suspect: str, weapon: str, room: str) -> None:
+        if suspect not in self.all_characters:
+            raise ValueError(f"{suspect} is not a valid suspect.")
+        if weapon not in self.all_weapons:
+            raise ValueError(f"{weapon} is not a valid weapon.")
+        if room not in self.all_rooms:
+            raise ValueError(f"{room} is not a valid room.")
+
+
+class Accusation(Actions):
+    suspect: str
+    weapon: str
+    room: str
+
+    def create_accusation(self, c: str, weap: str, rm: str):
+        self.suspect = c
+        self.weapon = weap
+        self.room = rm
+
+    def validate(self, game: "GameState") -> None:
+        if self.pt.hasMadeAccusation:
+            raise ValueError("You have already made an accusation this turn.")
+        self._validate_cards(self.suspect, self.weapon, self.room)
+
+    def perform_action(self, game: "GameState") -> dict:
+        # enter checking win conditions: the accusation is correct if it matches the envelope exactly
+        self.pt.hasMadeAccusation = True
+        # The names were checked by validate(), so they can be looked up without their types
+        accusation = (Card.from_name(self.suspect).get_mask()
+                      | Card.from_name(self.weapon).get_mask()
+                      | Card.from_name(self.room).get_mask())
+        correct = accusation == game.envelope
+
+        if correct:
+            game.finish(self.p)
+        else:
+            game.eliminate(self.p)
+
+        return {
+            'action': 'accusation',
+            'player': self.p.playerName,
+            'suspect': self.suspect,
+            'weapon': self.weapon,
+            'room': self.room,
+            'correct': correct,
+            'winner': game.winner.playerName if game.winner is not None else None,
+        }
+
+
+class Suggestion(Actions):
+    character: str
+    weapon: str
+    room: str
+
+    def create_suggestion(self, suspect: str, weap: str, room_suggest: str):
+        self.character = suspect
+        self.weapon = weap
+        self.room = room_suggest
+
+    def validate(self, game: "GameState") -> None:
+        if self.pt.hasMadeSuggestion:
+            raise ValueError("You have already made a suggestion this turn.")
+        self._validate_cards(self.character, self.weapon, self.room)
+        if game.board.names[self.p.currLocation] != self.room:
+            raise ValueError(f"You must be in the {self.room} to suggest it.")
+
+    def perform_action(self, game: "GameState") -> dict:
+        self.pt.hasMadeSuggestion = True
+
+        # The suggested suspect is brought into the room
+        suspect = game.player_for_character(self.character)
+        if suspect is not None and suspect is not self.p:
+            game.move_token(suspect, self.p.currLocation)
+
+        # ask the players after the suggester, in turn order, to disprove
+        mask = (Card.from_name(self.character).get_mask()
+                | Card.from_name(self.weapon).get_mask()
+                | Card.from_name(self.room).get_mask())
+        seat, matching = game.resolver.resolve(game.seat_of(self.p), mask)
+        shown = Card.ALL_CARDS[(matching & -matching).bit_length() - 1] if matching else None
+
+        return {
+            'action': 'suggestion',
+            'player': self.p.playerName,
+            'suspect': self.character,
+            'weapon': self.weapon,
+            'room': self.room,
+            'disprover': game.players[seat].playerName if seat is not None else None,
+            'card': shown.get_name() if shown is not None else None,
+        }
+
+
+class Move(Actions):
+    destination: int
+    currPos: int
+
+    def __init__(self, player: Player, playerTurn: "Player_Turn", destination: int = None):
+        super().__init__(player, playerTurn)
+        self.currPos = player.currLocation
+        self.destination = destination
+
+    def validate(self, game: "GameState") -> None:
+        if self.pt.hasMoved:
+            raise ValueError("You have already moved this turn.")
+        if self.pt.hasMadeSuggestion:
+            raise ValueError("You cannot move after making a suggestion.")
+        if self.destination is None or not 0 <= self.destination < len(game.board):
+            raise ValueError("That space is not on the board.")
+        if not game.board.valid_moves(self.currPos, game.occupied_hallways) >> self.destination & 1:
+            raise ValueError(f"You cannot move to the {game.board.names[self.destination]}.")
+
+    def perform_action(self, game: "GameState") -> dict:
+        self.pt.hasMoved = True
+        game.move_token(self.p, self.destination)
+        return {
+            'action': 'move',
+            'player': self.p.playerName,
+            'location': game.board.names[self.destination],
+        }
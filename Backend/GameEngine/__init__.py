@@ -0,0 +1,8 @@
+"""
+Headless Clue-less engine.
+
+The full rules (dealing, movement on the board graph, suggestions and their
+disproval, accusations, elimination and winning) in plain Python, with no Django
+import, so simulations and tests can run games without a database. The
+GameManagement app wraps it for the server and loads the board from the database.
+"""
@@ -0,0 +1,179 @@
+from types import MappingProxyType
+
+
+# The standard Clue-less board: a 3x3 grid of rooms joined by 12 hallways, plus
+# secret passages between opposite corner rooms. The server uses it when no
+# board has been stored in the database.
+STANDARD_ROOM_GRID = (
+    ("Study", "Hall", "Lounge"),
+    ("Library", "Billiard Room", "Dining Room"),
+    ("Conservatory", "Ballroom", "Kitchen"),
+)
+
+STANDARD_SECRET_PASSAGES = (
+    ("Study", "Kitchen"),
+    ("Lounge", "Conservatory"),
+)
+
+
+def hallway_name(room_a: str, room_b: str) -> str:
+    """Return the name of the hallway between two rooms of the standard board."""
+    return f"{room_a}-{room_b} Hallway"
+
+
+# Each character starts the game in the hallway next to their home square
+STANDARD_START_SPACES = {
+    "Miss Scarlet": hallway_name("Hall", "Lounge"),
+    "Colonel Mustard": hallway_name("Lounge", "Dining Room"),
+    "Mrs. White": hallway_name("Ballroom", "Kitchen"),
+    "Mr. Green": hallway_name("Conservatory", "Ballroom"),
+    "Mrs. Peacock": hallway_name("Library", "Conservatory"),
+    "Professor Plum": hallway_name("Study", "Library"),
+}
+
+
+def standard_layout() -> list:
+    """
+    Return the spaces of the standard board.
+
+    Returns:
+        list: (name, is_room, connected space names) for every space.
+    """
+    connections = {}
+    is_room = {}
+    for row in STANDARD_ROOM_GRID:
+        for room in row:
+            is_room[room] = True
+            connections[room] = []
+
+    size = len(STANDARD_ROOM_GRID)
+    for r in range(size):
+        for c in range(size):
+            room = STANDARD_ROOM_GRID[r][c]
+            for neighbor in ((STANDARD_ROOM_GRID[r][c + 1] if c + 1 < size else None),
+                             (STANDARD_ROOM_GRID[r + 1][c] if r + 1 < size else None)):
+                if neighbor is None:
+                    continue
+                hallway = hallway_name(room, neighbor)
+                is_room[hallway] = False
+                connections[hallway] = [room, neighbor]
+                connections[room].append(hallway)
+                connections[neighbor].append(hallway)
+
+    for room_a, room_b in STANDARD_SECRET_PASSAGES:
+        connections[room_a].append(room_b)
+        connections[room_b].append(room_a)
+
+    return [(name, is_room[name], tuple(connections[name])) for name in connections]
+
+
+class BoardGraph():
+    """
+    Immutable in-memory graph of the board.
+
+    Spaces are numbered 0..n-1 and every set of spaces is an integer bitset with
+    bit i standing for space i. Connections are treated as undirected, and a
+    connection between two rooms is a secret passage.
+
+    Attributes:
+        names (tuple: str): Name of each space, indexed by space id.
+        ids (mapping): Space id of each name.
+        room_mask (int): Bitset of the rooms.
+        hallway_mask (int): Bitset of the hallways.
+        adjacency (tuple: int): Bitset of the spaces connected to each space.
+        passages (tuple: int): Bitset of the secret passage destinations of each space.
+    """
+
+    __slots__ = ("names", "ids", "room_mask", "hallway_mask", "adjacency", "passages")
+
+    def __init__(self, spaces):
+        """
+        Build the graph from a description of the spaces.
+
+        Args:
+            spaces (iterable): (name, is_room, connected space names) for every space.
+
+        Raises:
+            ValueError: If a connection names a space that does not exist.
+        """
+        spaces = list(spaces)
+        names = tuple(name for name, _, _ in spaces)
+        ids = {name: space_id for space_id, name in enumerate(names)}
+
+        room_mask = 0
+        adjacency = [0] * len(names)
+        for space_id, (name, is_room, connected) in enumerate(spaces):
+            if is_room:
+                room_mask |= 1 << space_id
+            for other in connected:
+                if other not in ids:
+                    raise ValueError(f"{name} is connected to unknown space {other}.")
+                other_id = ids[other]
+                adjacency[space_id] |= 1 << other_id
+                adjacency[other_id] |= 1 << space_id
+
+        passages = tuple(adjacency[space_id] & room_mask if room_mask >> space_id & 1 else 0
+                         for space_id in range(len(names)))
+
+        set_attr = object.__setattr__
+        set_attr(self, "names", names)
+        set_attr(self, "ids", MappingProxyType(ids))
+        set_attr(self, "room_mask", room_mask)
+        set_attr(self, "hallway_mask", ((1 << len(names)) - 1) & ~room_mask)
+        set_attr(self, "adjacency", tuple(adjacency))
+        set_attr(self, "passages", passages)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BoardGraph is immutable.")
+
+    @classmethod
+    def standard(cls) -> "BoardGraph":
+        """Return the graph of the standard Clue-less board."""
+        return cls(standard_layout())
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def space_id(self, name: str) -> int:
+        """
+        Return the id of a space.
+
+        Raises:
+            ValueError: If there is no space with that name.
+        """
+        try:
+            return self.ids[name]
+        except KeyError:
+            raise ValueError(f"{name} is not a space on the board.") from None
+
+    def is_room(self, space: int) -> bool:
+        return bool(self.room_mask >> space & 1)
+
+    def spaces_of(self, mask: int) -> list:
+        """Return the ids of the spaces in a bitset, in id order."""
+        spaces = []
+        while mask:
+            low = mask & -mask
+            spaces.append(low.bit_length() - 1)
+            mask ^= low
+        return spaces
+
+    def names_of(self, mask: int) -> list:
+        """Return the names of the spaces in a bitset, in id order."""
+        return [self.names[space] for space in self.spaces_of(mask)]
+
+    def valid_moves(self, space: int, occupied: int = 0) -> int:
+        """
+        Return the bitset of legal destinations from a space.
+
+        Hallways hold one player at a time, so occupied hallways are not legal
+        destinations. Rooms can hold any number of players.
+
+        Args:
+            space (int): Id of the space the player is in.
+            occupied (int): Bitset of the spaces holding another player.
+
+        Returns:
+            int: Bitset of the spaces the player may move to.
+        """
+        return self.adjacency[space] & ~(occupied & self.hallway_mask)
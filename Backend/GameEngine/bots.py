@@ -0,0 +1,266 @@
+"""
+Bot policies for simulated games.
+
+A policy plays one seat. It decides the seat's moves, suggestions and accusations
+from what that seat may know: its own hand and the suggestions made during the
+game, where only the suggester is told which card was shown. The simulator asks
+the policy of the player whose turn it is for each decision and tells every
+policy about every suggestion.
+
+Policies are registered by name with @policy, and get_policy also accepts
+"package.module:Class" for a policy defined anywhere else.
+"""
+import importlib
+from functools import lru_cache
+from random import Random
+
+from Backend.cardGroupings.Card import Card
+from Backend.GameEngine.board import BoardGraph
+from Backend.GameEngine.deduction import Knowledge
+from Backend.GameEngine.paths import path_table
+from Backend.GameEngine.planner import SuggestionPlanner
+from Backend.GameEngine.posterior import ENVELOPES, Posterior
+
+TYPE_MASKS = (Card.SUSPECT_MASK, Card.WEAPON_MASK, Card.ROOM_MASK)
+
+POLICIES = {}
+
+
+def policy(name: str):
+    """Register a Bot subclass under a name."""
+    def register(cls):
+        POLICIES[name] = cls
+        return cls
+    return register
+
+
+def get_policy(name: str) -> type:
+    """
+    Return the policy class registered under a name, or named by "module:Class".
+
+    Raises:
+        ValueError: If there is no such policy.
+    """
+    if ":" in name:
+        module, _, attribute = name.partition(":")
+        try:
+            cls = getattr(importlib.import_module(module), attribute)
+        except (ImportError, AttributeError):
+            raise ValueError(f"{name} is not a bot policy.") from None
+        if not (isinstance(cls, type) and issubclass(cls, Bot)):
+            raise ValueError(f"{name} is not a bot policy.")
+        return cls
+    try:
+        return POLICIES[name]
+    except KeyError:
+        raise ValueError(f"{name} is not a bot policy.") from None
+
+
+def random_card(mask: int, rng: Random) -> Card:
+    """Return a card of a non-empty bitset, chosen uniformly."""
+    return rng.choice(Card.from_mask(mask))
+
+
+@lru_cache(maxsize=4096)
+def room_distances(board: BoardGraph, rooms: int) -> tuple:
+    """
+    Return the number of moves from every space to the nearest of some rooms.
+
+    There are only 2 ** 9 sets of rooms, so the lookups are cached.
+
+    Args:
+        rooms (int): Card bitset of the rooms.
+    """
+    targets = 0
+    for card in Card.from_mask(rooms):
+        targets |= 1 << board.space_id(card.get_name())
+    return path_table(board).distances_to(targets)
+
+
+class Bot():
+    """
+    Base policy, which keeps the cards that may still be in the envelope.
+
+    A card stops being a candidate when it is in the bot's hand or shown to it. When
+    nobody can disprove one of its suggestions, each suggested card it does not hold
+    is in the envelope, so the other cards of that type stop being candidates. The
+    bot accuses as soon as one card of each type is left.
+
+    Attributes:
+        seat (int): The bot's seat, in turn order.
+        n_players (int): Number of players in the game.
+        hand (int): Card bitset of the bot's hand.
+        board (BoardGraph): The board the game is played on.
+        rng (Random): Source of every choice the bot makes.
+        candidates (int): Card bitset of the cards that may be in the envelope.
+    """
+
+    def __init__(self, seat: int, n_players: int, hand: int, board: BoardGraph, rng: Random):
+        self.seat = seat
+        self.n_players = n_players
+        self.hand = hand
+        self.board = board
+        self.rng = rng
+        self.candidates = Card.ALL_MASK & ~hand
+
+    def solved(self) -> bool:
+        return all((self.candidates & type_mask).bit_count() == 1 for type_mask in TYPE_MASKS)
+
+    def choose_accusation(self) -> tuple:
+        """Return the suspect, weapon and room to accuse, or None to not accuse yet."""
+        if not self.solved():
+            return None
+        return tuple(card.get_name() for card in Card.from_mask(self.candidates))
+
+    def choose_move(self, space: int, destinations: int) -> int:
+        """
+        Return the space to move to, or None to stay.
+
+        Args:
+            space (int): Id of the space the bot is in.
+            destinations (int): Bitset of the spaces it may move to, never empty.
+        """
+        return self.rng.choice(self.board.spaces_of(destinations))
+
+    def choose_suggestion(self, room: str) -> tuple:
+        """Return the suspect and weapon to suggest in a room."""
+        return (random_card(self.candidates & Card.SUSPECT_MASK, self.rng).get_name(),
+                random_card(self.candidates & Card.WEAPON_MASK, self.rng).get_name())
+
+    def observe_suggestion(self, suggester: int, suspect: str, weapon: str, room: str,
+                           disprover: int, card: str) -> None:
+        """
+        Learn from a suggestion made by any seat.
+
+        Args:
+            suggester (int): Seat that made the suggestion.
+            disprover (int): Seat that disproved it, or None if nobody could.
+            card (str): The card shown, given only to the suggester.
+        """
+        if suggester != self.seat:
+            return
+        if card is not None:
+            self.candidates &= ~Card.from_name(card).get_mask()
+        elif disprover is None:
+            for name, type_mask in zip((suspect, weapon, room), TYPE_MASKS):
+                mask = Card.from_name(name).get_mask()
+                if self.candidates & mask:
+                    self.candidates &= ~type_mask | mask
+
+    def observe_accusation(self, accuser: int, suspect: str, weapon: str, room: str, correct: bool) -> None:
+        """Learn from an accusation made by any seat."""
+
+
+@policy("random")
+class RandomBot(Bot):
+    """Wanders the board at random and suggests random candidates wherever it ends up."""
+
+
+@policy("seeker")
+class SeekerBot(Bot):
+    """
+    Heads for the nearest room that is still a candidate.
+
+    In a candidate room it stays half of the time to suggest it again with other
+    cards, so it is not pulled out of the one room it still has to test.
+    """
+
+    def choose_move(self, space: int, destinations: int) -> int:
+        rooms = self.candidates & Card.ROOM_MASK
+        if self.board.is_room(space) and rooms & Card.from_name(self.board.names[space]).get_mask() \
+                and self.rng.random() < 0.5:
+            return None
+        distance = room_distances(self.board, rooms)
+        spaces = self.board.spaces_of(destinations)
+        closest = min(distance[space] for space in spaces)
+        return self.rng.choice([space for space in spaces if distance[space] == closest])
+
+
+@policy("deducer")
+class DeductionBot(SeekerBot):
+    """
+    Moves like SeekerBot, but deduces from every suggestion and accusation in the game.
+
+    Its Knowledge also learns from the suggestions of the other seats: who could not
+    disprove them, and that the disprover holds at least one of the cards.
+    """
+
+    def __init__(self, seat: int, n_players: int, hand: int, board: BoardGraph, rng: Random):
+        super().__init__(seat, n_players, hand, board, rng)
+        self.knowledge = Knowledge(n_players)
+        self.knowledge.observe_hand(seat, hand)
+        self.candidates = self.knowledge.envelope_candidates()
+
+    def choose_accusation(self) -> tuple:
+        solution = self.knowledge.solution()
+        if solution is None:
+            return None
+        return tuple(card.get_name() for card in Card.from_mask(solution))
+
+    def observe_suggestion(self, suggester: int, suspect: str, weapon: str, room: str,
+                           disprover: int, card: str) -> None:
+        suggested = Card.from_name(suspect).get_mask() | Card.from_name(weapon).get_mask() \
+            | Card.from_name(room).get_mask()
+        self.knowledge.observe_suggestion(suggester, suggested, disprover,
+                                          Card.from_name(card) if card is not None else None)
+        self.candidates = self.knowledge.envelope_candidates()
+
+    def observe_accusation(self, accuser: int, suspect: str, weapon: str, room: str, correct: bool) -> None:
+        accused = Card.from_name(suspect).get_mask() | Card.from_name(weapon).get_mask() \
+            | Card.from_name(room).get_mask()
+        self.knowledge.observe_accusation(accused, correct)
+        self.candidates = self.knowledge.envelope_candidates()
+
+
+@policy("planner")
+class PlannerBot(DeductionBot):
+    """
+    Deduces like DeductionBot, and makes the suggestions expected to teach it the most.
+
+    It also keeps a Posterior of its seat, restricted to the envelopes its Knowledge
+    allows, and asks the planner for the most informative suggestion in the room it
+    is in. From a hallway it enters whichever reachable room offers the most
+    informative suggestion; otherwise it moves like SeekerBot. Every PlannerBot of a
+    process shares one planner, so its cache serves all of them.
+
+    Attributes:
+        budget (float): Seconds a move may spend scoring rooms.
+    """
+    planner = SuggestionPlanner()
+    budget = 0.002
+
+    def __init__(self, seat: int, n_players: int, hand: int, board: BoardGraph, rng: Random):
+        super().__init__(seat, n_players, hand, board, rng)
+        self.posterior = Posterior(n_players, [seat], [hand])
+
+    def weights(self):
+        """Return the probability of each envelope given everything the bot knows."""
+        weights = self.posterior.weights[0] * ((ENVELOPES & ~self.candidates) == 0)
+        return weights / weights.sum()
+
+    def choose_move(self, space: int, destinations: int) -> int:
+        rooms = [destination for destination in self.board.spaces_of(destinations) if self.board.is_room(destination)]
+        if rooms and not self.board.is_room(space):
+            _, _, room, gain = self.planner.choose(self.weights(), self.hand,
+                                                   [self.board.names[room] for room in rooms], self.budget)
+            if gain > 0:
+                return self.board.space_id(room)
+        return super().choose_move(space, destinations)
+
+    def choose_suggestion(self, room: str) -> tuple:
+        suspect, weapon, _, _ = self.planner.choose(self.weights(), self.hand, room)
+        return suspect, weapon
+
+    def observe_suggestion(self, suggester: int, suspect: str, weapon: str, room: str,
+                           disprover: int, card: str) -> None:
+        super().observe_suggestion(suggester, suspect, weapon, room, disprover, card)
+        suggested = Card.from_name(suspect).get_mask() | Card.from_name(weapon).get_mask() \
+            | Card.from_name(room).get_mask()
+        self.posterior.observe_suggestion(None, suggester, suggested, -1 if disprover is None else disprover,
+                                          Card.from_name(card).get_mask() if card is not None else 0)
+
+    def observe_accusation(self, accuser: int, suspect: str, weapon: str, room: str, correct: bool) -> None:
+        super().observe_accusation(accuser, suspect, weapon, room, correct)
+        accused = Card.from_name(suspect).get_mask() | Card.from_name(weapon).get_mask() \
+            | Card.from_name(room).get_mask()
+        self.posterior.observe_accusation(None, accused, correct)
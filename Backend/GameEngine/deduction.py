@@ -0,0 +1,285 @@
+"""
+Incremental deduction over who holds which card.
+
+A Knowledge keeps, for every player and for the envelope, the card bitsets of the
+cards it is known to have and known to lack, so each cell of the owners x cards
+matrix is has, lacks or unknown. On top of the matrix it keeps the constraints
+that single facts cannot express: "this player has at least one of these cards",
+from suggestions disproved with a card the observer did not see, and "the
+envelope is not these three cards", from wrong accusations.
+
+Every new fact is propagated at once through the rules of the game:
+
+    - every card has exactly one owner;
+    - every player holds exactly the number of cards they were dealt;
+    - the envelope holds exactly one card of each type;
+    - an "at least one of" constraint whose other cards are lacked holds its last card.
+
+Each constraint is watched by the cells it mentions, so a fact only looks at the
+constraints on its own cell, and each cell changes at most once. Propagation
+therefore costs amortized constant time per observation, and reading the
+knowledge never replays the history.
+"""
+from Backend.cardGroupings.Card import Card
+
+TYPE_MASKS = (Card.SUSPECT_MASK, Card.WEAPON_MASK, Card.ROOM_MASK)
+
+
+def hand_sizes(n_players: int) -> list:
+    """Return the number of cards dealt to each seat, as deal_game deals them."""
+    dealt = len(Card.ALL_CARDS) - len(TYPE_MASKS)
+    return [dealt // n_players + (1 if seat < dealt % n_players else 0) for seat in range(n_players)]
+
+
+def bits(mask: int) -> list:
+    """Return the single-card bitsets of a card bitset, in ordinal order."""
+    result = []
+    while mask:
+        low = mask & -mask
+        result.append(low)
+        mask ^= low
+    return result
+
+
+class Knowledge():
+    """
+    What an observer knows about the cards of every player and of the envelope.
+
+    Owners are the seats 0 to n_players - 1, and the envelope at index n_players
+    (also given by the envelope attribute).
+
+    Attributes:
+        n_players (int): Number of players in the game.
+        envelope (int): Owner index of the envelope.
+        sizes (list: int): Number of cards held by each owner.
+        has (list: int): Card bitset of the cards each owner is known to have.
+        lacks (list: int): Card bitset of the cards each owner is known to lack.
+    """
+
+    def __init__(self, n_players: int, sizes: list = None):
+        """
+        Initialize the knowledge of an observer who has seen nothing yet.
+
+        Args:
+            n_players (int): Number of players in the game.
+            sizes (list: int): Number of cards dealt to each seat, dealt as by
+                deal_game if not given.
+        """
+        self.n_players = n_players
+        self.envelope = n_players
+        self.sizes = list(sizes if sizes is not None else hand_sizes(n_players)) + [len(TYPE_MASKS)]
+        if len(self.sizes) != n_players + 1:
+            raise ValueError(f"{len(self.sizes) - 1} hand sizes given for {n_players} players.")
+        self.has = [0] * (n_players + 1)
+        self.lacks = [0] * (n_players + 1)
+        # Owner -> card ordinal -> clauses mentioning the card, each a [mask, satisfied] pair
+        self._watch = [[[] for _ in Card.ALL_CARDS] for _ in range(n_players + 1)]
+        self._wrong = []  # Card bitsets of the wrong accusations
+        self._pending = []
+        self._undo = []  # (list, its contents) for each clause or watch list the current observation changed
+
+    def state(self, owner: int, card: Card) -> bool:
+        """Return True if the owner is known to have the card, False if known to lack it, else None."""
+        mask = card.get_mask()
+        if self.has[owner] & mask:
+            return True
+        if self.lacks[owner] & mask:
+            return False
+        return None
+
+    def observe_hand(self, seat: int, hand: int) -> None:
+        """Record the complete hand of a seat, such as the observer's own."""
+        self._pending.extend((seat, mask, True) for mask in bits(hand))
+        self._pending.extend((seat, mask, False) for mask in bits(Card.ALL_MASK & ~hand))
+        self._propagate()
+
+    def observe_has(self, owner: int, card: Card) -> None:
+        self._pending.append((owner, card.get_mask(), True))
+        self._propagate()
+
+    def observe_lacks(self, owner: int, card: Card) -> None:
+        self._pending.append((owner, card.get_mask(), False))
+        self._propagate()
+
+    def observe_suggestion(self, suggester: int, suggested: int, disprover: int, shown: Card = None) -> None:
+        """
+        Record the outcome of a suggestion.
+
+        The seats asked before the disprover, in turn order, lack every suggested
+        card. The disprover has the shown card if the observer saw it, and at least
+        one of the suggested cards otherwise.
+
+        Args:
+            suggester (int): Seat that made the suggestion.
+            suggested (int): Card bitset of the suggested cards.
+            disprover (int): Seat that disproved it, or None if nobody could.
+            shown (Card): The card shown, if the observer saw it.
+        """
+        cards = bits(suggested)
+        seat = (suggester + 1) % self.n_players
+        while seat != suggester and seat != disprover:
+            self._pending.extend((seat, mask, False) for mask in cards)
+            seat = (seat + 1) % self.n_players
+        clause = None
+        if disprover is not None:
+            if shown is not None:
+                self._pending.append((disprover, shown.get_mask(), True))
+            else:
+                clause = (disprover, suggested)
+        self._propagate(clause=clause)
+
+    def observe_accusation(self, accused: int, correct: bool) -> None:
+        """Record an accusation of a card bitset and whether it was correct."""
+        if correct:
+            self._pending.extend((self.envelope, mask, True) for mask in bits(accused))
+            self._propagate()
+        else:
+            self._propagate(wrong=accused)
+
+    def envelope_candidates(self) -> int:
+        """Return the card bitset of the cards that may still be in the envelope."""
+        return Card.ALL_MASK & ~self.lacks[self.envelope]
+
+    def solutions(self) -> list:
+        """Return every (suspect, weapon, room) that may still be in the envelope, as card bitsets."""
+        candidates = self.envelope_candidates()
+        suspects, weapons, rooms = (bits(candidates & type_mask) for type_mask in TYPE_MASKS)
+        wrong = set(self._wrong)
+        return [mask for mask in (s | w | r for s in suspects for w in weapons for r in rooms) if mask not in wrong]
+
+    def solution_count(self) -> int:
+        """Return the number of (suspect, weapon, room) that may still be in the envelope."""
+        candidates = self.envelope_candidates()
+        count = 1
+        for type_mask in TYPE_MASKS:
+            count *= (candidates & type_mask).bit_count()
+        return count - sum(1 for accused in set(self._wrong) if not accused & ~candidates)
+
+    def solution(self) -> int:
+        """Return the card bitset of the envelope if it is known, else None."""
+        if self.solution_count() != 1:
+            return None
+        return self.solutions()[0]
+
+    def _add_clause(self, owner: int, cards: int) -> None:
+        clause = [cards, False]
+        if self._reduce(owner, clause):
+            return
+        watch = self._watch[owner]
+        for mask in bits(clause[0]):
+            watched = watch[mask.bit_length() - 1]
+            self._undo.append((watched, watched[:]))
+            watched.append(clause)
+
+    def _reduce(self, owner: int, clause: list) -> bool:
+        """Drop lacked cards from a clause and act on what is left. Returns True once it is satisfied."""
+        if clause[1]:
+            return True
+        self._undo.append((clause, clause[:]))
+        if clause[0] & self.has[owner]:
+            clause[1] = True
+            return True
+        clause[0] &= ~self.lacks[owner]
+        if not clause[0]:
+            raise ValueError(f"Seat {owner} cannot have disproved that suggestion.")
+        if clause[0] & (clause[0] - 1) == 0:
+            clause[1] = True
+            self._pending.append((owner, clause[0], True))
+            return True
+        return False
+
+    def _check_wrong(self) -> None:
+        """The envelope lacks the last card of a wrong accusation once it has the other two."""
+        envelope_has = self.has[self.envelope]
+        for accused in self._wrong:
+            missing = accused & ~envelope_has
+            if missing and missing & (missing - 1) == 0:
+                self._pending.append((self.envelope, missing, False))
+            elif not missing:
+                raise ValueError("The envelope cannot hold a wrong accusation.")
+
+    def _propagate(self, clause: tuple = None, wrong: int = None) -> None:
+        """
+        Apply the pending facts, and a new clause or wrong accusation, with everything they imply.
+
+        Either all of it is kept or, if it contradicts what is already known,
+        none of it is and the ValueError is raised.
+
+        Args:
+            clause (tuple): (owner, card bitset) the owner has at least one card of.
+            wrong (int): Card bitset of a wrong accusation.
+        """
+        has, lacks, n_wrong = self.has[:], self.lacks[:], len(self._wrong)
+        try:
+            if clause is not None:
+                self._add_clause(*clause)
+            if wrong is not None:
+                self._wrong.append(wrong)
+                self._check_wrong()
+            self._drain()
+        except ValueError:
+            self._pending.clear()
+            for changed, contents in reversed(self._undo):
+                changed[:] = contents
+            self.has[:] = has
+            self.lacks[:] = lacks
+            del self._wrong[n_wrong:]
+            raise
+        finally:
+            self._undo.clear()
+
+    def _drain(self) -> None:
+        pending = self._pending
+        while pending:
+            owner, mask, has = pending.pop()
+            if has:
+                if self.has[owner] & mask:
+                    continue
+                if self.lacks[owner] & mask:
+                    raise ValueError(f"{Card.from_mask(mask)[0].get_name()} is known to be both held and not held.")
+                self.has[owner] |= mask
+                for other in range(self.n_players + 1):
+                    if other != owner and not self.lacks[other] & mask:
+                        pending.append((other, mask, False))
+                watched = self._watch[owner][mask.bit_length() - 1]
+                self._undo.append((watched, watched[:]))
+                for clause in watched:
+                    self._undo.append((clause, clause[:]))
+                    clause[1] = True
+                watched.clear()
+                if owner == self.envelope:
+                    self._check_wrong()
+            else:
+                if self.lacks[owner] & mask:
+                    continue
+                if self.has[owner] & mask:
+                    raise ValueError(f"{Card.from_mask(mask)[0].get_name()} is known to be both held and not held.")
+                self.lacks[owner] |= mask
+                holders = [other for other in range(self.n_players + 1) if not self.lacks[other] & mask]
+                if not holders:
+                    raise ValueError(f"Nobody can hold {Card.from_mask(mask)[0].get_name()}.")
+                if len(holders) == 1:
+                    pending.append((holders[0], mask, True))
+                watched = self._watch[owner][mask.bit_length() - 1]
+                self._undo.append((watched, watched[:]))
+                for clause in watched:
+                    self._reduce(owner, clause)
+                watched.clear()
+            self._check_count(owner)
+
+    def _check_count(self, owner: int) -> None:
+        """Settle an owner's unknown cards once its known cards or possible cards match its size."""
+        groups = TYPE_MASKS if owner == self.envelope else (Card.ALL_MASK,)
+        size = 1 if owner == self.envelope else self.sizes[owner]
+        for group in groups:
+            has = self.has[owner] & group
+            unknown = group & ~has & ~self.lacks[owner]
+            if not unknown:
+                continue
+            known = has.bit_count()
+            if known == size:
+                self._pending.extend((owner, mask, False) for mask in bits(unknown))
+            elif known + unknown.bit_count() == size:
+                self._pending.extend((owner, mask, True) for mask in bits(unknown))
+            elif known > size or known + unknown.bit_count() < size:
+                raise ValueError(f"Owner {owner} cannot hold {size} cards.")
@@ -0,0 +1,69 @@
+from Backend.cardGroupings.Card import Card, CardType
+
+
+class DisprovalResolver():
+    """
+    Finds which player disproves a suggestion.
+
+    Hands are kept as card bitsets (see Card.get_mask), one per seat in turn order.
+    For every seat the order in which the other seats are asked is precomputed, so
+    resolving a suggestion is one AND per seat asked and never looks at single cards.
+
+    Attributes:
+        hands (tuple: int): Hand bitset of each seat, in turn order.
+    """
+
+    def __init__(self, hand_masks):
+        """
+        Initialize the resolver with the dealt hands.
+
+        Args:
+            hand_masks (iterable: int): Hand bitset of each seat, in turn order.
+        """
+        self.hands = tuple(int(mask) for mask in hand_masks)
+        n_seats = len(self.hands)
+        self._rotations = tuple(
+            tuple((seat % n_seats, self.hands[seat % n_seats]) for seat in range(suggester + 1, suggester + n_seats))
+            for suggester in range(n_seats)
+        )
+
+    def resolve(self, suggester: int, suggestion_mask: int) -> tuple:
+        """
+        Find the first seat after the suggester that holds a suggested card.
+
+        Args:
+            suggester (int): Seat of the player making the suggestion.
+            suggestion_mask (int): Bitset of the suggested cards.
+
+        Returns:
+            tuple: The disproving seat and the bitset of its matching cards,
+            or (None, 0) if nobody can disprove the suggestion.
+        """
+        for seat, hand in self._rotations[suggester]:
+            matching = hand & suggestion_mask
+            if matching:
+                return seat, matching
+        return None, 0
+
+    def resolve_cards(self, suggester: int, suspect: str, weapon: str, room: str) -> tuple:
+        """
+        Find the first seat that can disprove a suggestion given by card names.
+
+        Returns:
+            tuple: The disproving seat and the list of its matching cards,
+            or (None, []) if nobody can disprove the suggestion.
+        """
+        seat, matching = self.resolve(suggester, suggestion_mask(suspect, weapon, room))
+        return seat, Card.from_mask(matching)
+
+
+def suggestion_mask(suspect: str, weapon: str, room: str) -> int:
+    """
+    Return the card bitset of a suggestion.
+
+    Raises:
+        ValueError: If any of the names is not a valid card of its type.
+    """
+    return (Card(suspect, CardType.SUSPECT).get_mask()
+            | Card(weapon, CardType.WEAPON).get_mask()
+            | Card(room, CardType.ROOM).get_mask())
@@ -0,0 +1,350 @@
+from Backend.cardGroupings.Card import Card
+from Backend.cardGroupings.Dealer import deal_game
+from Backend.GameEngine.Actions import Accusation, Move, Suggestion
+from Backend.GameEngine.board import BoardGraph, STANDARD_START_SPACES
+from Backend.GameEngine.disproval import DisprovalResolver
+from Backend.GameEngine.player import Player
+from Backend.GameEngine.player_turn import Player_Turn
+
+
+class GameState():
+    """
+    Live state of one game, held in memory as plain objects.
+
+    Attributes:
+        game_id (int): Id of the Game row the state belongs to.
+        session_id (int): Id of the GameSession row, if any.
+        board (BoardGraph): Board the game is played on.
+        players (list: Player): Players in turn order.
+        envelope (int): Card bitset of the solution.
+        resolver (DisprovalResolver): Disproval lookup over the dealt hands.
+        turn (int): Seat whose turn it is.
+        player_turn (Player_Turn): Actions taken in the current turn.
+        turn_counter (int): Number of turns played.
+        round_counter (int): Number of full rounds played.
+        eliminated (set: int): Seats that made a wrong accusation.
+        occupied_hallways (int): Bitset of the hallways holding a player.
+        active (bool): False once the game is over.
+        winner (Player): The winning player, if any.
+        version (int): Incremented on every change, used to coalesce writes.
+    """
+
+    def __init__(self, game_id: int, player_names: list, board: BoardGraph, game_seed=None,
+                 characters: list = None, session_id: int = None):
+        if not 1 <= len(player_names) <= len(Card.VALID_SUSPECTS):
+            raise ValueError(f"{len(player_names)} is not a valid number of players.")
+        if characters is None:
+            characters = Card.VALID_SUSPECTS[:len(player_names)]
+
+        self.game_id = game_id
+        self.session_id = session_id
+        self.board = board
+        self.game_seed = game_seed
+        envelope, dealt = deal_game(len(player_names), game_seed)
+        self.envelope = envelope.get_mask()
+        hands = [hand.get_mask() for hand in dealt]
+        self.resolver = DisprovalResolver(hands)
+
+        self.players = []
+        self.occupied_hallways = 0
+        for seat, name in enumerate(player_names):
+            player = Player(name, seat)
+            player.character = characters[seat]
+            player.playerHand = hands[seat]
+            start = STANDARD_START_SPACES.get(player.character)
+            if start is None:
+                raise ValueError(f"{player.character} is not a valid suspect.")
+            self.move_token(player, board.space_id(start))
+            self.players.append(player)
+
+        self.turn = 0
+        self.player_turn = Player_Turn(self.players[0])
+        self.turn_counter = 0
+        self.round_counter = 0
+        self.eliminated = set()
+        self.active = True
+        self.winner = None
+        self.version = 0
+
+    def seat_of(self, player: Player) -> int:
+        return player.playerID
+
+    def player_named(self, name: str) -> Player:
+        for player in self.players:
+            if player.playerName == name:
+                return player
+        raise ValueError(f"{name} is not playing in game {self.game_id}.")
+
+    def player_for_character(self, character: str) -> Player:
+        for player in self.players:
+            if player.character == character:
+                return player
+        return None
+
+    def current_player(self) -> Player:
+        return self.players[self.turn]
+
+    def move_token(self, player: Player, destination: int) -> None:
+        """Move a player's token and keep the hallway occupancy bitset in sync."""
+        if player.currLocation is not None:
+            self.occupied_hallways &= ~(1 << player.currLocation)
+        player.prevLocation = player.currLocation
+        player.currLocation = destination
+        self.occupied_hallways |= (1 << destination) & self.board.hallway_mask
+
+    def eliminate(self, player: Player) -> None:
+        """Remove a player who made a wrong accusation from the turn order."""
+        self.eliminated.add(self.seat_of(player))
+        remaining = [p for p in self.players if self.seat_of(p) not in self.eliminated]
+        if len(remaining) <= 1:
+            self.finish(remaining[0] if remaining else None)
+        elif self.players[self.turn] is player:
+            self.advance_turn()
+
+    def finish(self, winner: Player) -> None:
+        self.winner = winner
+        self.active = False
+
+    def advance_turn(self) -> None:
+        """Pass the turn to the next player who has not been eliminated."""
+        n_seats = len(self.players)
+        seat = self.turn
+        for _ in range(n_seats):
+            seat = (seat + 1) % n_seats
+            if seat == 0:
+                self.round_counter += 1
+            if seat not in self.eliminated:
+                break
+        self.turn = seat
+        self.turn_counter += 1
+        self.player_turn = Player_Turn(self.players[seat])
+
+    def to_dict(self) -> dict:
+        """Return the full state as JSON-serializable data, for persistence."""
+        board = self.board
+        return {
+            'game_id': self.game_id,
+            'session_id': self.session_id,
+            'game_seed': self.game_seed,
+            'active': self.active,
+            'turn': self.turn,
+            'turn_counter': self.turn_counter,
+            'round_counter': self.round_counter,
+            'winner': self.winner.playerName if self.winner is not None else None,
+            'envelope': [card.get_name() for card in Card.from_mask(self.envelope)],
+            'players': [{
+                'name': player.playerName,
+                'character': player.character,
+                'location': board.names[player.currLocation],
+                'hand': [card.get_name() for card in Card.from_mask(player.playerHand)],
+                'eliminated': self.seat_of(player) in self.eliminated,
+            } for player in self.players],
+            'player_turn': {
+                'has_moved': self.player_turn.hasMoved,
+                'has_made_suggestion': self.player_turn.hasMadeSuggestion,
+                'has_made_accusation': self.player_turn.hasMadeAccusation,
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict, board: BoardGraph) -> "GameState":
+        """
+        Rebuild a game from the data returned by to_dict.
+
+        Raises:
+            ValueError: If a card or space in the data does not exist.
+        """
+        game = cls.__new__(cls)
+        game.game_id = state['game_id']
+        game.session_id = state['session_id']
+        game.board = board
+        game.game_seed = state['game_seed']
+        game.envelope = Card.mask_of(Card.from_name(name) for name in state['envelope'])
+
+        game.players = []
+        game.occupied_hallways = 0
+        game.eliminated = set()
+        for seat, entry in enumerate(state['players']):
+            player = Player(entry['name'], seat)
+            player.character = entry['character']
+            player.playerHand = Card.mask_of(Card.from_name(name) for name in entry['hand'])
+            game.move_token(player, board.space_id(entry['location']))
+            if entry['eliminated']:
+                game.eliminated.add(seat)
+            game.players.append(player)
+        game.resolver = DisprovalResolver([player.playerHand for player in game.players])
+
+        game.turn = state['turn']
+        game.player_turn = Player_Turn(game.players[game.turn])
+        turn = state.get('player_turn', {})
+        game.player_turn.hasMoved = turn.get('has_moved', False)
+        game.player_turn.hasMadeSuggestion = turn.get('has_made_suggestion', False)
+        game.player_turn.hasMadeAccusation = turn.get('has_made_accusation', False)
+        game.turn_counter = state['turn_counter']
+        game.round_counter = state['round_counter']
+        game.active = state['active']
+        game.winner = game.player_named(state['winner']) if state['winner'] is not None else None
+        game.version = 0
+        return game
+
+    def view_for(self, name: str) -> dict:
+        """Return what one player may see: the public state and their own hand."""
+        viewer = self.player_named(name)
+        state = self.to_dict()
+        del state['envelope']
+        del state['game_seed']
+        for player, entry in zip(self.players, state['players']):
+            if player is not viewer:
+                del entry['hand']
+        state['valid_actions'] = (self.player_turn.get_valid_actions(self)
+                                  if self.active and viewer is self.current_player() else [])
+        return state
+
+
+class GameEngine():
+    """
+    Authoritative in-process engine for live games.
+
+    Games are held in memory from the moment they start until an action finishes
+    them. Actions are validated and applied to the in-memory state, reads never
+    touch the database, and every change is handed to the on_change callback
+    (normally a write-behind queue) to persist.
+
+    Attributes:
+        on_change (callable): Called with the GameState after every change.
+    """
+
+    def __init__(self, on_change=None):
+        self._games = {}
+        self.on_change = on_change
+
+    def start_game(self, game_id: int, player_names: list, board: BoardGraph, game_seed=None,
+                   characters: list = None, session_id: int = None) -> GameState:
+        """
+        Deal a new game and make it live.
+
+        Raises:
+            ValueError: If the game is already live or the players are not valid.
+        """
+        if game_id in self._games:
+            raise ValueError(f"Game {game_id} has already started.")
+        game = GameState(game_id, player_names, board, game_seed, characters, session_id)
+        self._games[game_id] = game
+        self._changed(game)
+        return game
+
+    def is_live(self, game_id: int) -> bool:
+        return game_id in self._games
+
+    def get_game(self, game_id: int) -> GameState:
+        try:
+            return self._games[game_id]
+        except KeyError:
+            raise ValueError(f"Game {game_id} is not live.") from None
+
+    def end_game(self, game_id: int) -> GameState:
+        """Stop holding a game in memory, after persisting its final state."""
+        game = self.get_game(game_id)
+        game.active = False
+        self._changed(game)
+        del self._games[game_id]
+        return game
+
+    def live_games(self) -> list:
+        return list(self._games.values())
+
+    def adopt(self, game: GameState) -> GameState:
+        """
+        Make a game that was started elsewhere live here, such as one moved from another shard.
+
+        Raises:
+            ValueError: If the game is already live.
+        """
+        if game.game_id in self._games:
+            raise ValueError(f"Game {game.game_id} has already started.")
+        self._games[game.game_id] = game
+        self._changed(game)
+        return game
+
+    def release(self, game_id: int) -> GameState:
+        """Stop holding a game in memory without ending it, so another engine can adopt it."""
+        game = self.get_game(game_id)
+        del self._games[game_id]
+        return game
+
+    def move(self, game_id: int, player_name: str, destination: str) -> dict:
+        game, player = self._turn_of(game_id, player_name)
+        action = Move(player, game.player_turn, game.board.space_id(destination))
+        return self._take(game, action)
+
+    def suggest(self, game_id: int, player_name: str, suspect: str, weapon: str, room: str) -> dict:
+        game, player = self._turn_of(game_id, player_name)
+        action = Suggestion(player, game.player_turn)
+        action.create_suggestion(suspect, weapon, room)
+        return self._take(game, action)
+
+    def accuse(self, game_id: int, player_name: str, suspect: str, weapon: str, room: str) -> dict:
+        game, player = self._turn_of(game_id, player_name)
+        action = Accusation(player, game.player_turn)
+        action.create_accusation(suspect, weapon, room)
+        return self._take(game, action)
+
+    def end_turn(self, game_id: int, player_name: str) -> dict:
+        game, player = self._turn_of(game_id, player_name)
+        game.player_turn.end_turn()
+        game.advance_turn()
+        self._changed(game)
+        return {
+            'action': 'end_turn',
+            'player': player.playerName,
+            'next_player': game.current_player().playerName,
+            'turn_counter': game.turn_counter,
+            'round_counter': game.round_counter,
+        }
+
+    def apply(self, game_id: int, player_name: str, action: str, data: dict) -> dict:
+        """
+        Apply an action given by name, as sent by a client.
+
+        Args:
+            action (str): One of 'move', 'suggestion', 'accusation' or 'end_turn'.
+            data (dict): The action's fields ('room' for a move; 'character',
+                'weapon' and 'room' for a suggestion or accusation).
+
+        Raises:
+            ValueError: If the action is unknown, incomplete or not allowed.
+        """
+        try:
+            if action == 'move':
+                return self.move(game_id, player_name, data['room'])
+            if action == 'suggestion':
+                return self.suggest(game_id, player_name, data['character'], data['weapon'], data['room'])
+            if action == 'accusation':
+                return self.accuse(game_id, player_name, data['character'], data['weapon'], data['room'])
+            if action == 'end_turn':
+                return self.end_turn(game_id, player_name)
+        except KeyError as e:
+            raise ValueError(f"Missing field {e.args[0]} for {action}.") from None
+        raise ValueError(f"{action} is not a valid action.")
+
+    def _turn_of(self, game_id: int, player_name: str) -> tuple:
+        game = self.get_game(game_id)
+        if not game.active:
+            raise ValueError(f"Game {game_id} is over.")
+        player = game.player_named(player_name)
+        if player is not game.current_player():
+            raise ValueError("It is not your turn.")
+        return game, player
+
+    def _take(self, game: GameState, action) -> dict:
+        result = game.player_turn.take_action(action, game)
+        if game.active:
+            self._changed(game)
+        else:
+            self.end_game(game.game_id)  # The action finished the game
+        return result
+
+    def _changed(self, game: GameState) -> None:
+        game.version += 1
+        if self.on_change is not None:
+            self.on_change(game)
@@ -0,0 +1,166 @@
+"""
+Precomputed shortest paths between every two spaces of a board.
+
+A PathTable holds, for every (from, to) pair of spaces, the number of moves
+between them and the first space to move to, so movement planning and "how far
+to the Kitchen" hints are single lookups instead of graph searches. Both tables
+are n x n bytes, built once from a BoardGraph by a breadth-first search from
+every space, and can be saved as a compact binary blob. A blob records a
+fingerprint of the board it was built from and is refused for any other board,
+so a stale table is never used after the board data changes.
+"""
+import hashlib
+import struct
+from collections import deque
+from functools import lru_cache
+
+from Backend.GameEngine.board import BoardGraph
+
+UNREACHABLE = 255  # Distance between spaces that are not connected, and their next hop
+
+_MAGIC = b"CLPT"
+_VERSION = 2  # Version 1 fingerprints packed each bitset into 8 bytes
+_HEADER = struct.Struct(">4sBB16s")  # Magic, version, number of spaces, board fingerprint
+
+
+def board_fingerprint(board: BoardGraph) -> bytes:
+    """Return a digest of a board's spaces and connections."""
+    width = (len(board) + 7) // 8  # Bytes of a bitset of spaces
+    digest = hashlib.blake2b(digest_size=16)
+    for name, adjacency in zip(board.names, board.adjacency):
+        digest.update(name.encode())
+        digest.update(b"\0")
+        digest.update(adjacency.to_bytes(width, "big"))
+    digest.update(board.room_mask.to_bytes(width, "big"))
+    return digest.digest()
+
+
+class PathTable():
+    """
+    Immutable all-pairs distance and next-hop table of a board.
+
+    Entry from * n + to of each table is for moving from space `from` to space `to`.
+
+    Attributes:
+        size (int): Number of spaces.
+        fingerprint (bytes): board_fingerprint of the board the table was built from.
+        distances (bytes): Moves between every two spaces, UNREACHABLE if not connected.
+        next_hops (bytes): First space on a shortest path between every two spaces,
+            the space itself when they are the same, UNREACHABLE if not connected.
+    """
+
+    __slots__ = ("size", "fingerprint", "distances", "next_hops")
+
+    def __init__(self, size: int, fingerprint: bytes, distances: bytes, next_hops: bytes):
+        if len(distances) != size * size or len(next_hops) != size * size:
+            raise ValueError(f"A path table of {size} spaces needs {size * size} entries per table.")
+        set_attr = object.__setattr__
+        set_attr(self, "size", size)
+        set_attr(self, "fingerprint", fingerprint)
+        set_attr(self, "distances", bytes(distances))
+        set_attr(self, "next_hops", bytes(next_hops))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PathTable is immutable.")
+
+    @classmethod
+    def build(cls, board: BoardGraph) -> "PathTable":
+        """
+        Build the table of a board with a breadth-first search from every space.
+
+        Raises:
+            ValueError: If the board has more spaces than a table can number.
+        """
+        size = len(board)
+        if size >= UNREACHABLE:
+            raise ValueError(f"A path table holds at most {UNREACHABLE - 1} spaces.")
+        distances = bytearray([UNREACHABLE]) * (size * size)
+        next_hops = bytearray([UNREACHABLE]) * (size * size)
+        for target in range(size):
+            # Searching outwards from the target, each space's next hop is the space it was reached from
+            distances[target * size + target] = 0
+            next_hops[target * size + target] = target
+            queue = deque([target])
+            while queue:
+                space = queue.popleft()
+                for neighbor in board.spaces_of(board.adjacency[space]):
+                    if distances[neighbor * size + target] == UNREACHABLE:
+                        distances[neighbor * size + target] = distances[space * size + target] + 1
+                        next_hops[neighbor * size + target] = space
+                        queue.append(neighbor)
+        return cls(size, board_fingerprint(board), distances, next_hops)
+
+    def to_bytes(self) -> bytes:
+        """Return the table as a binary blob, for from_bytes."""
+        return _HEADER.pack(_MAGIC, _VERSION, self.size, self.fingerprint) + self.distances + self.next_hops
+
+    @classmethod
+    def from_bytes(cls, blob: bytes, board: BoardGraph = None) -> "PathTable":
+        """
+        Load a table saved with to_bytes.
+
+        Args:
+            board (BoardGraph): If given, the board the table must have been built from.
+
+        Raises:
+            ValueError: If the blob is not a path table, or was built from another board.
+        """
+        if len(blob) < _HEADER.size:
+            raise ValueError("The blob is not a path table.")
+        magic, version, size, fingerprint = _HEADER.unpack_from(blob)
+        if magic != _MAGIC or version != _VERSION or len(blob) != _HEADER.size + 2 * size * size:
+            raise ValueError("The blob is not a path table.")
+        if board is not None and fingerprint != board_fingerprint(board):
+            raise ValueError("The path table was built from another board.")
+        body = blob[_HEADER.size:]
+        return cls(size, fingerprint, body[:size * size], body[size * size:])
+
+    def distance(self, start: int, end: int) -> int:
+        """Return the number of moves from one space to another, UNREACHABLE if not connected."""
+        return self.distances[start * self.size + end]
+
+    def next_hop(self, start: int, end: int) -> int:
+        """Return the space to move to from start on a shortest path to end."""
+        return self.next_hops[start * self.size + end]
+
+    def path(self, start: int, end: int) -> list:
+        """
+        Return the spaces of a shortest path, from start to end inclusive.
+
+        Raises:
+            ValueError: If the spaces are not connected.
+        """
+        if self.distance(start, end) == UNREACHABLE:
+            raise ValueError(f"Space {end} cannot be reached from space {start}.")
+        path = [start]
+        while path[-1] != end:
+            path.append(self.next_hop(path[-1], end))
+        return path
+
+    def distances_to(self, targets: int) -> tuple:
+        """
+        Return the number of moves from every space to the nearest of some spaces.
+
+        Args:
+            targets (int): Bitset of the spaces.
+
+        Returns:
+            tuple: One distance per space, UNREACHABLE if none of the targets can be reached.
+        """
+        size = self.size
+        ends = []
+        while targets:
+            low = targets & -targets
+            ends.append(low.bit_length() - 1)
+            targets ^= low
+        if not ends:
+            return (UNREACHABLE,) * size
+        # Connections are undirected, so the distances to a space are its row
+        rows = [self.distances[end * size:(end + 1) * size] for end in ends]
+        return tuple(rows[0]) if len(rows) == 1 else tuple(map(min, *rows))
+
+
+@lru_cache(maxsize=16)
+def path_table(board: BoardGraph) -> PathTable:
+    """Return the path table of a board, building it once per board."""
+    return PathTable.build(board)
@@ -0,0 +1,154 @@
+"""
+Choice of the most informative suggestion.
+
+A suggestion in a room is one of 6 x 6 (suspect, weapon) pairs. For the
+suggester, its outcome is the card it is shown, or that nobody could disprove
+it. Given an envelope, every suggested card the suggester does not hold and that
+is not in the envelope is held by another seat, and one of them is shown; the
+planner takes each of them to be equally likely to be the one. The expected
+information gain of a suggestion is then the mutual information between the
+envelope and the outcome,
+
+    I = H(outcome) - sum over envelopes of p(envelope) * log2(cards that could be shown),
+
+Only whether each suggested card is in the envelope matters, so the 324 envelope
+probabilities are first summed into the 8 ways the three cards can be in or out
+of it, for every pair at once; the 36 pairs of a room are then scored together
+from (8 x 6 x 6) arrays. Scores are cached by a hash of the knowledge state (the
+envelope probabilities, the hand and the room), so seats in the same position do
+not score it twice.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from Backend.cardGroupings.Card import Card
+
+N_SUSPECTS = len(Card.VALID_SUSPECTS)
+N_WEAPONS = len(Card.VALID_WEAPONS)
+N_ROOMS = len(Card.VALID_ROOMS)
+SUSPECT_MASKS = np.array([Card.from_name(name).get_mask() for name in Card.VALID_SUSPECTS], dtype=np.int64)
+WEAPON_MASKS = np.array([Card.from_name(name).get_mask() for name in Card.VALID_WEAPONS], dtype=np.int64)
+
+# 1 where a card is outside the envelope, along the [suspect in, weapon in, room in] axes
+_OUT = np.array([1, 0])
+_SUSPECT_OUT = _OUT.reshape(2, 1, 1, 1, 1)
+_WEAPON_OUT = _OUT.reshape(1, 2, 1, 1, 1)
+_ROOM_OUT = _OUT.reshape(1, 1, 2, 1, 1)
+LOG2 = np.log2(np.maximum(np.arange(4), 1))  # log2 of the number of cards that could be shown
+
+
+def information_gain(weights: np.ndarray, hand: int, room: str) -> np.ndarray:
+    """
+    Return the expected information gain, in bits, of suggesting each pair in a room.
+
+    Args:
+        weights (ndarray: float64): Probability of each envelope, shape (324,), in
+            the order of posterior.ENVELOPES.
+        hand (int): Card bitset of the suggester's hand.
+        room (str): The room the suggestion is made in.
+
+    Returns:
+        ndarray: The gain of each (suspect, weapon) pair, shape (6, 6).
+    """
+    envelopes = np.asarray(weights, dtype=np.float64).reshape(N_SUSPECTS, N_WEAPONS, N_ROOMS)
+    in_room = envelopes[:, :, Card.VALID_ROOMS.index(room)]
+    # Probability of each in/out pattern of the suggested cards, indexed
+    # [suspect in, weapon in, room in, suspect, weapon]
+    mass = np.empty((2, 2, 2, N_SUSPECTS, N_WEAPONS))
+    for room_in, both in ((1, in_room), (0, envelopes.sum(axis=2) - in_room)):
+        suspects = both.sum(axis=1)[:, None]
+        weapons = both.sum(axis=0)[None, :]
+        mass[1, 1, room_in] = both
+        mass[1, 0, room_in] = suspects - both
+        mass[0, 1, room_in] = weapons - both
+        mass[0, 0, room_in] = both.sum() - suspects - weapons + both
+    np.maximum(mass, 0.0, out=mass)  # Differences of sums can round below zero
+
+    # Cards that could be shown: outside the suggester's hand and outside the envelope
+    suspect = _SUSPECT_OUT * ((SUSPECT_MASKS & hand) == 0)[:, None]
+    weapon = _WEAPON_OUT * ((WEAPON_MASKS & hand) == 0)[None, :]
+    room_card = _ROOM_OUT * int((Card.from_name(room).get_mask() & hand) == 0)
+    count = suspect + weapon + room_card
+
+    share = mass / np.maximum(count, 1)
+    outcomes = np.stack([(share * suspect).sum(axis=(0, 1, 2)),
+                         (share * weapon).sum(axis=(0, 1, 2)),
+                         (share * room_card).sum(axis=(0, 1, 2)),
+                         (mass * (count == 0)).sum(axis=(0, 1, 2))])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entropy = -np.where(outcomes > 0, outcomes * np.log2(outcomes), 0.0).sum(axis=0)
+    conditional = (mass * LOG2[count]).sum(axis=(0, 1, 2))
+    return np.maximum(entropy - conditional, 0.0)
+
+
+class SuggestionPlanner():
+    """
+    Picks the suggestion with the highest expected information gain, with a cache.
+
+    One planner can serve every bot seat of a process.
+
+    Attributes:
+        cache_size (int): Knowledge states whose scores are kept.
+        hits (int): Rooms whose scores came from the cache.
+        misses (int): Rooms that had to be scored.
+    """
+
+    def __init__(self, cache_size: int = 4096):
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def scores(self, weights: np.ndarray, hand: int, room: str) -> np.ndarray:
+        """Return the gain of every (suspect, weapon) pair in a room, shape (6, 6), from the cache if possible."""
+        key = self._key(weights, hand, room)
+        scores = self._cache.get(key)
+        if scores is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return scores
+        self.misses += 1
+        scores = information_gain(weights, hand, room)
+        self._cache[key] = scores
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return scores
+
+    def choose(self, weights: np.ndarray, hand: int, rooms, budget: float = None) -> tuple:
+        """
+        Return the most informative suggestion among one or more rooms.
+
+        Args:
+            weights (ndarray: float64): Probability of each envelope, shape (324,).
+            hand (int): Card bitset of the suggester's hand.
+            rooms (str or sequence: str): The room of the suggestion, or the rooms it
+                could be made in, most preferred first.
+            budget (float): Seconds the decision may take. Rooms are scored in order
+                until it runs out; the first room is always scored.
+
+        Returns:
+            tuple: The suspect, weapon and room names, and the expected gain in bits.
+        """
+        rooms = [rooms] if isinstance(rooms, str) else list(rooms)
+        if not rooms:
+            raise ValueError("Give at least one room.")
+        deadline = None if budget is None else time.perf_counter() + budget
+        best = None
+        for room in rooms:
+            scores = self.scores(weights, hand, room)
+            index = int(np.argmax(scores))
+            if best is None or scores.flat[index] > best[3]:
+                suspect, weapon = divmod(index, N_WEAPONS)
+                best = (Card.VALID_SUSPECTS[suspect], Card.VALID_WEAPONS[weapon], room, float(scores.flat[index]))
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        return best
+
+    def _key(self, weights: np.ndarray, hand: int, room: str) -> bytes:
+        digest = hashlib.blake2b(np.ascontiguousarray(weights, dtype=np.float64).tobytes(), digest_size=16)
+        digest.update(int(hand).to_bytes(4, "big"))
+        digest.update(room.encode())
+        return digest.digest()
@@ -0,0 +1,26 @@
+from Backend.cardGroupings.Card import Card
+from Backend.GameEngine.board import BoardGraph
+
+
+class Player():
+    playerName: str
+    playerID: int
+    character: str
+    playerHand: int  # card bitset, see Card.get_mask
+    currLocation: int  # space id on the board graph
+    prevLocation: int
+
+    def __init__(self, name: str, playerID: int = None):
+        self.playerName = name
+        self.playerID = playerID
+        self.character = None
+        self.playerHand = 0
+        self.currLocation = None
+        self.prevLocation = None
+
+    def receive_card_dealt(self, card: Card):
+        self.playerHand |= card.get_mask()
+
+    def get_valid_moves(self, board: BoardGraph, occupied: int = 0):
+        # returns a list of space ids the player can move to
+        return board.spaces_of(board.valid_moves(self.currLocation, occupied))
@@ -0,0 +1,35 @@
+from Backend.GameEngine.Actions import Actions, Accusation, Move, Suggestion
+from Backend.GameEngine.player import Player
+
+
+class Player_Turn():
+    p: Player
+    hasMoved: bool
+    hasMadeSuggestion: bool
+    hasMadeAccusation: bool
+
+    def __init__(self, player: Player):
+        self.p = player
+        self.hasMoved = False
+        self.hasMadeSuggestion = False
+        self.hasMadeAccusation = False
+
+    def get_valid_actions(self, game) -> list:
+        # returns the names of the actions the player can still take this turn
+        returnList = []
+        if not self.hasMoved and not self.hasMadeSuggestion and self.p.get_valid_moves(game.board, game.occupied_hallways):
+            returnList.append(Move.__name__)
+        if not self.hasMadeSuggestion and game.board.is_room(self.p.currLocation):
+            returnList.append(Suggestion.__name__)
+        if not self.hasMadeAccusation:
+            returnList.append(Accusation.__name__)
+        return returnList
+
+    def take_action(self, action: Actions, game) -> dict:
+        action.validate(game)
+        return action.perform_action(game)
+
+    def end_turn(self):
+        self.hasMoved = False
+        self.hasMadeSuggestion = False
+        self.hasMadeAccusation = False
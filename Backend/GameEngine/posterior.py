@@ -0,0 +1,184 @@
+"""
+Probability of every possible envelope, for many observers at once.
+
+There are 6 x 6 x 9 = 324 possible envelopes. A Posterior keeps one weight per
+envelope for every observer (a row), as one (observers x 324) array, and every
+observation multiplies the rows it concerns by the likelihood of that observation
+under each envelope. Rows may belong to different games, so one update covers
+many observers and many games in a single array operation.
+
+The likelihoods assume the cards outside the envelope are dealt uniformly, as
+deal_game deals them. Given an envelope, the suggested cards an observer does
+not hold are k cards spread over the N cards the observer has not seen. The H
+cards held by the seats that could not disprove include none of them with
+probability C(N - k, H) / C(N, H), and the disprover's h cards then include at
+least one with probability 1 - C(N - H - k, h) / C(N - H, h). Envelopes ruled
+out outright (the observer's hand, a card shown to it, a wrong accusation, the
+suggested cards when nobody could disprove) get probability zero. Each
+likelihood is exact on its own; a sequence of observations is combined as if
+they were independent, which is what keeps the update one multiplication.
+"""
+import numpy as np
+
+from Backend.cardGroupings.Card import Card
+from Backend.GameEngine.deduction import hand_sizes
+
+N_CARDS = len(Card.ALL_CARDS)
+MAX_PLAYERS = len(Card.VALID_SUSPECTS)
+
+# Card bitset of every possible envelope, suspect-major, and its card membership
+ENVELOPES = np.array([Card.from_name(suspect).get_mask() | Card.from_name(weapon).get_mask()
+                      | Card.from_name(room).get_mask()
+                      for suspect in Card.VALID_SUSPECTS
+                      for weapon in Card.VALID_WEAPONS
+                      for room in Card.VALID_ROOMS], dtype=np.int64)
+MEMBERSHIP = ((ENVELOPES[:, None] >> np.arange(N_CARDS)) & 1).astype(np.float64)  # (324, 21)
+
+# COMB[n, r] = C(n, r), with 0 when r > n
+COMB = np.zeros((N_CARDS + 1, N_CARDS + 1))
+for _n in range(N_CARDS + 1):
+    COMB[_n, 0] = 1.0
+    for _r in range(1, _n + 1):
+        COMB[_n, _r] = COMB[_n - 1, _r - 1] + COMB[_n - 1, _r]
+
+
+def envelope_index(suspect: str, weapon: str, room: str) -> int:
+    """Return the position of an envelope in ENVELOPES."""
+    return (Card.VALID_SUSPECTS.index(suspect) * len(Card.VALID_WEAPONS)
+            + Card.VALID_WEAPONS.index(weapon)) * len(Card.VALID_ROOMS) + Card.VALID_ROOMS.index(room)
+
+
+def _one_hot(masks: np.ndarray) -> np.ndarray:
+    """Return the card membership of card bitsets, shape (len(masks), 21)."""
+    return ((masks[:, None] >> np.arange(N_CARDS)) & 1).astype(np.float64)
+
+
+class Posterior():
+    """
+    Envelope probabilities of a batch of observers.
+
+    Attributes:
+        weights (ndarray: float64): Normalized probability of each envelope for each
+            observer, shape (n_observers, 324).
+        n_players (ndarray: int64): Number of players in each observer's game.
+        seats (ndarray: int64): Seat of each observer, or -1 for a spectator.
+        hands (ndarray: int64): Card bitset of each observer's hand.
+        sizes (ndarray: int64): Hand size of every seat of each observer's game,
+            shape (n_observers, 6), 0 past the last seat.
+    """
+
+    def __init__(self, n_players, seats, hands):
+        """
+        Start every observer from its own hand.
+
+        Args:
+            n_players (int or sequence): Number of players in each observer's game.
+            seats (sequence: int): Seat of each observer, or -1 for a spectator.
+            hands (sequence: int): Card bitset of each observer's hand, 0 for a spectator.
+        """
+        self.seats = np.asarray(seats, dtype=np.int64)
+        self.n_players = np.broadcast_to(np.asarray(n_players, dtype=np.int64), self.seats.shape).copy()
+        self.hands = np.asarray(hands, dtype=np.int64)
+        if self.hands.shape != self.seats.shape:
+            raise ValueError("Give one hand per observer.")
+        if np.any((self.n_players < 2) | (self.n_players > MAX_PLAYERS)):
+            raise ValueError("Every game must have 2 to 6 players.")
+        self.sizes = np.zeros((len(self.seats), MAX_PLAYERS), dtype=np.int64)
+        for n in np.unique(self.n_players):
+            self.sizes[self.n_players == n, :n] = hand_sizes(int(n))
+
+        # Cards held by the other seats, which the observer has not seen
+        own_size = np.where(self.seats >= 0, self.sizes[np.arange(len(self.seats)), np.maximum(self.seats, 0)], 0)
+        self._unseen = N_CARDS - 3 - own_size
+
+        self.weights = np.ones((len(self.seats), len(ENVELOPES)))
+        self._update(np.arange(len(self.seats)), (ENVELOPES[None, :] & self.hands[:, None]) == 0)
+
+    def __len__(self) -> int:
+        return len(self.seats)
+
+    def observe_suggestion(self, rows, suggester, suggested, disprover, shown=0) -> None:
+        """
+        Update observers with the outcome of a suggestion.
+
+        Every argument is a scalar or an array with one entry per row, so rows of
+        different games can be updated together.
+
+        Args:
+            rows (sequence: int): Observers to update, or None for all of them.
+            suggester (int): Seat that made the suggestion.
+            suggested (int): Card bitset of the suggested cards.
+            disprover (int): Seat that disproved it, or -1 if nobody could.
+            shown (int): Card bitset of the card shown, if the observer saw it, else 0.
+
+        Raises:
+            ValueError: If the outcome is impossible for an observer.
+        """
+        rows = self._rows(rows)
+        suggester, suggested, disprover, shown = (np.broadcast_to(np.asarray(value, dtype=np.int64), rows.shape)
+                                                  for value in (suggester, suggested, disprover, shown))
+        seats = self.seats[rows]
+        n_players = self.n_players[rows]
+        sizes = self.sizes[rows]
+
+        # Seats asked and unable to disprove: after the suggester, before the disprover
+        seat_ids = np.arange(MAX_PLAYERS)[None, :]
+        offset = (seat_ids - suggester[:, None]) % n_players[:, None]
+        stop = np.where(disprover >= 0, (disprover - suggester) % n_players, n_players)
+        passed = (offset > 0) & (offset < stop[:, None]) & (seat_ids < n_players[:, None])
+        passed &= seat_ids != seats[:, None]
+        held = (sizes * passed).sum(axis=1)
+        # The disprover of an unseen card holds at least one suggested card; a seen card says nothing more
+        other = (disprover >= 0) & (disprover != seats) & (shown == 0)
+        disprover_size = np.where(other, sizes[np.arange(len(rows)), np.maximum(disprover, 0)], 0)
+
+        # k: suggested cards outside the observer's hand and outside each envelope, 0 to 3
+        outside = suggested & ~self.hands[rows]
+        k = (_one_hot(outside) @ (1.0 - MEMBERSHIP).T).astype(np.int64)  # (rows, 324)
+
+        # Likelihood of the outcome for each possible k, then looked up for every envelope
+        n = self._unseen[rows][:, None]
+        ks = np.arange(4)[None, :]
+        held = held[:, None]
+        rest = n - held
+        disprover_size = disprover_size[:, None]
+        by_k = COMB[np.maximum(n - ks, 0), held] / COMB[n, held]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            by_k *= np.where(other[:, None],
+                             1.0 - COMB[np.maximum(rest - ks, 0), disprover_size] / COMB[rest, disprover_size],
+                             1.0)
+        likelihood = np.take_along_axis(by_k, k, axis=1)
+        likelihood *= (ENVELOPES[None, :] & shown[:, None]) == 0
+        self._update(rows, likelihood)
+
+    def observe_accusation(self, rows, accused, correct) -> None:
+        """
+        Update observers with an accusation of a card bitset and whether it was correct.
+
+        Raises:
+            ValueError: If the outcome is impossible for an observer.
+        """
+        rows = self._rows(rows)
+        accused, correct = (np.broadcast_to(np.asarray(value), rows.shape) for value in (accused, correct))
+        match = ENVELOPES[None, :] == accused.astype(np.int64)[:, None]
+        self._update(rows, np.where(correct.astype(bool)[:, None], match, ~match))
+
+    def marginals(self, rows=None) -> np.ndarray:
+        """Return the probability of each card being in the envelope, shape (len(rows), 21)."""
+        return self.weights[self._rows(rows)] @ MEMBERSHIP
+
+    def most_likely(self, row: int) -> tuple:
+        """Return the most probable envelope of one observer as card names, and its probability."""
+        index = int(np.argmax(self.weights[row]))
+        return tuple(card.get_name() for card in Card.from_mask(int(ENVELOPES[index]))), float(self.weights[row, index])
+
+    def _rows(self, rows) -> np.ndarray:
+        return np.arange(len(self.seats)) if rows is None else np.asarray(rows, dtype=np.int64).reshape(-1)
+
+    def _update(self, rows: np.ndarray, likelihood: np.ndarray) -> None:
+        """Multiply the rows' weights by a likelihood and normalize them again."""
+        weights = self.weights[rows] * likelihood
+        totals = weights.sum(axis=1, keepdims=True)
+        if np.any(totals <= 0):
+            raise ValueError("An observation rules out every envelope.")
+        self.weights[rows] = weights / totals
@@ -0,0 +1,234 @@
+"""
+Monte Carlo simulation of complete games between bot policies.
+
+Games are played in chunks. Each chunk draws its game seeds from a generator seeded
+by the run's seed and the chunk's index, so a run plays the same games whatever the
+number of workers, and chunks are spread over a process pool. A worker sends back
+only the SimulationStats of its chunk, never the games, and the totals are merged
+as chunks complete, so memory stays flat however many games are played.
+"""
+import multiprocessing
+import time
+from collections import Counter
+from random import Random
+
+from Backend.cardGroupings.Card import Card
+from Backend.GameEngine.board import BoardGraph
+from Backend.GameEngine.bots import get_policy
+from Backend.GameEngine.engine import GameEngine
+
+GAME_ID = 0
+
+
+def play_game(board: BoardGraph, policies: list, game_seed: int, max_turns: int = 200) -> dict:
+    """
+    Play one game between bots to the end, or until max_turns turns have been played.
+
+    Characters are drawn at random for every game, so that win rates by seat and by
+    character can be told apart.
+
+    Args:
+        policies (list: type): Bot class of each seat, in turn order.
+
+    Returns:
+        dict: The winner's seat and character (None if nobody won), the characters by
+        seat, and the number of turns, suggestions and wrong accusations.
+    """
+    rng = Random(game_seed)
+    n_players = len(policies)
+    names = [f"seat{seat}" for seat in range(n_players)]
+    characters = rng.sample(Card.VALID_SUSPECTS, n_players)
+    engine = GameEngine()
+    game = engine.start_game(GAME_ID, names, board, game_seed=rng.getrandbits(64), characters=characters)
+    bots = [cls(seat, n_players, game.players[seat].playerHand, board, Random(rng.getrandbits(64)))
+            for seat, cls in enumerate(policies)]
+
+    suggestions = wrong_accusations = 0
+    while game.active and game.turn_counter < max_turns:
+        player = game.current_player()
+        name = player.playerName
+        bot = bots[player.playerID]
+
+        destinations = board.valid_moves(player.currLocation, game.occupied_hallways)
+        accusation = bot.choose_accusation()
+        if accusation is None and destinations:
+            destination = bot.choose_move(player.currLocation, destinations)
+            if destination is not None:
+                engine.move(GAME_ID, name, board.names[destination])
+        if accusation is None and board.is_room(player.currLocation):
+            room = board.names[player.currLocation]
+            suspect, weapon = bot.choose_suggestion(room)
+            result = engine.suggest(GAME_ID, name, suspect, weapon, room)
+            suggestions += 1
+            disprover = game.player_named(result['disprover']).playerID if result['disprover'] is not None else None
+            for other in bots:
+                other.observe_suggestion(player.playerID, suspect, weapon, room, disprover,
+                                         result['card'] if other is bot else None)
+            accusation = bot.choose_accusation()
+        if accusation is not None:
+            correct = engine.accuse(GAME_ID, name, *accusation)['correct']
+            if not correct:
+                wrong_accusations += 1
+                for other in bots:
+                    other.observe_accusation(player.playerID, *accusation, correct)
+            continue  # A wrong accusation passes the turn
+        engine.end_turn(GAME_ID, name)
+
+    winner = game.winner.playerID if game.winner is not None else None
+    return {
+        'winner': winner,
+        'character': characters[winner] if winner is not None else None,
+        'characters': characters,
+        'turns': game.turn_counter,
+        'suggestions': suggestions,
+        'wrong_accusations': wrong_accusations,
+    }
+
+
+class SimulationStats():
+    """
+    Running totals of simulated games.
+
+    Only counts and histograms are kept, so totals can be merged in any order and
+    their size does not grow with the number of games.
+
+    Attributes:
+        games (int): Games played.
+        unfinished (int): Games stopped at max_turns, or in which everyone was eliminated.
+        wins_by_seat (Counter): Games won by each seat.
+        wins_by_character (Counter): Games won by each character.
+        games_by_character (Counter): Games in which each character was played.
+        turns (Counter): Games by number of turns played.
+        suggestions (Counter): Games by number of suggestions made.
+        wrong_accusations (int): Wrong accusations made in all the games.
+        seconds (float): Time spent playing, summed over the workers.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.unfinished = 0
+        self.wins_by_seat = Counter()
+        self.wins_by_character = Counter()
+        self.games_by_character = Counter()
+        self.turns = Counter()
+        self.suggestions = Counter()
+        self.wrong_accusations = 0
+        self.seconds = 0.0
+
+    def add(self, result: dict) -> None:
+        """Count the result of play_game."""
+        self.games += 1
+        if result['winner'] is None:
+            self.unfinished += 1
+        else:
+            self.wins_by_seat[result['winner']] += 1
+            self.wins_by_character[result['character']] += 1
+        self.games_by_character.update(result['characters'])
+        self.turns[result['turns']] += 1
+        self.suggestions[result['suggestions']] += 1
+        self.wrong_accusations += result['wrong_accusations']
+
+    def merge(self, other: "SimulationStats") -> "SimulationStats":
+        """Add the totals of another run to these ones, and return them."""
+        self.games += other.games
+        self.unfinished += other.unfinished
+        self.wins_by_seat.update(other.wins_by_seat)
+        self.wins_by_character.update(other.wins_by_character)
+        self.games_by_character.update(other.games_by_character)
+        self.turns.update(other.turns)
+        self.suggestions.update(other.suggestions)
+        self.wrong_accusations += other.wrong_accusations
+        self.seconds += other.seconds
+        return self
+
+    def summary(self) -> dict:
+        """Return the rates and distributions, as JSON-serializable data."""
+        games = self.games or 1
+        return {
+            'games': self.games,
+            'unfinished_rate': self.unfinished / games,
+            'win_rate_by_seat': {seat: self.wins_by_seat[seat] / games for seat in sorted(self.wins_by_seat)},
+            'win_rate_by_character': {character: self.wins_by_character[character] / self.games_by_character[character]
+                                      for character in Card.VALID_SUSPECTS if self.games_by_character[character]},
+            'turns': _distribution(self.turns),
+            'suggestions': _distribution(self.suggestions),
+            'wrong_accusations_per_game': self.wrong_accusations / games,
+            'games_per_cpu_second': self.games / self.seconds if self.seconds else 0.0,
+        }
+
+
+def _distribution(histogram: Counter) -> dict:
+    """Return the mean, p50, p95 and max of a histogram of values."""
+    count = sum(histogram.values())
+    if not count:
+        return {'mean': 0.0, 'p50': 0, 'p95': 0, 'max': 0}
+    quantiles = {}
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        for name, q in (('p50', 0.5), ('p95', 0.95)):
+            if name not in quantiles and seen >= q * count:
+                quantiles[name] = value
+    return {
+        'mean': sum(value * n for value, n in histogram.items()) / count,
+        **quantiles,
+        'max': max(histogram),
+    }
+
+
+def play_chunk(task: tuple) -> SimulationStats:
+    """
+    Play one chunk of games and return their totals. Runs in the pool's workers.
+
+    Args:
+        task (tuple): The run's seed, the chunk's index, the number of games, the
+            policy names of each seat and max_turns.
+    """
+    seed, chunk, games, policy_names, max_turns = task
+    start = time.process_time()
+    board = BoardGraph.standard()
+    policies = [get_policy(name) for name in policy_names]
+    rng = Random(f"{seed}:{chunk}")
+    stats = SimulationStats()
+    for _ in range(games):
+        stats.add(play_game(board, policies, rng.getrandbits(64), max_turns))
+    stats.seconds = time.process_time() - start
+    return stats
+
+
+def simulate(games: int, policy_names: list, seed: int = 0, workers: int = 1, chunk_size: int = 500,
+             max_turns: int = 200):
+    """
+    Play games between bots and yield the running totals as each chunk completes.
+
+    Args:
+        games (int): Number of games to play.
+        policy_names (list: str): Policy of each seat, in turn order (see bots.get_policy).
+        seed (int): Seed of the whole run.
+        workers (int): Worker processes; with 1 the games are played in this process.
+        chunk_size (int): Games per chunk handed to a worker.
+        max_turns (int): Turns after which a game is stopped unfinished.
+
+    Yields:
+        SimulationStats: The totals of every chunk completed so far.
+
+    Raises:
+        ValueError: If a policy is unknown or the numbers are not valid.
+    """
+    if not 2 <= len(policy_names) <= len(Card.VALID_SUSPECTS):
+        raise ValueError(f"{len(policy_names)} is not a valid number of players.")
+    if games < 0 or workers < 1 or chunk_size < 1:
+        raise ValueError("games, workers and chunk_size must be positive.")
+    for name in policy_names:
+        get_policy(name)  # Fail here rather than in a worker
+
+    tasks = [(seed, chunk, min(chunk_size, games - start), list(policy_names), max_turns)
+             for chunk, start in enumerate(range(0, games, chunk_size))]
+    totals = SimulationStats()
+    if workers == 1:
+        for task in tasks:
+            yield totals.merge(play_chunk(task))
+        return
+    with multiprocessing.Pool(workers) as pool:
+        for stats in pool.imap_unordered(play_chunk, tasks):
+            yield totals.merge(stats)
@@ -0,0 +1,120 @@
+from random import Random
+import pytest
+from Backend.cardGroupings.Card import Card
+from Backend.cardGroupings.Dealer import deal_game
+from Backend.GameEngine.deduction import Knowledge, TYPE_MASKS, bits, hand_sizes
+from Backend.GameEngine.disproval import DisprovalResolver, suggestion_mask
+
+def deal(n_players, rng):
+    """Deal a game from the next seed of rng, as card bitsets."""
+    envelope, hands = deal_game(n_players, rng.getrandbits(64))
+    return envelope.get_mask(), [hand.get_mask() for hand in hands]
+
+def mask(*names):
+    return Card.mask_of(Card.from_name(name) for name in names)
+
+def test_hand_sizes_match_the_deal():
+    for n_players in range(2, 7):
+        _, hands = deal(n_players, Random(n_players))
+        assert hand_sizes(n_players) == [hand.bit_count() for hand in hands]
+
+HAND = ("Rope", "Hall", "Colonel Mustard", "Dagger", "Study", "Lounge")
+
+def test_own_hand_is_lacked_by_everyone_else():
+    knowledge = Knowledge(3)
+    knowledge.observe_hand(0, mask(*HAND))
+    assert knowledge.state(0, Card.from_name("Rope")) is True
+    assert knowledge.state(0, Card.from_name("Kitchen")) is False
+    assert knowledge.state(1, Card.from_name("Rope")) is False
+    assert knowledge.state(knowledge.envelope, Card.from_name("Hall")) is False
+    assert knowledge.state(1, Card.from_name("Kitchen")) is None
+
+def test_players_asked_before_the_disprover_lack_the_cards():
+    knowledge = Knowledge(4)
+    knowledge.observe_suggestion(0, mask("Mrs. White", "Rope", "Kitchen"), 3)
+    for name in ("Mrs. White", "Rope", "Kitchen"):
+        assert knowledge.state(1, Card.from_name(name)) is False
+        assert knowledge.state(2, Card.from_name(name)) is False
+        assert knowledge.state(3, Card.from_name(name)) is None
+
+def test_unseen_disproval_resolves_once_other_cards_are_lacked():
+    knowledge = Knowledge(3)
+    knowledge.observe_suggestion(1, mask("Mrs. White", "Rope", "Kitchen"), 2)
+    assert knowledge.state(2, Card.from_name("Rope")) is None
+    knowledge.observe_lacks(2, Card.from_name("Mrs. White"))
+    knowledge.observe_lacks(2, Card.from_name("Kitchen"))
+    assert knowledge.state(2, Card.from_name("Rope")) is True
+    assert knowledge.state(0, Card.from_name("Rope")) is False
+
+def test_undisproved_suggestion_reveals_the_envelope():
+    knowledge = Knowledge(3)
+    knowledge.observe_hand(0, mask(*HAND))
+    knowledge.observe_suggestion(0, mask("Mrs. White", "Rope", "Kitchen"), None)
+    candidates = knowledge.envelope_candidates()
+    assert candidates & Card.SUSPECT_MASK == mask("Mrs. White")
+    assert candidates & Card.ROOM_MASK == mask("Kitchen")
+    assert (candidates & Card.WEAPON_MASK).bit_count() == 4  # Holding the Rope says nothing
+    assert knowledge.solution_count() == 4
+
+def test_wrong_accusations_are_excluded():
+    knowledge = Knowledge(3)
+    knowledge.observe_accusation(mask("Mrs. White", "Rope", "Kitchen"), False)
+    assert knowledge.solution_count() == 6 * 6 * 9 - 1
+    assert mask("Mrs. White", "Rope", "Kitchen") not in knowledge.solutions()
+    knowledge.observe_has(knowledge.envelope, Card.from_name("Mrs. White"))
+    knowledge.observe_has(knowledge.envelope, Card.from_name("Rope"))
+    assert knowledge.state(knowledge.envelope, Card.from_name("Kitchen")) is False
+
+def test_correct_accusation_solves():
+    knowledge = Knowledge(3)
+    knowledge.observe_accusation(mask("Mrs. White", "Rope", "Kitchen"), True)
+    assert knowledge.solution() == mask("Mrs. White", "Rope", "Kitchen")
+
+def test_hand_of_the_wrong_size_raises():
+    with pytest.raises(ValueError):
+        Knowledge(3).observe_hand(0, mask("Rope"))
+
+def test_contradiction_raises():
+    knowledge = Knowledge(3)
+    knowledge.observe_has(1, Card.from_name("Rope"))
+    with pytest.raises(ValueError, match="Rope is known to be both held and not held."):
+        knowledge.observe_has(2, Card.from_name("Rope"))
+
+def test_rejected_observation_leaves_the_knowledge_unchanged():
+    knowledge = Knowledge(3)
+    knowledge.observe_suggestion(0, mask("Mrs. White", "Rope", "Kitchen"), 1)
+    knowledge.observe_has(0, Card.from_name("Rope"))
+    knowledge.observe_accusation(mask("Mrs. White", "Wrench", "Kitchen"), False)
+    before = (knowledge.has[:], knowledge.lacks[:], knowledge.solutions())
+    # Nobody disproving would leave seat 1 without any of the cards it disproved before
+    with pytest.raises(ValueError):
+        knowledge.observe_suggestion(0, mask("Mrs. White", "Rope", "Kitchen"), None)
+    assert (knowledge.has, knowledge.lacks, knowledge.solutions()) == before
+
+    knowledge.observe_lacks(1, Card.from_name("Mrs. White"))
+    knowledge.observe_lacks(1, Card.from_name("Rope"))
+    assert knowledge.state(1, Card.from_name("Kitchen")) is True
+    assert knowledge.state(knowledge.envelope, Card.from_name("Wrench")) is None
+
+def test_never_rules_out_the_envelope():
+    """Random games: the knowledge stays sound and always keeps the real envelope."""
+    rng = Random(42)
+    for n_players in (3, 4, 6):
+        for _ in range(30):
+            envelope, hands = deal(n_players, rng)
+            resolver = DisprovalResolver(hands)
+            knowledge = Knowledge(n_players)
+            knowledge.observe_hand(0, hands[0])
+            for _ in range(60):
+                suggester = rng.randrange(n_players)
+                suggested = suggestion_mask(rng.choice(Card.VALID_SUSPECTS), rng.choice(Card.VALID_WEAPONS),
+                                            rng.choice(Card.VALID_ROOMS))
+                disprover, matching = resolver.resolve(suggester, suggested)
+                shown = Card.from_mask(matching)[0] if suggester == 0 and matching else None
+                knowledge.observe_suggestion(suggester, suggested, disprover, shown)
+            assert envelope in knowledge.solutions()
+            for owner, hand in enumerate(list(hands) + [envelope]):
+                assert knowledge.has[owner] & ~hand == 0
+                assert knowledge.lacks[owner] & hand == 0
+            assert all((envelope & type_mask) in bits(knowledge.envelope_candidates() & type_mask)
+                       for type_mask in TYPE_MASKS)
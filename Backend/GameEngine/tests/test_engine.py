@@ -0,0 +1,121 @@
+import subprocess
+import sys
+from random import Random
+import pytest
+from Backend.cardGroupings.Card import Card
+from Backend.GameEngine.board import BoardGraph
+from Backend.GameEngine.engine import GameEngine, GameState
+
+@pytest.fixture
+def board():
+    return BoardGraph.standard()
+
+@pytest.fixture
+def engine():
+    return GameEngine()
+
+@pytest.fixture
+def game(engine, board):
+    """Fixture to start a three player game with a fixed deal."""
+    return engine.start_game(1, ["alice", "bob", "carol"], board, game_seed=11)
+
+def envelope_names(game):
+    suspect, weapon, room = (card.get_name() for card in Card.from_mask(game.envelope))
+    return suspect, weapon, room
+
+def wrong_accusation(game):
+    suspect, weapon, room = envelope_names(game)
+    other = next(name for name in Card.VALID_ROOMS if name != room)
+    return suspect, weapon, other
+
+def test_engine_does_not_import_django():
+    code = ("import sys, Backend.GameEngine.engine; "
+            "print(sorted(m for m in sys.modules if m.split('.')[0] in ('django', 'channels', 'asgiref')))")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
+
+def test_deal_covers_every_card_once(game):
+    hands = [player.playerHand for player in game.players]
+    assert sum(hands) + game.envelope == Card.ALL_MASK
+    assert all(a & b == 0 for i, a in enumerate(hands) for b in hands[i + 1:])
+    assert Card.from_mask(game.envelope)[0].get_name() in Card.VALID_SUSPECTS
+
+def test_movement_follows_the_board(engine, game, board):
+    with pytest.raises(ValueError, match="You cannot move to the Kitchen."):
+        engine.move(1, "alice", "Kitchen")
+    engine.move(1, "alice", "Lounge")
+    assert game.players[0].currLocation == board.space_id("Lounge")
+    with pytest.raises(ValueError, match="You have already moved this turn."):
+        engine.move(1, "alice", "Hall-Lounge Hallway")
+
+def test_suggestion_brings_the_suspect_and_is_disproved_in_turn_order(engine, game, board):
+    engine.move(1, "alice", "Hall")
+    result = engine.suggest(1, "alice", "Mrs. Peacock", "Rope", "Hall")
+    assert game.player_for_character("Mrs. Peacock").currLocation == board.space_id("Hall")
+    seat, matching = game.resolver.resolve(0, Card.mask_of(Card.from_name(name)
+                                                           for name in ("Mrs. Peacock", "Rope", "Hall")))
+    if seat is None:
+        assert result['disprover'] is None and result['card'] is None
+    else:
+        assert result['disprover'] == game.players[seat].playerName
+        assert Card.from_name(result['card']).get_mask() & matching
+
+def test_wrong_accusation_eliminates_and_passes_the_turn(engine, game):
+    result = engine.accuse(1, "alice", *wrong_accusation(game))
+    assert result['correct'] is False
+    assert game.eliminated == {0}
+    assert game.current_player().playerName == "bob"
+    engine.end_turn(1, "bob")
+    engine.end_turn(1, "carol")
+    assert game.current_player().playerName == "bob"  # Eliminated players are skipped
+
+def test_last_player_standing_wins(engine, game):
+    engine.accuse(1, "alice", *wrong_accusation(game))
+    engine.accuse(1, "bob", *wrong_accusation(game))
+    assert not game.active
+    assert game.winner.playerName == "carol"
+
+def test_correct_accusation_wins(engine, game):
+    result = engine.accuse(1, "alice", *envelope_names(game))
+    assert result['winner'] == "alice"
+    assert not engine.is_live(1)
+    with pytest.raises(ValueError, match="Game 1 is not live."):
+        engine.end_turn(1, "bob")
+
+def test_state_round_trip(engine, game, board):
+    engine.move(1, "alice", "Hall")
+    copy = GameState.from_dict(game.to_dict(), board)
+    assert copy.to_dict() == game.to_dict()
+
+def test_complete_games(board):
+    """Play whole games with players who suggest what they have not seen and accuse once sure."""
+    for game_seed in range(50):
+        engine = GameEngine()
+        game = engine.start_game(1, ["alice", "bob", "carol", "dave"], board, game_seed=game_seed)
+        rng = Random(game_seed)
+        seen = {player.playerName: player.playerHand for player in game.players}
+        while game.active and game.turn_counter < 1000:
+            player = game.current_player()
+            name = player.playerName
+            unseen = Card.ALL_MASK & ~seen[name]
+            if unseen.bit_count() == 3:
+                engine.accuse(1, name, *(card.get_name() for card in Card.from_mask(unseen)))
+                continue
+            moves = board.spaces_of(board.valid_moves(player.currLocation, game.occupied_hallways))
+            if moves:
+                engine.move(1, name, board.names[rng.choice(moves)])
+            if board.is_room(player.currLocation):
+                suggested = [Card.from_mask(unseen & Card.SUSPECT_MASK)[0], Card.from_mask(unseen & Card.WEAPON_MASK)[0],
+                             Card.from_name(board.names[player.currLocation])]
+                result = engine.suggest(1, name, *(card.get_name() for card in suggested))
+                if result['card'] is not None:
+                    seen[name] |= Card.from_name(result['card']).get_mask()
+                else:
+                    # Nobody could disprove it, so every suggested card this player lacks is in the envelope
+                    for card, type_mask in zip(suggested, (Card.SUSPECT_MASK, Card.WEAPON_MASK, Card.ROOM_MASK)):
+                        if card.get_mask() & unseen:
+                            seen[name] |= type_mask & ~card.get_mask()
+            engine.end_turn(1, name)
+        assert not game.active
+        assert game.winner is not None
+        assert game.eliminated == set()
@@ -0,0 +1,85 @@
+from collections import deque
+import pytest
+from Backend.GameEngine.board import BoardGraph, hallway_name
+from Backend.GameEngine.paths import UNREACHABLE, PathTable, path_table
+
+@pytest.fixture
+def board():
+    """The standard board."""
+    return BoardGraph.standard()
+
+def search(board, start):
+    """Moves from one space to every other, by a plain breadth-first search."""
+    distance = {start: 0}
+    queue = deque([start])
+    while queue:
+        space = queue.popleft()
+        for neighbor in board.spaces_of(board.adjacency[space]):
+            if neighbor not in distance:
+                distance[neighbor] = distance[space] + 1
+                queue.append(neighbor)
+    return distance
+
+def test_distances_match_a_search(board):
+    table = PathTable.build(board)
+    for start in range(len(board)):
+        expected = search(board, start)
+        assert [table.distance(start, end) for end in range(len(board))] == [expected[end] for end in range(len(board))]
+
+def test_next_hops_follow_shortest_paths(board):
+    table = PathTable.build(board)
+    for start in range(len(board)):
+        for end in range(len(board)):
+            path = table.path(start, end)
+            assert len(path) == table.distance(start, end) + 1
+            assert all(board.adjacency[a] >> b & 1 for a, b in zip(path, path[1:]))
+
+def test_hint_lookups(board):
+    table = path_table(board)
+    study, kitchen, lounge = (board.space_id(name) for name in ("Study", "Kitchen", "Lounge"))
+    assert table.distance(study, kitchen) == 1  # Secret passage
+    assert table.path(study, kitchen) == [study, kitchen]
+    assert table.distance(study, lounge) == 4
+    assert board.names[table.next_hop(study, lounge)] == hallway_name("Study", "Hall")
+    assert path_table(board) is table
+
+def test_distances_to_the_nearest_target(board):
+    table = path_table(board)
+    targets = 1 << board.space_id("Kitchen") | 1 << board.space_id("Hall")
+    distances = table.distances_to(targets)
+    assert distances[board.space_id("Study")] == 1
+    assert distances[board.space_id("Lounge")] == 2
+    assert table.distances_to(0) == (UNREACHABLE,) * len(board)
+
+def test_blob_round_trip(board):
+    table = path_table(board)
+    blob = table.to_bytes()
+    assert len(blob) == 22 + 2 * len(board) ** 2
+    loaded = PathTable.from_bytes(blob, board)
+    assert (loaded.distances, loaded.next_hops) == (table.distances, table.next_hops)
+
+def test_blob_of_another_board_is_refused(board):
+    blob = path_table(board).to_bytes()
+    other = BoardGraph([("Study", True, ("Kitchen",)), ("Kitchen", True, ())])
+    with pytest.raises(ValueError, match="The path table was built from another board."):
+        PathTable.from_bytes(blob, other)
+    with pytest.raises(ValueError, match="The blob is not a path table."):
+        PathTable.from_bytes(blob[:-1])
+
+def test_boards_over_64_spaces():
+    # A ring of 70 spaces
+    board = BoardGraph([(f"Space {i}", i % 10 == 0, (f"Space {(i + 1) % 70}",)) for i in range(70)])
+    table = PathTable.build(board)
+    assert table.distance(0, 35) == 35 and table.distance(0, 69) == 1
+    assert PathTable.from_bytes(table.to_bytes(), board).distances == table.distances
+
+def test_disconnected_spaces():
+    table = PathTable.build(BoardGraph([("Study", True, ()), ("Kitchen", True, ())]))
+    assert table.distance(0, 1) == UNREACHABLE
+    assert table.next_hop(0, 1) == UNREACHABLE
+    with pytest.raises(ValueError, match="Space 1 cannot be reached from space 0."):
+        table.path(0, 1)
+
+def test_table_is_immutable(board):
+    with pytest.raises(AttributeError):
+        path_table(board).size = 0
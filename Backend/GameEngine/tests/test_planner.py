@@ -0,0 +1,108 @@
+import math
+from collections import defaultdict
+from random import Random
+import numpy as np
+import pytest
+from Backend.cardGroupings.Card import Card
+from Backend.cardGroupings.Dealer import deal_game
+from Backend.GameEngine.disproval import DisprovalResolver, suggestion_mask
+from Backend.GameEngine.planner import SuggestionPlanner, information_gain
+from Backend.GameEngine.posterior import ENVELOPES, Posterior, envelope_index
+from Backend.GameEngine.simulator import play_chunk
+
+def deal(n_players, rng):
+    """Deal a game from the next seed of rng, as card bitsets."""
+    envelope, hands = deal_game(n_players, rng.getrandbits(64))
+    return envelope.get_mask(), [hand.get_mask() for hand in hands]
+
+@pytest.fixture
+def seat():
+    """Seat 0 of a four player game after 8 suggestions: its envelope probabilities and hand."""
+    rng = Random(2)
+    _, hands = deal(4, rng)
+    resolver = DisprovalResolver(hands)
+    posterior = Posterior(4, [0], [hands[0]])
+    for _ in range(8):
+        suggester = rng.randrange(4)
+        mask = suggestion_mask(rng.choice(Card.VALID_SUSPECTS), rng.choice(Card.VALID_WEAPONS),
+                               rng.choice(Card.VALID_ROOMS))
+        disprover, matching = resolver.resolve(suggester, mask)
+        posterior.observe_suggestion(None, suggester, mask, -1 if disprover is None else disprover,
+                                     matching & -matching if suggester == 0 else 0)
+    return posterior.weights[0], hands[0]
+
+def mutual_information(weights, hand, suspect, weapon, room):
+    """The gain of one suggestion, from the joint distribution of envelope and outcome."""
+    cards = [Card.from_name(name).get_mask() for name in (suspect, weapon, room)]
+    joint = defaultdict(float)
+    for envelope, p in zip(ENVELOPES.tolist(), weights):
+        showable = [card for card in cards if not card & (hand | envelope)]
+        for card in showable or [None]:
+            joint[envelope, card] += p / max(len(showable), 1)
+    outcomes = defaultdict(float)
+    for (_, card), p in joint.items():
+        outcomes[card] += p
+    return sum(p * math.log2(p / (weights[list(ENVELOPES).index(envelope)] * outcomes[card]))
+               for (envelope, card), p in joint.items() if p > 0)
+
+def test_gains_match_mutual_information(seat):
+    weights, hand = seat
+    for room in ("Kitchen", "Hall"):
+        gains = information_gain(weights, hand, room)
+        assert gains.shape == (6, 6)
+        for suspect, weapon in (("Miss Scarlet", "Rope"), ("Mrs. White", "Dagger"), ("Professor Plum", "Wrench")):
+            expected = mutual_information(weights, hand, suspect, weapon, room)
+            assert gains[Card.VALID_SUSPECTS.index(suspect), Card.VALID_WEAPONS.index(weapon)] \
+                == pytest.approx(expected, abs=1e-9)
+
+def test_known_envelope_teaches_nothing():
+    weights = np.zeros(len(ENVELOPES))
+    weights[envelope_index("Mrs. White", "Rope", "Kitchen")] = 1.0
+    assert np.all(information_gain(weights, 0, "Study") == 0.0)
+
+def test_held_cards_teach_nothing():
+    weights = np.full(len(ENVELOPES), 1 / len(ENVELOPES))
+    hand = Card.SUSPECT_MASK | Card.WEAPON_MASK | Card.from_name("Study").get_mask()
+    assert information_gain(weights, hand, "Study").max() == pytest.approx(0.0, abs=1e-12)
+    assert information_gain(weights, hand, "Kitchen").min() > 0.01
+
+def test_choose_caches_by_state(seat):
+    weights, hand = seat
+    planner = SuggestionPlanner()
+    suspect, weapon, room, gain = planner.choose(weights, hand, "Kitchen")
+    assert room == "Kitchen"
+    assert gain == pytest.approx(information_gain(weights, hand, "Kitchen").max())
+    assert gain == information_gain(weights, hand, "Kitchen")[Card.VALID_SUSPECTS.index(suspect),
+                                                                Card.VALID_WEAPONS.index(weapon)]
+    assert planner.choose(weights.copy(), hand, "Kitchen") == (suspect, weapon, room, gain)
+    assert (planner.hits, planner.misses) == (1, 1)
+    planner.choose(weights, hand, "Hall")
+    assert (planner.hits, planner.misses) == (1, 2)
+
+def test_cache_size_is_bounded(seat):
+    weights, hand = seat
+    planner = SuggestionPlanner(cache_size=2)
+    planner.choose(weights, hand, Card.VALID_ROOMS)
+    assert len(planner._cache) == 2
+    planner.choose(weights, hand, Card.VALID_ROOMS[-1])
+    assert planner.hits == 1
+
+def test_choose_picks_the_best_room(seat):
+    weights, hand = seat
+    planner = SuggestionPlanner()
+    _, _, room, gain = planner.choose(weights, hand, Card.VALID_ROOMS)
+    assert gain == pytest.approx(max(information_gain(weights, hand, name).max() for name in Card.VALID_ROOMS))
+    assert room == max(Card.VALID_ROOMS, key=lambda name: information_gain(weights, hand, name).max())
+
+def test_budget_scores_the_first_room_at_least(seat):
+    weights, hand = seat
+    planner = SuggestionPlanner()
+    _, _, room, _ = planner.choose(weights, hand, ["Lounge", "Hall", "Study"], budget=0.0)
+    assert room == "Lounge"
+    assert planner.misses == 1
+    with pytest.raises(ValueError, match="Give at least one room."):
+        planner.choose(weights, hand, [])
+
+def test_planners_never_accuse_wrongly():
+    stats = play_chunk((4, 0, 30, ["planner", "deducer", "planner"], 1000))
+    assert stats.wrong_accusations == 0 and stats.unfinished == 0
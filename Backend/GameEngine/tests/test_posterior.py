@@ -0,0 +1,106 @@
+from random import Random
+import numpy as np
+import pytest
+from Backend.cardGroupings.Card import Card
+from Backend.cardGroupings.Dealer import deal_game
+from Backend.GameEngine.disproval import DisprovalResolver, suggestion_mask
+from Backend.GameEngine.posterior import ENVELOPES, Posterior, envelope_index
+
+SUGGESTION = suggestion_mask("Mrs. White", "Rope", "Kitchen")
+
+def deal(n_players, rng):
+    """Deal a game from the next seed of rng, as card bitsets."""
+    envelope, hands = deal_game(n_players, rng.getrandbits(64))
+    return envelope.get_mask(), [hand.get_mask() for hand in hands]
+
+def ordinal(name):
+    return Card.from_name(name).get_ordinal()
+
+def test_envelopes():
+    assert len(ENVELOPES) == 6 * 6 * 9
+    assert ENVELOPES[envelope_index("Mrs. White", "Rope", "Kitchen")] == SUGGESTION
+
+def test_spectator_starts_uniform():
+    marginals = Posterior(4, [-1], [0]).marginals()[0]
+    assert marginals[ordinal("Miss Scarlet")] == pytest.approx(1 / 6)
+    assert marginals[ordinal("Kitchen")] == pytest.approx(1 / 9)
+    assert marginals.sum() == pytest.approx(3.0)
+
+def test_own_hand_is_never_in_the_envelope():
+    hand = suggestion_mask("Miss Scarlet", "Dagger", "Hall")
+    marginals = Posterior(3, [0], [hand]).marginals()[0]
+    assert marginals[ordinal("Miss Scarlet")] == 0.0
+    assert marginals[ordinal("Mrs. White")] == pytest.approx(1 / 5)
+
+def test_undisproved_suggestion_is_certain():
+    hand = suggestion_mask("Miss Scarlet", "Dagger", "Hall") | suggestion_mask("Mr. Green", "Wrench", "Study")
+    posterior = Posterior(4, [1], [hand & ~Card.from_name("Study").get_mask()])
+    posterior.observe_suggestion(None, 1, SUGGESTION, -1)
+    assert posterior.most_likely(0) == (("Mrs. White", "Rope", "Kitchen"), pytest.approx(1.0))
+
+def test_shown_card_is_ruled_out():
+    posterior = Posterior(4, [0], [0])
+    posterior.observe_suggestion(None, 0, SUGGESTION, 1, Card.from_name("Rope").get_mask())
+    assert posterior.marginals()[0][ordinal("Rope")] == 0.0
+
+def test_matches_monte_carlo():
+    """A spectator's marginals after one suggestion match the frequencies over random deals."""
+    rng = Random(1)
+    counts = {disprover: np.zeros(21) for disprover in (None, 0, 1, 2)}
+    for _ in range(40000):
+        envelope, hands = deal(4, rng)
+        disprover, _ = DisprovalResolver(hands).resolve(3, SUGGESTION)
+        for card in Card.from_mask(envelope):
+            counts[disprover][card.get_ordinal()] += 1
+    for disprover, count in counts.items():
+        posterior = Posterior(4, [-1], [0])
+        posterior.observe_suggestion(None, 3, SUGGESTION, -1 if disprover is None else disprover)
+        expected = count / (count.sum() / 3)
+        assert np.abs(posterior.marginals()[0] - expected).max() < 0.05, disprover
+
+def test_accusations():
+    posterior = Posterior(4, [-1, -1], [0, 0])
+    posterior.observe_accusation([0, 1], SUGGESTION, [False, True])
+    assert posterior.weights[0, envelope_index("Mrs. White", "Rope", "Kitchen")] == 0.0
+    assert posterior.weights[1, envelope_index("Mrs. White", "Rope", "Kitchen")] == pytest.approx(1.0)
+    with pytest.raises(ValueError, match="An observation rules out every envelope."):
+        posterior.observe_accusation([1], SUGGESTION, False)
+
+def test_batched_updates_match_single_ones():
+    """Observers of different games updated together end up as if updated one at a time."""
+    rng = Random(7)
+    games = [deal(n_players, rng) for n_players in (3, 4, 6)]
+    rows = [(n_players, seat, hands[seat]) for (_, hands), n_players in zip(games, (3, 4, 6))
+            for seat in range(n_players)]
+    batch = Posterior(*zip(*rows))
+    singles = [Posterior(n_players, [seat], [hand]) for n_players, seat, hand in rows]
+    for _ in range(25):
+        events = []
+        for (_, hands) in games:
+            suggester = rng.randrange(len(hands))
+            mask = suggestion_mask(rng.choice(Card.VALID_SUSPECTS), rng.choice(Card.VALID_WEAPONS),
+                                   rng.choice(Card.VALID_ROOMS))
+            disprover, matching = DisprovalResolver(hands).resolve(suggester, mask)
+            events += [(suggester, mask, -1 if disprover is None else disprover,
+                        matching & -matching if seat == suggester else 0) for seat in range(len(hands))]
+        batch.observe_suggestion(None, *zip(*events))
+        for single, event in zip(singles, events):
+            single.observe_suggestion(None, *event)
+    for row, single in enumerate(singles):
+        np.testing.assert_allclose(batch.weights[row], single.weights[0])
+
+def test_never_rules_out_the_envelope():
+    rng = Random(3)
+    for _ in range(20):
+        envelope, hands = deal(4, rng)
+        resolver = DisprovalResolver(hands)
+        posterior = Posterior(4, range(4), hands)
+        for _ in range(30):
+            suggester = rng.randrange(4)
+            mask = suggestion_mask(rng.choice(Card.VALID_SUSPECTS), rng.choice(Card.VALID_WEAPONS),
+                                   rng.choice(Card.VALID_ROOMS))
+            disprover, matching = resolver.resolve(suggester, mask)
+            shown = [matching & -matching if seat == suggester else 0 for seat in range(4)]
+            posterior.observe_suggestion(None, suggester, mask, -1 if disprover is None else disprover, shown)
+        assert np.all(posterior.weights[:, list(ENVELOPES).index(envelope)] > 0)
+        assert np.all(posterior.marginals()[:, [card.get_ordinal() for card in Card.from_mask(envelope)]] > 0)
@@ -0,0 +1,82 @@
+import pytest
+from Backend.cardGroupings.Card import Card
+from Backend.GameEngine.board import BoardGraph
+from Backend.GameEngine.bots import Bot, RandomBot, SeekerBot, get_policy
+from Backend.GameEngine.simulator import SimulationStats, play_chunk, play_game, simulate
+
+def test_get_policy():
+    assert get_policy("seeker") is SeekerBot
+    assert get_policy("Backend.GameEngine.bots:RandomBot") is RandomBot
+    with pytest.raises(ValueError, match="genius is not a bot policy."):
+        get_policy("genius")
+    with pytest.raises(ValueError, match="Backend.GameEngine.bots:get_policy is not a bot policy."):
+        get_policy("Backend.GameEngine.bots:get_policy")
+
+def test_bot_learns_from_undisproved_suggestion():
+    hand = Card.from_name("Rope").get_mask() | Card.from_name("Hall").get_mask()
+    bot = Bot(0, 3, hand, BoardGraph.standard(), None)
+    bot.observe_suggestion(0, "Mrs. White", "Rope", "Kitchen", None, None)
+    assert bot.candidates & Card.SUSPECT_MASK == Card.from_name("Mrs. White").get_mask()
+    assert bot.candidates & Card.ROOM_MASK == Card.from_name("Kitchen").get_mask()
+    assert (bot.candidates & Card.WEAPON_MASK).bit_count() == 5  # Holding the Rope says nothing
+
+def test_bot_only_learns_shown_cards_of_its_own_suggestions():
+    bot = Bot(0, 3, 0, BoardGraph.standard(), None)
+    bot.observe_suggestion(1, "Mrs. White", "Rope", "Kitchen", 2, None)
+    assert bot.candidates == Card.ALL_MASK
+    bot.observe_suggestion(0, "Mrs. White", "Rope", "Kitchen", 2, "Rope")
+    assert bot.candidates == Card.ALL_MASK & ~Card.from_name("Rope").get_mask()
+
+def test_play_game_is_reproducible():
+    board = BoardGraph.standard()
+    first = play_game(board, [SeekerBot, RandomBot, SeekerBot], game_seed=7)
+    assert first == play_game(board, [SeekerBot, RandomBot, SeekerBot], game_seed=7)
+    assert first['winner'] in (0, 1, 2)
+    assert first['character'] == first['characters'][first['winner']]
+
+def test_bots_never_accuse_wrongly():
+    stats = play_chunk((3, 0, 100, ["seeker", "random", "seeker", "random"], 1000))
+    assert stats.games == 100
+    assert stats.unfinished == 0
+    assert stats.wrong_accusations == 0
+    assert sum(stats.wins_by_seat.values()) == 100
+
+def test_deducers_solve_faster_than_seekers():
+    deducers = play_chunk((4, 0, 100, ["deducer"] * 4, 1000))
+    seekers = play_chunk((4, 0, 100, ["seeker"] * 4, 1000))
+    assert deducers.wrong_accusations == 0 and deducers.unfinished == 0
+    assert deducers.summary()['turns']['mean'] < seekers.summary()['turns']['mean']
+
+def test_max_turns_stops_games():
+    stats = play_chunk((3, 0, 20, ["random"] * 6, 1))
+    assert stats.unfinished == 20
+    assert set(stats.turns) == {1}
+
+def test_stats_merge_in_any_order():
+    chunks = [play_chunk((5, chunk, 30, ["seeker"] * 3, 200)) for chunk in range(3)]
+    forward = SimulationStats()
+    backward = SimulationStats()
+    for stats in chunks:
+        forward.merge(stats)
+    for stats in reversed(chunks):
+        backward.merge(stats)
+    forward.seconds = backward.seconds = 0.0
+    assert forward.summary() == backward.summary()
+    assert forward.summary()['games'] == 90
+
+def test_simulate_streams_totals_and_ignores_worker_count():
+    totals = [stats.games for stats in simulate(250, ["seeker"] * 4, seed=9, chunk_size=100)]
+    assert totals == [100, 200, 250]
+
+    def final(workers):
+        for stats in simulate(250, ["seeker"] * 4, seed=9, workers=workers, chunk_size=100):
+            pass
+        stats.seconds = 0.0
+        return stats.summary()
+    assert final(1) == final(2)
+
+def test_simulate_rejects_bad_runs():
+    with pytest.raises(ValueError, match="1 is not a valid number of players."):
+        next(simulate(10, ["seeker"]))
+    with pytest.raises(ValueError, match="genius is not a bot policy."):
+        next(simulate(10, ["seeker", "genius"]))
@@ -0,0 +1,148 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+
+from Backend.GameEngine.engine import GameEngine
+
+
+class GameActor():
+    """
+    Runs every action of one game on a single asyncio task.
+
+    Callers put actions on the actor's queue and get a future back. The actor's
+    task takes them off the queue one at a time and applies them to the engine, so
+    the actions of one game never interleave and need no row locks or
+    transactions. Each game has its own actor, so different games run side by
+    side on the event loop.
+
+    Attributes:
+        game_id (int): The game this actor runs.
+        loop (AbstractEventLoop): The event loop the actor's task runs on.
+    """
+
+    def __init__(self, game_id: int, engine: GameEngine):
+        self.game_id = game_id
+        self.loop = asyncio.get_running_loop()
+        self._engine = engine
+        self._queue = asyncio.Queue()
+        self._task = self.loop.create_task(self._run(), name=f"game-actor-{game_id}")
+
+    def enqueue(self, player_name: str, action: str, data: dict) -> asyncio.Future:
+        """
+        Queue an action and return the future that will hold its result.
+
+        Must be called from the actor's event loop.
+        """
+        future = self.loop.create_future()
+        self._queue.put_nowait((player_name, action, data, future))
+        return future
+
+    async def submit(self, player_name: str, action: str, data: dict) -> dict:
+        """
+        Queue an action and wait for its result.
+
+        Raises:
+            ValueError: If the engine rejects the action.
+        """
+        return await self.enqueue(player_name, action, data)
+
+    def is_running(self) -> bool:
+        return not self._task.done() and not self.loop.is_closed()
+
+    def close(self) -> None:
+        """Stop the actor's task once it finishes the queued actions. Must be called from the actor's event loop."""
+        self._queue.put_nowait(None)
+
+    async def stop(self) -> None:
+        """Finish the queued actions, then stop the actor's task."""
+        self.close()
+        await self._task
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            player_name, action, data, future = item
+            if future.cancelled():
+                continue
+            try:
+                result = self._engine.apply(self.game_id, player_name, action, data)
+            except Exception as e:
+                # Hand the error over without this task's frames, so callers that clear
+                # the traceback (such as assertRaises) cannot finalize the actor's coroutine
+                future.set_exception(e.with_traceback(None))
+            else:
+                future.set_result(result)
+
+
+class GameActors():
+    """
+    Registry of the actor of each live game, per event loop.
+
+    Actors belong to an event loop. Under ASGI every request and socket shares the
+    server's loop, so each game has exactly one actor. A caller on a different loop
+    (for example a sync view run outside the ASGI server, where every call gets a
+    new loop) gets a new actor for that loop, and actions are only serialized per
+    loop. The actors of loops that have closed are dropped the next time an actor
+    is looked up, and a game's actors are closed when it finishes or leaves the
+    engine.
+    """
+
+    def __init__(self, engine: GameEngine):
+        self._engine = engine
+        self._actors = {}  # Event loop -> game id -> actor
+
+    def get(self, game_id: int) -> GameActor:
+        """Return the actor of a game, starting it if needed. Must be called on an event loop."""
+        loop = asyncio.get_running_loop()
+        for other in [other for other in self._actors if other.is_closed()]:
+            del self._actors[other]
+        actors = self._actors.setdefault(loop, {})
+        actor = actors.get(game_id)
+        if actor is None or not actor.is_running():
+            actor = GameActor(game_id, self._engine)
+            actors[game_id] = actor
+        return actor
+
+    async def submit(self, game_id: int, player_name: str, action: str, data: dict) -> dict:
+        """
+        Apply an action through the game's actor and return its result.
+
+        The game's actors are closed once the action finishes the game.
+
+        Raises:
+            ValueError: If the game is not live or the engine rejects the action.
+        """
+        if not self._engine.is_live(game_id):
+            raise ValueError(f"Game {game_id} is not live.")
+        result = await self.get(game_id).submit(player_name, action, data)
+        if not self._engine.is_live(game_id):
+            await self.close(game_id)  # The action finished the game
+        return result
+
+    def submit_sync(self, game_id: int, player_name: str, action: str, data: dict) -> dict:
+        """Apply an action through the game's actor from synchronous code, such as a view."""
+        return async_to_sync(self.submit)(game_id, player_name, action, data)
+
+    async def close(self, game_id: int) -> None:
+        """
+        Stop and drop the actors of a game on every loop, after they finish their queued actions.
+
+        Call it when the game ends or the engine stops holding it.
+        """
+        loop = asyncio.get_running_loop()
+        for actor_loop, actors in list(self._actors.items()):
+            actor = actors.pop(game_id, None)
+            if not actors:
+                del self._actors[actor_loop]
+            if actor is None or not actor.is_running():
+                continue
+            if actor_loop is loop:
+                await actor.stop()
+            else:
+                try:
+                    actor_loop.call_soon_threadsafe(actor.close)
+                except RuntimeError:
+                    pass  # The loop closed meanwhile, taking the actor's task with it
+
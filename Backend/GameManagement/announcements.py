@@ -0,0 +1,59 @@
+from django.contrib.auth.models import User
+
+from Backend.MessageTranslator.broadcast import broadcast
+from Backend.MessageTranslator.groups import game_group, user_group
+
+
+def describe(result: dict) -> str:
+    """
+    Return the notification sent to a game's sockets after an action.
+
+    Only public information is announced: the card shown to disprove a
+    suggestion stays with the player who made it.
+
+    Args:
+        result (dict): The result of a game action, as returned by the engine.
+    """
+    action = result['action']
+    if action == 'move':
+        return f"{result['player']} moved to the {result['location']}."
+    if action == 'suggestion':
+        return f"{result['player']} suggested {result['suspect']} with the {result['weapon']} in the {result['room']}."
+    if action == 'accusation':
+        return f"{result['player']} made a {'correct' if result['correct'] else 'wrong'} accusation."
+    if action == 'end_turn':
+        return f"It is now {result['next_player']}'s turn."
+    raise ValueError(f"{action} is not a valid action.")
+
+
+def private_notices(result: dict) -> dict:
+    """
+    Return the notifications of an action that only some players may see.
+
+    The card shown to disprove a suggestion is told to the player who made the
+    suggestion and to the player who showed it.
+
+    Returns:
+        dict: The notification of each player, by username.
+    """
+    if result['action'] == 'suggestion' and result['disprover'] is not None:
+        return {
+            result['player']: f"{result['disprover']} showed you the {result['card']}.",
+            result['disprover']: f"You showed {result['player']} the {result['card']}.",
+        }
+    return {}
+
+
+async def notify_players(notices: dict) -> None:
+    """Send each player their own notification, to the group of every socket they opened."""
+    if not notices:
+        return
+    users = User.objects.filter(username__in=notices).values_list('username', 'pk')
+    async for username, pk in users:
+        await broadcast(user_group(pk), notices[username])
+
+
+async def announce(game_id: int, result: dict) -> None:
+    """Notify the sockets watching a game of an action, then tell the players involved what only they may see."""
+    await broadcast(game_group(game_id), describe(result))
+    await notify_players(private_notices(result))
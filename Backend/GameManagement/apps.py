@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GamemanagementConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "Backend.GameManagement"
+
+    def ready(self):
+        from . import board  # noqa: F401  Connects the signals that reload the board
@@ -0,0 +1,79 @@
+"""
+Process-wide board graph, loaded from the RoomHallway rows.
+
+A change to the rows resets the board of the process that made it at once. Other
+processes (the ASGI server, the shard workers) cannot see that signal, so each
+one also reloads the rows once the board is older than RELOAD_SECONDS, and
+swaps the board only if its fingerprint changed. Live games keep the board they
+started on.
+"""
+import time
+
+from asgiref.sync import sync_to_async
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from Backend.GameEngine.board import BoardGraph
+from Backend.GameEngine.paths import PathTable, board_fingerprint, path_table
+from .models import RoomHallway
+
+RELOAD_SECONDS = 30.0  # Age after which the board is checked against the rows
+
+_board = None
+_loaded_at = 0.0  # time.monotonic() when _board was last checked against the rows
+
+
+def load_board() -> BoardGraph:
+    """
+    Build the board graph from the RoomHallway rows.
+
+    Falls back to the standard layout when no rows have been created.
+    """
+    rows = list(RoomHallway.objects.prefetch_related("connections").order_by("pk"))
+    if not rows:
+        return BoardGraph.standard()
+    return BoardGraph((row.name, row.is_room, tuple(other.name for other in row.connections.all()))
+                      for row in rows)
+
+
+def _is_fresh() -> bool:
+    return _board is not None and time.monotonic() - _loaded_at < RELOAD_SECONDS
+
+
+def _reload() -> BoardGraph:
+    """Load the rows, keeping the current board if they still describe it."""
+    global _board, _loaded_at
+    board = load_board()
+    if _board is None or board_fingerprint(board) != board_fingerprint(_board):
+        _board = board
+    _loaded_at = time.monotonic()
+    return _board
+
+
+def get_board() -> BoardGraph:
+    """Return the process-wide board graph, loading it on first use and when it is stale."""
+    return _board if _is_fresh() else _reload()
+
+
+async def aget_board() -> BoardGraph:
+    """Return the process-wide board graph from async code, loading it on first use and when it is stale."""
+    return _board if _is_fresh() else await sync_to_async(_reload)()
+
+
+def reset_board() -> None:
+    """Drop the cached board graph so the next get_board() reloads it."""
+    global _board
+    _board = None
+
+
+def get_paths() -> PathTable:
+    """Return the shortest-path table of the process-wide board, built once per board."""
+    return path_table(get_board())
+
+
+@receiver(post_save, sender=RoomHallway)
+@receiver(post_delete, sender=RoomHallway)
+@receiver(m2m_changed, sender=RoomHallway.connections.through)
+def board_changed(sender, **kwargs) -> None:
+    """Reload the board, and with it the path table, once a space or connection changes."""
+    reset_board()
@@ -0,0 +1,55 @@
+import asyncio
+
+from channels.consumer import AsyncConsumer
+from channels.exceptions import ChannelFull
+
+from .live import router
+from .sharding import ShardUnavailable
+
+
+# Calls being answered, so their tasks are not garbage collected before they finish
+_in_flight = set()
+
+
+class ShardConsumer(AsyncConsumer):
+    """
+    Handles the game calls forwarded to this process's shard.
+
+    Runs under `manage.py runworker game-shard-<n>`, which makes that process the
+    owner of shard n's games. Each call is answered on its reply channel with the
+    result, or with the error that rejected it. A call for a game this shard has
+    moved is forwarded again, and is answered as unavailable if the new owner does
+    not answer.
+
+    Calls are answered in their own tasks, so a slow call does not hold up the
+    calls for other games. Actions still run one at a time per game: each task
+    queues its action on the game's actor before it first waits, so they reach
+    the actor in the order the calls arrived.
+    """
+
+    router = router
+
+    async def game_call(self, message: dict) -> None:
+        task = asyncio.get_running_loop().create_task(self.answer(message))
+        _in_flight.add(task)
+        task.add_done_callback(_answer_done)
+
+    async def answer(self, message: dict) -> None:
+        try:
+            result = await self.router.handle(message['op'], message['args'])
+        except ValueError as e:
+            reply = {'type': 'game.reply', 'error': str(e)}
+        except ShardUnavailable as e:
+            reply = {'type': 'game.reply', 'error': str(e), 'unavailable': True}
+        else:
+            reply = {'type': 'game.reply', 'result': result}
+        try:
+            await self.channel_layer.send(message['reply_to'], reply)
+        except ChannelFull:
+            pass  # The caller gave up waiting and its reply channel is gone
+
+
+def _answer_done(task: asyncio.Task) -> None:
+    _in_flight.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Error while answering a game call: {task.exception()}")
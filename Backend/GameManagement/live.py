@@ -0,0 +1,22 @@
+"""
+Process-wide live game engine.
+
+Views and consumers reach live games through `router`, which hands each call to
+the shard that owns the game. On the owning process, games are read through
+`engine` and changed through `actors`, which runs each game's actions one at a
+time. Every change is queued on `write_behind`, which persists it to the Game and
+GameSession tables in the background.
+"""
+from django.conf import settings
+
+from Backend.GameEngine.engine import GameEngine
+from .actors import GameActors
+from .persistence import WriteBehindQueue
+from .sharding import GameRouter
+
+write_behind = WriteBehindQueue()
+engine = GameEngine(on_change=write_behind.schedule)
+actors = GameActors(engine)
+router = GameRouter(engine, actors,
+                    shard_count=getattr(settings, 'GAME_SHARDS', 1),
+                    shard=getattr(settings, 'GAME_SHARD', 0))
@@ -0,0 +1,374 @@
+"""
+Load generator that plays full games against a running server.
+
+Every simulated player is an AsyncClientIF with its own session and game socket.
+Players register, log in, go through the lobby calls and then play scripted games
+to the end, while every request, every acknowledged frame and every notification
+is timed. All the choices are drawn from random generators derived from one seed,
+and the server deals each game from a seed derived from it too, so a run with the
+same options plays the same games.
+
+The lobby views do not record players yet, so the harness creates the Game rows
+itself. It must therefore use the same database as the server it drives.
+"""
+import asyncio
+import math
+import time
+from collections import Counter, defaultdict
+from random import Random
+
+import aiohttp
+from django.contrib.auth.models import User
+
+from Backend.cardGroupings.Card import Card
+from Backend.GameEngine.board import BoardGraph
+from Backend.GameEngine.paths import path_table
+from Frontend.AsyncClientIF import AsyncClientIF
+from .models import Game
+
+PASSWORD = "Revolver-in-the-Conservatory"
+
+
+def percentile(samples: list, p: float) -> float:
+    """Return the p-th percentile (0 to 100) of the samples, by the nearest-rank method."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(1, math.ceil(p / 100 * len(ordered))) - 1]
+
+
+def summarize(samples: list) -> dict:
+    """Return the count and the p50, p95, p99 and max of durations in seconds, in milliseconds."""
+    return {
+        'count': len(samples),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'max_ms': round(max(samples, default=0.0) * 1000, 3),
+    }
+
+
+class LatencyRecorder():
+    """
+    Collects the duration of every request by endpoint, and the notification lags.
+
+    A notification's lag is the time from sending the action it announces to its
+    arrival on a player's game socket.
+    """
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = Counter()
+        self.lags = []
+
+    def record(self, endpoint: str, seconds: float, ok: bool = True) -> None:
+        self.samples[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def requests(self) -> int:
+        return sum(len(samples) for samples in self.samples.values())
+
+    def summary(self) -> dict:
+        """Return the latency percentiles and error count of every endpoint, by name."""
+        return {endpoint: {**summarize(samples), 'errors': self.errors[endpoint]}
+                for endpoint, samples in sorted(self.samples.items())}
+
+
+class ScriptedPlayer():
+    """
+    Decides the actions of one simulated player.
+
+    The player keeps the cards it has not seen as candidates for the envelope. It
+    heads for the nearest room it has not ruled out, suggests in every room it
+    reaches and crosses off the card it is shown. When a suggestion is not
+    disproved, the suggested cards it does not hold are the solution. It accuses
+    once every category is down to one card, or with its best guess once the game
+    has run for max_turns turns, so every game ends.
+
+    Attributes:
+        name (str): The player's username.
+        rng (Random): Source of every choice the player makes.
+        board (BoardGraph): The board the game is played on.
+        max_turns (int): Turns after which the player accuses at its next turn.
+        candidates (dict): Unseen card names by category, once the first view is read.
+    """
+
+    def __init__(self, name: str, rng: Random, board: BoardGraph, max_turns: int = 60):
+        self.name = name
+        self.rng = rng
+        self.board = board
+        self.max_turns = max_turns
+        self.candidates = None
+        self._view = None
+
+    def begin_turn(self, view: dict) -> None:
+        """Start a turn from the player's view of the game."""
+        me = next(player for player in view['players'] if player['name'] == self.name)
+        if self.candidates is None:
+            hand = set(me['hand'])
+            self.candidates = {
+                'character': [name for name in Card.VALID_SUSPECTS if name not in hand],
+                'weapon': [name for name in Card.VALID_WEAPONS if name not in hand],
+                'room': [name for name in Card.VALID_ROOMS if name not in hand],
+            }
+        self._view = view
+        self._location = me['location']
+        self._moved = 'Move' not in view['valid_actions']  # Blocked in by occupied hallways
+        self._suggested = False
+        self._accused = False
+
+    def solved(self) -> bool:
+        return all(len(cards) == 1 for cards in self.candidates.values())
+
+    def next_action(self) -> tuple:
+        """Return the name and data of the next action of the turn."""
+        if not self._accused and (self.solved() or self._view['turn_counter'] >= self.max_turns):
+            return 'accusation', {category: self.rng.choice(cards) for category, cards in self.candidates.items()}
+
+        in_room = self.board.is_room(self._space())
+        worth_staying = in_room and self._location in self.candidates['room'] and self.rng.random() < 0.5
+        if not self._moved and not self._suggested and not worth_staying:
+            destinations = self.board.spaces_of(self.board.valid_moves(self._space(), self._occupied()))
+            if destinations:
+                distance = self._distances()
+                closest = min(distance[space] for space in destinations)
+                return 'move', {'room': self.board.names[self.rng.choice(
+                    [space for space in destinations if distance[space] == closest])]}
+        if not self._suggested and in_room:
+            return 'suggestion', {
+                'character': self.rng.choice(self.candidates['character']),
+                'weapon': self.rng.choice(self.candidates['weapon']),
+                'room': self._location,
+            }
+        return 'end_turn', {}
+
+    def observe(self, action: str, data: dict, result: dict) -> None:
+        """Learn from the result of an action the server accepted."""
+        if action == 'move':
+            self._moved = True
+            self._location = result['location']
+        elif action == 'suggestion':
+            self._suggested = True
+            if result['card'] is not None:
+                for cards in self.candidates.values():
+                    if result['card'] in cards and len(cards) > 1:
+                        cards.remove(result['card'])
+            else:
+                for category, cards in self.candidates.items():
+                    if data[category] in cards:
+                        cards[:] = [data[category]]
+        elif action == 'accusation':
+            self._accused = True
+
+    def rejected(self, action: str) -> None:
+        """Skip an action the server refused for the rest of the turn."""
+        if action == 'move':
+            self._moved = True
+        elif action == 'suggestion':
+            self._suggested = True
+        elif action == 'accusation':
+            self._accused = True
+        else:
+            raise ValueError(f"{self.name} could not {action}.")
+
+    def _space(self) -> int:
+        return self.board.space_id(self._location)
+
+    def _distances(self) -> tuple:
+        """Return the number of moves from every space to the nearest room not ruled out."""
+        targets = 0
+        for room in self.candidates['room']:
+            targets |= 1 << self.board.space_id(room)
+        return path_table(self.board).distances_to(targets)
+
+    def _occupied(self) -> int:
+        occupied = 0
+        for player in self._view['players']:
+            if player['name'] != self.name:
+                occupied |= 1 << self.board.space_id(player['location'])
+        return occupied
+
+
+async def create_game_row(name: str, usernames: list) -> int:
+    """Create the Game row of a lobby with its players, as the lobby views will once implemented."""
+    game = await Game.objects.acreate(name=name, state="")
+    await game.players.aset([user async for user in User.objects.filter(username__in=usernames)])
+    return game.pk
+
+
+class LoadTest():
+    """
+    Plays games concurrently against a server and reports what it measured.
+
+    Attributes:
+        base_url (str): The server's base URL.
+        players (int): Number of simulated players.
+        players_per_game (int): Seats in every game.
+        seed (int): Seed every choice of the run is derived from.
+        max_turns (int): Turns after which players start accusing.
+        connections (int): Most HTTP connections open at once.
+        use_socket (bool): Send game actions over the game sockets rather than HTTP.
+        prefix (str): Prefix of the usernames and game names.
+    """
+
+    def __init__(self, base_url: str, players: int = 1000, players_per_game: int = 3, seed: int = 0,
+                 max_turns: int = 60, connections: int = 200, use_socket: bool = True, prefix: str = "load"):
+        if not 1 <= players_per_game <= len(Card.VALID_SUSPECTS):
+            raise ValueError(f"{players_per_game} is not a valid number of players per game.")
+        if players < players_per_game:
+            raise ValueError(f"{players} players cannot fill a game of {players_per_game}.")
+        self.base_url = base_url
+        self.players = players
+        self.players_per_game = players_per_game
+        self.seed = seed
+        self.max_turns = max_turns
+        self.connections = connections
+        self.use_socket = use_socket
+        self.prefix = prefix
+        self.board = BoardGraph.standard()
+        self.recorder = LatencyRecorder()
+        self.create_game = create_game_row
+
+    async def run(self) -> dict:
+        """
+        Play every game to the end and return the report.
+
+        Every player signs in first, then the Game rows are created one by one, so the
+        harness's own writes do not compete with the server's, and then every game is
+        played at once.
+        """
+        games = self.players // self.players_per_game
+        connector = aiohttp.TCPConnector(limit=self.connections)
+        tables = []
+        for index in range(games):
+            sent = []  # When each accepted action of the game was sent, in order
+            tables.append((index, sent, {
+                f"{self.prefix}{self.seed}-{index}-{seat}": AsyncClientIF(
+                    self.base_url, connector, self.use_socket, on_request=self.recorder.record,
+                    on_notification=self._lag_meter(sent))
+                for seat in range(self.players_per_game)
+            }))
+
+        start = time.perf_counter()
+        try:
+            players = [(name, client) for _, _, clients in tables for name, client in clients.items()]
+            signed_in = await asyncio.gather(*(self._sign_in(client, name) for name, client in players),
+                                             return_exceptions=True)
+            errors = {name: outcome for (name, _), outcome in zip(players, signed_in)
+                      if isinstance(outcome, BaseException)}
+            plays = []
+            for index, sent, clients in tables:
+                error = next((errors[name] for name in clients if name in errors), None)
+                if error is not None:
+                    plays.append(self._fail(error))
+                    continue
+                game_id = await self.create_game(f"{self.prefix}{self.seed}-{index}", list(clients))
+                plays.append(self._play(index, game_id, clients, sent))
+            outcomes = await asyncio.gather(*plays, return_exceptions=True)
+        finally:
+            await asyncio.gather(*(client.close() for _, _, clients in tables for client in clients.values()))
+            await connector.close()
+        duration = time.perf_counter() - start
+
+        failures = Counter(f"{type(outcome).__name__}: {outcome}" for outcome in outcomes
+                           if isinstance(outcome, BaseException))
+        actions = sum(outcome for outcome in outcomes if not isinstance(outcome, BaseException))
+        requests = self.recorder.requests()
+        return {
+            'seed': self.seed,
+            'players': games * self.players_per_game,
+            'games': games,
+            'games_finished': games - sum(failures.values()),
+            'failures': dict(failures),
+            'duration_s': round(duration, 3),
+            'actions': actions,
+            'requests': requests,
+            'requests_per_s': round(requests / duration, 2),
+            'actions_per_s': round(actions / duration, 2),
+            'endpoints': self.recorder.summary(),
+            'notification_lag': summarize(self.recorder.lags),
+        }
+
+    async def _fail(self, error: BaseException):
+        raise error
+
+    async def _play(self, index: int, game_id: int, clients: dict, sent: list) -> int:
+        """Play one game to its end. Returns the number of actions taken."""
+        await asyncio.gather(*(client.openGameSocket(game_id) for client in clients.values()))
+        names = list(clients)
+        rng = Random(f"{self.seed}-{index}")
+        bots = {name: ScriptedPlayer(name, Random(f"{self.seed}-{index}-{name}"), self.board, self.max_turns)
+                for name in names}
+        view = await clients[names[0]].startGame(game_id, seed=rng.randrange(2 ** 32))
+        for client in clients.values():
+            client.game_id = game_id
+        actions = await self._play_turns(clients, bots, view['players'][view['turn']]['name'], sent)
+        await self._drain(clients, sent)
+        return actions
+
+    async def _sign_in(self, client: AsyncClientIF, name: str) -> None:
+        # Accounts left by an earlier run with the same seed are refused and logged into
+        await client.register(name, PASSWORD)
+        await client.login(name, PASSWORD)
+        await client.createGame()
+        await client.joinGame(name)
+
+    async def _play_turns(self, clients: dict, bots: dict, player: str, sent: list) -> int:
+        actions = 0
+        while True:
+            view = await clients[player].gameState()
+            if not view['active']:
+                return actions
+            bot = bots[player]
+            bot.begin_turn(view)
+            while True:
+                action, data = bot.next_action()
+                sent.append(time.perf_counter())
+                try:
+                    result = await self._send(clients[player], action, data)
+                except ValueError:
+                    sent.pop()
+                    bot.rejected(action)
+                    continue
+                actions += 1
+                bot.observe(action, data, result)
+                if action == 'end_turn':
+                    player = result['next_player']
+                    break
+                if action == 'accusation':
+                    # A wrong accusation passes the turn on, or ends the game
+                    view = await clients[player].gameState()
+                    if not view['active']:
+                        return actions
+                    player = view['players'][view['turn']]['name']
+                    break
+
+    async def _send(self, client: AsyncClientIF, action: str, data: dict) -> dict:
+        if action == 'move':
+            return await client.playerMove(data['room'])
+        if action == 'suggestion':
+            return await client.makeSuggestion(data['character'], data['weapon'], data['room'])
+        if action == 'accusation':
+            return await client.makeAccusation(data['character'], data['weapon'], data['room'])
+        return await client.EndTurn()
+
+    def _lag_meter(self, sent: list):
+        """Return the notification callback of one player, matching notifications to actions in order."""
+        received = []
+
+        def on_notification(message: str, received_at: float) -> None:
+            if len(received) < len(sent):
+                self.recorder.lags.append(received_at - sent[len(received)])
+            received.append(received_at)
+
+        on_notification.received = received
+        return on_notification
+
+    async def _drain(self, clients: dict, sent: list, timeout: float = 5.0) -> None:
+        """Wait for every player's socket to receive the last notifications of the game."""
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            if all(len(client.on_notification.received) >= len(sent) for client in clients.values()):
+                return
+            await asyncio.sleep(0.01)
@@ -0,0 +1,53 @@
+import asyncio
+
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from Backend.GameManagement.sharding import GameRouter, ShardUnavailable
+
+
+class Command(BaseCommand):
+    help = "Show the metrics of every game shard, or move live games to a new number of shards."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebalance", type=int, metavar="SHARDS",
+                            help="Move the live games whose owner changes with this many shards.")
+        parser.add_argument("--timeout", type=float, default=5.0,
+                            help="Seconds to wait for each shard worker to answer.")
+
+    def handle(self, *args, **options):
+        # This process holds no games: it reaches every shard's worker over the channel layer
+        if isinstance(get_channel_layer(), InMemoryChannelLayer):
+            raise CommandError("The shard workers can only be reached over a channel layer shared between "
+                               "processes, such as the channel broker.")
+        router = GameRouter(None, None, shard_count=settings.GAME_SHARDS, shard=None, timeout=options["timeout"])
+
+        if options["rebalance"] is not None:
+            if options["rebalance"] < 1:
+                raise CommandError("There must be at least one shard.")
+            moves = self._run(router.rebalance(options["rebalance"]))
+            for game_id, old_shard, new_shard in moves:
+                self.stdout.write(f"Moved game {game_id} from shard {old_shard} to shard {new_shard}")
+            self.stdout.write(f"Moved {len(moves)} games. Restart the workers with CLUE_LESS_SHARDS={options['rebalance']}.")
+            return
+
+        metrics = self._run(router.all_metrics())
+        columns = ['shard', 'live_games', 'players', 'handled', 'forwarded', 'errors', 'moved_games', 'busy_seconds']
+        self.stdout.write(" ".join(f"{column:>12}" for column in columns))
+        for shard in metrics:
+            self.stdout.write(" ".join(f"{shard[column]:>12}" for column in columns))
+
+    def _run(self, calls):
+        """Run the router's calls, failing the command if a shard worker does not answer."""
+        async def run():
+            try:
+                return await calls
+            finally:
+                close = getattr(get_channel_layer(), 'close', None)  # Drop this loop's connection
+                if close is not None:
+                    await close()
+        try:
+            return asyncio.run(run())
+        except ShardUnavailable as e:
+            raise CommandError(f"{e} Start `manage.py runworker game-shard-<n>` for every shard.") from None
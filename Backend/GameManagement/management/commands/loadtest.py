@@ -0,0 +1,50 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Backend.GameManagement.loadtest import LoadTest
+
+
+class Command(BaseCommand):
+    help = ("Play scripted games against a running server and report throughput, latency "
+            "percentiles by endpoint and notification lag. The server must use this project's database.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the server.")
+        parser.add_argument("--players", type=int, default=1000, help="Number of simulated players.")
+        parser.add_argument("--players-per-game", type=int, default=3, help="Seats in every game.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of every choice made in the run.")
+        parser.add_argument("--max-turns", type=int, default=60,
+                            help="Turns after which players accuse with their best guess.")
+        parser.add_argument("--connections", type=int, default=200, help="Most HTTP connections open at once.")
+        parser.add_argument("--transport", choices=["ws", "http"], default="ws",
+                            help="Send game actions as socket frames or as HTTP requests.")
+        parser.add_argument("--prefix", default="load", help="Prefix of the usernames and game names.")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        try:
+            load_test = LoadTest(options["url"], players=options["players"],
+                                 players_per_game=options["players_per_game"], seed=options["seed"],
+                                 max_turns=options["max_turns"], connections=options["connections"],
+                                 use_socket=options["transport"] == "ws", prefix=options["prefix"])
+        except ValueError as e:
+            raise CommandError(e)
+        report = asyncio.run(load_test.run())
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"{report['games_finished']}/{report['games']} games with {report['players']} players "
+                          f"in {report['duration_s']:.1f}s (seed {report['seed']})")
+        self.stdout.write(f"{report['requests']} requests, {report['requests_per_s']:.1f}/s; "
+                          f"{report['actions']} actions, {report['actions_per_s']:.1f}/s")
+        columns = ['count', 'errors', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+        self.stdout.write(f"{'endpoint':<20}" + "".join(f"{column:>10}" for column in columns))
+        rows = [*report['endpoints'].items(), ('notification lag', {'errors': '', **report['notification_lag']})]
+        for endpoint, stats in rows:
+            self.stdout.write(f"{endpoint:<20}" + "".join(f"{stats[column]:>10}" for column in columns))
+        for failure, count in report['failures'].items():
+            self.stderr.write(f"{count} games failed: {failure}")
@@ -0,0 +1,66 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Backend.GameEngine.bots import POLICIES
+from Backend.GameEngine.simulator import simulate
+
+
+class Command(BaseCommand):
+    help = "Play complete games between bots across a process pool and report balance statistics."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--games", type=int, default=10000, help="Number of games to play.")
+        parser.add_argument("--players", type=int, default=4, help="Players per game.")
+        parser.add_argument("--policy", nargs="+", default=["seeker"],
+                            help=f"Bot policy of every seat, or one per seat, from {', '.join(POLICIES)} "
+                                 "or module:Class.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the run; the same seed plays the same games.")
+        parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes.")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Games handed to a worker at a time.")
+        parser.add_argument("--max-turns", type=int, default=200, help="Turns after which a game is stopped.")
+        parser.add_argument("--json", action="store_true", help="Print the final statistics as JSON.")
+
+    def handle(self, *args, **options):
+        policies = options["policy"]
+        if len(policies) == 1:
+            policies = policies * options["players"]
+        elif len(policies) != options["players"]:
+            raise CommandError(f"Give one policy, or one for each of the {options['players']} players.")
+
+        start = time.perf_counter()
+        stats = None
+        try:
+            for stats in simulate(options["games"], policies, seed=options["seed"], workers=options["workers"],
+                                  chunk_size=options["chunk_size"], max_turns=options["max_turns"]):
+                if not options["json"]:
+                    elapsed = time.perf_counter() - start
+                    self.stderr.write(f"{stats.games}/{options['games']} games, {stats.games / elapsed:.0f} games/s")
+        except ValueError as e:
+            raise CommandError(str(e))
+        if stats is None:
+            raise CommandError("No games were played.")
+
+        summary = stats.summary()
+        summary['games_per_second'] = stats.games / (time.perf_counter() - start)
+        summary['policies'] = policies
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+
+        self.stdout.write(f"Games: {summary['games']} ({summary['games_per_second']:.0f}/s, "
+                          f"{summary['games_per_cpu_second']:.0f} per worker CPU second)")
+        self.stdout.write(f"Unfinished: {summary['unfinished_rate']:.2%}   "
+                          f"Wrong accusations per game: {summary['wrong_accusations_per_game']:.3f}")
+        for label, key in (("Turns", 'turns'), ("Suggestions", 'suggestions')):
+            distribution = summary[key]
+            self.stdout.write(f"{label}: mean {distribution['mean']:.1f}, p50 {distribution['p50']}, "
+                              f"p95 {distribution['p95']}, max {distribution['max']}")
+        self.stdout.write("Win rate by seat:")
+        for seat, rate in summary['win_rate_by_seat'].items():
+            self.stdout.write(f"  {seat} ({policies[seat]}): {rate:.2%}")
+        self.stdout.write("Win rate by character:")
+        for character, rate in summary['win_rate_by_character'].items():
+            self.stdout.write(f"  {character}: {rate:.2%}")
@@ -0,0 +1,114 @@
+import atexit
+import json
+import threading
+
+from django.db import transaction
+
+from .models import Game, GameSession
+
+
+class WriteBehindQueue():
+    """
+    Persists live game state to the database in the background.
+
+    schedule() only records a snapshot of the game and returns. A background thread
+    flushes the pending snapshots every `interval` seconds, or as soon as
+    `max_batch` games are waiting. Snapshots of the same game are coalesced, so a
+    game that changes ten times between flushes is written once. Each flush writes
+    every pending game with one bulk update per table inside a single transaction.
+
+    Attributes:
+        interval (float): Seconds between flushes.
+        max_batch (int): Number of pending games that triggers an early flush.
+        autostart (bool): Start the background thread on the first schedule() call.
+    """
+
+    def __init__(self, interval: float = 0.05, max_batch: int = 100, autostart: bool = True):
+        self.interval = interval
+        self.max_batch = max_batch
+        self.autostart = autostart
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def schedule(self, game) -> None:
+        """
+        Queue the current state of a game to be written.
+
+        Args:
+            game (GameState): The live game that changed.
+        """
+        snapshot = game.to_dict()
+        with self._lock:
+            self._pending[game.game_id] = snapshot
+            pending = len(self._pending)
+        if self._thread is None and self.autostart:
+            self.start()
+        if pending >= self.max_batch:
+            self._wake.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write every pending snapshot to the database.
+
+        Returns:
+            int: The number of games written.
+        """
+        with self._lock:
+            snapshots, self._pending = self._pending, {}
+        if not snapshots:
+            return 0
+
+        games = [Game(pk=game_id, state=json.dumps(snapshot)) for game_id, snapshot in snapshots.items()]
+        sessions = [GameSession(pk=snapshot['session_id'],
+                                active=snapshot['active'],
+                                turn_counter=snapshot['turn_counter'],
+                                round_counter=snapshot['round_counter'])
+                    for snapshot in snapshots.values() if snapshot['session_id'] is not None]
+        try:
+            with transaction.atomic():
+                Game.objects.bulk_update(games, ['state'])
+                GameSession.objects.bulk_update(sessions, ['active', 'turn_counter', 'round_counter'])
+        except Exception:
+            # Put the snapshots back unless a newer one arrived in the meantime
+            with self._lock:
+                for game_id, snapshot in snapshots.items():
+                    self._pending.setdefault(game_id, snapshot)
+            raise
+        return len(snapshots)
+
+    def start(self) -> None:
+        """Start the background flushing thread."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="game-write-behind", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Stop the background thread and write anything still pending."""
+        thread = self._thread
+        if thread is not None:
+            self._stopped.set()
+            self._wake.set()
+            thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Log the error or handle it appropriately
+                print(f"Error while writing game state: {e}")
@@ -0,0 +1,200 @@
+"""
+Game-affinity sharding.
+
+Each live game is owned by exactly one shard, picked from its id with a jump
+consistent hash, and only the owning process holds the game in memory. A process
+configured as shard i (settings.GAME_SHARD) handles the calls for its own games
+and forwards everything else over the channel layer to the owning shard's
+channel, where a ShardConsumer handles it. A process with no shard index, such
+as a daphne front-end, forwards every call. With a single shard, which is the
+default, every call is handled in-process and nothing is forwarded.
+
+Growing the number of shards only moves the games whose owner changes: see
+GameRouter.rebalance.
+"""
+import asyncio
+import hashlib
+import time
+
+from channels.layers import get_channel_layer
+
+from Backend.GameEngine.engine import GameState
+from .board import aget_board
+
+
+class ShardUnavailable(Exception):
+    """Raised when the shard that owns a game does not answer in time."""
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """
+    Return the bucket of a key with Lamping and Veach's jump consistent hash.
+
+    Going from n to n + 1 buckets moves only about 1 / (n + 1) of the keys, all of
+    them into the new bucket.
+    """
+    bucket, jump = -1, 0
+    while jump < buckets:
+        bucket = jump
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        jump = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def shard_of(game_id: int, shard_count: int) -> int:
+    """Return the shard that owns a game. The same in every process."""
+    key = int.from_bytes(hashlib.blake2b(str(game_id).encode(), digest_size=8).digest(), "big")
+    return jump_hash(key, shard_count)
+
+
+def shard_channel(shard: int) -> str:
+    """Return the channel layer channel a shard receives forwarded calls on."""
+    return f"game-shard-{shard}"
+
+
+class GameRouter():
+    """
+    Sends each game call to the shard that owns the game.
+
+    Calls are made by name. 'start', 'apply' and 'view' act on one game; 'live_games',
+    'export', 'import' and 'metrics' are used to rebalance and monitor the shards.
+
+    Attributes:
+        shard_count (int): Number of shards.
+        shard (int): The shard this process is, or None if it only forwards.
+        timeout (float): Seconds to wait for another shard to answer.
+    """
+
+    def __init__(self, engine, actors, shard_count: int = 1, shard: int = 0, timeout: float = 5.0):
+        if shard is not None and not 0 <= shard < shard_count:
+            raise ValueError(f"{shard} is not a valid shard of {shard_count}.")
+        self.shard_count = shard_count
+        self.shard = shard
+        self.timeout = timeout
+        self._engine = engine
+        self._actors = actors
+        self._moved = {}  # Game id -> shard it was exported to
+        self._counters = {'handled': 0, 'forwarded': 0, 'errors': 0}
+        self._busy = 0.0
+
+    def owner(self, game_id: int) -> int:
+        return shard_of(game_id, self.shard_count)
+
+    async def call(self, game_id: int, op: str, **args):
+        """
+        Run a call on the shard that owns the game.
+
+        Raises:
+            ValueError: If the call is rejected, wherever it ran.
+            ShardUnavailable: If the owning shard does not answer in time.
+        """
+        return await self.call_shard(self.owner(game_id), op, game_id=game_id, **args)
+
+    async def call_shard(self, shard: int, op: str, **args):
+        """Run a call on one shard, in this process when it is this shard."""
+        if shard == self.shard:
+            return await self.handle(op, args)
+        self._counters['forwarded'] += 1
+        return await self._forward(shard, op, args)
+
+    async def handle(self, op: str, args: dict):
+        """
+        Run a call on this shard.
+
+        Calls for a game this shard has exported are forwarded to its new owner.
+        """
+        game_id = args.get('game_id')
+        if game_id in self._moved and not self._engine.is_live(game_id):
+            return await self.call_shard(self._moved[game_id], op, **args)
+
+        start = time.perf_counter()
+        self._counters['handled'] += 1
+        try:
+            return await self._handle(op, **args)
+        except ValueError:
+            self._counters['errors'] += 1
+            raise
+        finally:
+            self._busy += time.perf_counter() - start
+
+    async def _handle(self, op: str, game_id: int = None, **args):
+        if op == 'apply':
+            return await self._actors.submit(game_id, args['player'], args['action'], args['data'])
+        if op == 'view':
+            return self._engine.get_game(game_id).view_for(args['player'])
+        if op == 'start':
+            game = self._engine.start_game(game_id, args['player_names'], await aget_board(),
+                                           game_seed=args.get('game_seed'), session_id=args.get('session_id'))
+            return game.view_for(args['player'])
+        if op == 'export':
+            await self._actors.close(game_id)  # Let queued actions finish first
+            game = self._engine.release(game_id)
+            self._moved[game_id] = args['to']
+            return game.to_dict()
+        if op == 'import':
+            self._moved.pop(game_id, None)
+            self._engine.adopt(GameState.from_dict(args['state'], await aget_board()))
+            return None
+        if op == 'live_games':
+            return [game.game_id for game in self._engine.live_games()]
+        if op == 'metrics':
+            return self.metrics()
+        raise ValueError(f"{op} is not a valid game call.")
+
+    async def _forward(self, shard: int, op: str, args: dict):
+        channel_layer = get_channel_layer()
+        reply_to = await channel_layer.new_channel()
+        await channel_layer.send(shard_channel(shard), {
+            'type': 'game.call',
+            'op': op,
+            'args': args,
+            'reply_to': reply_to,
+        })
+        try:
+            reply = await asyncio.wait_for(channel_layer.receive(reply_to), self.timeout)
+        except asyncio.TimeoutError:
+            raise ShardUnavailable(f"Shard {shard} did not answer.") from None
+        if reply.get('unavailable'):
+            raise ShardUnavailable(reply['error'])
+        if 'error' in reply:
+            raise ValueError(reply['error'])
+        return reply['result']
+
+    def metrics(self) -> dict:
+        """Return the counters of this shard."""
+        live_games = self._engine.live_games()
+        return {
+            'shard': self.shard,
+            'live_games': len(live_games),
+            'players': sum(len(game.players) for game in live_games),
+            'moved_games': len(self._moved),
+            'busy_seconds': round(self._busy, 6),
+            **self._counters,
+        }
+
+    async def all_metrics(self) -> list:
+        """Return the counters of every shard."""
+        return [await self.call_shard(shard, 'metrics') for shard in range(self.shard_count)]
+
+    async def rebalance(self, shard_count: int) -> list:
+        """
+        Move the live games whose owner changes when the number of shards changes.
+
+        Each game is exported from its current shard, which forwards later calls for
+        it, and imported by its new one. Start the new shards first, then restart
+        the other processes with the new shard count once this returns.
+
+        Returns:
+            list: (game id, old shard, new shard) of every game moved.
+        """
+        moves = []
+        for shard in range(self.shard_count):
+            for game_id in await self.call_shard(shard, 'live_games'):
+                new_shard = shard_of(game_id, shard_count)
+                if new_shard == shard:
+                    continue
+                state = await self.call_shard(shard, 'export', game_id=game_id, to=new_shard)
+                await self.call_shard(new_shard, 'import', game_id=game_id, state=state)
+                moves.append((game_id, shard, new_shard))
+        self.shard_count = shard_count
+        return moves
@@ -1,6 +1,37 @@
-from django.test import TestCase
+from django.test import TestCase, SimpleTestCase
+from django.urls import reverse
 from django.contrib.auth.models import User
+from Backend.cardGroupings.Card import Card as GameCard
 from .models import Game, Person, Weapon, RoomHallway, Player, Card, GameSession
+from Backend.GameEngine.disproval import DisprovalResolver, suggestion_mask
+from Backend.GameEngine.board import BoardGraph, hallway_name
+from . import board as board_module
+from .board import get_board, get_paths, load_board
+from Backend.GameEngine.player import Player as BoardPlayer
+from Backend.GameEngine.engine import GameEngine, GameState
+from .actors import GameActors
+import asyncio
+from .persistence import WriteBehindQueue
+from .live import engine as live_engine, router as live_router, write_behind as live_write_behind
+from .views import GameView, StartGameView, PlayerMoveView, MakeSuggestionView, MakeAccusationView, EndTurnView
+import json
+from asgiref.testing import ApplicationCommunicator
+from channels.layers import get_channel_layer
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from Backend.MessageTranslator.broker import ChannelBroker
+from Backend.MessageTranslator.groups import user_group
+from asgiref.sync import async_to_sync
+from io import StringIO
+import os
+import tempfile
+import threading
+from unittest import mock
+from .consumers import ShardConsumer
+from .sharding import GameRouter, ShardUnavailable, jump_hash, shard_channel, shard_of
+from .loadtest import LatencyRecorder, ScriptedPlayer, percentile
+from random import Random
 # Create your tests here.
 # Helper setup functions to avoid repetitive code
 def create_user(username="testuser"):
@@ -150,4 +181,658 @@ class GameSessionModelTest(TestCase):
     def test_round_counter(self):
         session = GameSession.objects.first()
         round_counter = session.round_counter
-        self.assertEqual(round_counter, 1)
\ No newline at end of file
+        self.assertEqual(round_counter, 1)
+
+
+class DisprovalResolverTest(SimpleTestCase):
+    def setUp(self):
+        # Seat 0 holds the Rope, seat 1 the Kitchen, seat 2 Mr. Green and the Hall
+        self.hands = [
+            GameCard.mask_of([GameCard.from_name("Rope")]),
+            GameCard.mask_of([GameCard.from_name("Kitchen")]),
+            GameCard.mask_of([GameCard.from_name("Mr. Green"), GameCard.from_name("Hall")]),
+        ]
+        self.resolver = DisprovalResolver(self.hands)
+
+    def test_first_seat_after_suggester_disproves(self):
+        mask = suggestion_mask("Mr. Green", "Rope", "Kitchen")
+        self.assertEqual(self.resolver.resolve(0, mask), (1, self.hands[1]))
+        self.assertEqual(self.resolver.resolve(1, mask), (2, GameCard.from_name("Mr. Green").get_mask()))
+
+    def test_rotation_wraps_around(self):
+        mask = suggestion_mask("Miss Scarlet", "Rope", "Study")
+        self.assertEqual(self.resolver.resolve(2, mask), (0, self.hands[0]))
+        self.assertEqual(self.resolver.resolve(1, mask), (0, self.hands[0]))
+
+    def test_suggester_does_not_disprove_own_suggestion(self):
+        mask = suggestion_mask("Miss Scarlet", "Rope", "Study")
+        self.assertEqual(self.resolver.resolve(0, mask), (None, 0))
+
+    def test_resolve_cards_returns_all_matching_cards(self):
+        seat, cards = self.resolver.resolve_cards(0, "Mr. Green", "Dagger", "Hall")
+        self.assertEqual(seat, 2)
+        self.assertEqual(cards, [GameCard.from_name("Mr. Green"), GameCard.from_name("Hall")])
+
+    def test_invalid_card_name(self):
+        with self.assertRaises(ValueError):
+            suggestion_mask("Mr. Green", "Knife", "Hall")
+
+
+class BoardGraphTest(SimpleTestCase):
+    def setUp(self):
+        self.board = BoardGraph.standard()
+
+    def test_standard_board_size(self):
+        self.assertEqual(len(self.board), 21)
+        self.assertEqual(self.board.room_mask.bit_count(), 9)
+        self.assertEqual(self.board.hallway_mask.bit_count(), 12)
+
+    def test_adjacency_includes_secret_passage(self):
+        study = self.board.space_id("Study")
+        self.assertEqual(sorted(self.board.names_of(self.board.adjacency[study])),
+                         sorted([hallway_name("Study", "Hall"), hallway_name("Study", "Library"), "Kitchen"]))
+        self.assertEqual(self.board.names_of(self.board.passages[study]), ["Kitchen"])
+
+    def test_valid_moves_skip_occupied_hallways(self):
+        study = self.board.space_id("Study")
+        occupied = 1 << self.board.space_id(hallway_name("Study", "Hall"))
+        self.assertEqual(sorted(self.board.names_of(self.board.valid_moves(study, occupied))),
+                         sorted([hallway_name("Study", "Library"), "Kitchen"]))
+
+    def test_valid_moves_into_occupied_room(self):
+        hallway = self.board.space_id(hallway_name("Study", "Hall"))
+        occupied = 1 << self.board.space_id("Hall")
+        self.assertEqual(sorted(self.board.names_of(self.board.valid_moves(hallway, occupied))), ["Hall", "Study"])
+
+    def test_board_is_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.board.room_mask = 0
+
+    def test_unknown_space(self):
+        with self.assertRaises(ValueError):
+            self.board.space_id("Attic")
+
+    def test_player_valid_moves(self):
+        player = BoardPlayer("Player1")
+        player.currLocation = self.board.space_id("Lounge")
+        moves = [self.board.names[space] for space in player.get_valid_moves(self.board)]
+        self.assertEqual(sorted(moves), sorted([hallway_name("Hall", "Lounge"), hallway_name("Lounge", "Dining Room"),
+                                                "Conservatory"]))
+
+
+class LoadBoardTest(TestCase):
+    def test_load_board_from_rows(self):
+        study = create_room(name="Study")
+        hallway = create_room(name="Study Hallway", is_room=False)
+        kitchen = create_room(name="Kitchen")
+        study.connections.add(hallway, kitchen)
+
+        board = load_board()
+        self.assertEqual(board.names, ("Study", "Study Hallway", "Kitchen"))
+        self.assertEqual(board.names_of(board.adjacency[board.space_id("Kitchen")]), ["Study"])
+        self.assertEqual(board.names_of(board.passages[board.space_id("Study")]), ["Kitchen"])
+
+    def test_load_board_without_rows_uses_standard_layout(self):
+        self.assertEqual(load_board().names, BoardGraph.standard().names)
+
+    def test_board_and_paths_reload_when_rows_change(self):
+        study = create_room(name="Study")
+        kitchen = create_room(name="Kitchen")
+        board = get_board()
+        self.assertEqual(get_paths().distance(board.space_id("Study"), board.space_id("Kitchen")), 255)
+
+        hallway = create_room(name="Study Hallway", is_room=False)
+        study.connections.add(hallway)
+        kitchen.connections.add(hallway)
+        board = get_board()
+        self.assertEqual(board.names, ("Study", "Kitchen", "Study Hallway"))
+        self.assertEqual(get_paths().distance(board.space_id("Study"), board.space_id("Kitchen")), 2)
+
+        hallway.delete()
+        self.assertEqual(get_board().names, ("Study", "Kitchen"))
+
+    def test_board_changed_by_another_process_reloads_once_stale(self):
+        create_room(name="Study")
+        board = get_board()
+        RoomHallway.objects.filter(name="Study").update(name="Library")  # Sends no signal, like another process
+        self.assertIs(get_board(), board)
+        with mock.patch.object(board_module, 'RELOAD_SECONDS', 0.0):
+            self.assertEqual(get_board().names, ("Library",))
+            reloaded = get_board()
+            self.assertIs(get_board(), reloaded)  # Same rows, same board
+
+
+class GameEngineTest(SimpleTestCase):
+    def setUp(self):
+        self.changes = []
+        self.engine = GameEngine(on_change=self.changes.append)
+        self.board = BoardGraph.standard()
+        self.game = self.engine.start_game(1, ["alice", "bob", "carol"], self.board, game_seed=3)
+
+    def test_start_game_deals_every_card(self):
+        hands = [player.playerHand for player in self.game.players]
+        self.assertEqual(sum(hands) + self.game.envelope, GameCard.ALL_MASK)
+        self.assertEqual(self.game.envelope.bit_count(), 3)
+        self.assertEqual(self.changes, [self.game])
+
+    def test_same_seed_same_deal(self):
+        other = GameEngine().start_game(2, ["alice", "bob", "carol"], self.board, game_seed=3)
+        self.assertEqual(other.envelope, self.game.envelope)
+        self.assertEqual([p.playerHand for p in other.players], [p.playerHand for p in self.game.players])
+
+    def test_from_dict_round_trip(self):
+        self.engine.move(1, "alice", "Hall")
+        copy = GameState.from_dict(self.game.to_dict(), self.board)
+        self.assertEqual(copy.to_dict(), self.game.to_dict())
+        self.assertEqual(copy.occupied_hallways, self.game.occupied_hallways)
+        self.assertEqual(copy.view_for("alice")['valid_actions'], self.game.view_for("alice")['valid_actions'])
+
+        other = GameEngine()
+        other.adopt(copy)
+        self.engine.release(1)
+        self.assertFalse(self.engine.is_live(1))
+        self.assertEqual(other.end_turn(1, "alice")['next_player'], "bob")
+
+    def test_move(self):
+        result = self.engine.move(1, "alice", "Hall")
+        self.assertEqual(result['location'], "Hall")
+        self.assertEqual(self.game.players[0].currLocation, self.board.space_id("Hall"))
+        with self.assertRaisesMessage(ValueError, "You have already moved this turn."):
+            self.engine.move(1, "alice", "Lounge")
+
+    def test_move_into_occupied_hallway(self):
+        self.engine.move(1, "alice", "Lounge")
+        self.engine.end_turn(1, "alice")
+        self.engine.move(1, "bob", "Study")
+        self.engine.end_turn(1, "bob")
+        self.engine.end_turn(1, "carol")
+        with self.assertRaisesMessage(ValueError, "You cannot move to the Conservatory-Ballroom Hallway."):
+            self.engine.move(1, "alice", "Conservatory-Ballroom Hallway")
+        self.engine.move(1, "alice", "Conservatory")
+
+    def test_not_your_turn(self):
+        with self.assertRaisesMessage(ValueError, "It is not your turn."):
+            self.engine.move(1, "bob", "Study")
+
+    def test_suggestion_is_disproved_by_next_holder(self):
+        self.engine.move(1, "alice", "Hall")
+        bob = self.game.players[1]
+        card = GameCard.from_mask(bob.playerHand)[0]
+        names = {"Suspect": "Miss Scarlet", "Weapon": "Rope", "Room": "Hall"}
+        names[card.get_card_type().value] = card.get_name()
+        suggestion = suggestion_mask(names["Suspect"], names["Weapon"], "Hall")
+        result = self.engine.suggest(1, "alice", names["Suspect"], names["Weapon"], "Hall")
+        expected_seat, matching = self.game.resolver.resolve(0, suggestion)
+        self.assertEqual(result['disprover'], self.game.players[expected_seat].playerName)
+        self.assertEqual(result['card'], GameCard.from_mask(matching)[0].get_name())
+
+    def test_suggestion_requires_room(self):
+        with self.assertRaisesMessage(ValueError, "You must be in the Hall to suggest it."):
+            self.engine.suggest(1, "alice", "Mr. Green", "Rope", "Hall")
+
+    def test_suggestion_moves_suspect_into_room(self):
+        self.engine.move(1, "alice", "Hall")
+        self.engine.suggest(1, "alice", "Professor Plum", "Rope", "Hall")
+        self.assertEqual(self.game.players[1].currLocation, self.board.space_id("Hall"))
+        self.assertFalse(self.game.occupied_hallways & (1 << self.board.space_id(hallway_name("Study", "Library"))))
+
+    def test_correct_accusation_wins(self):
+        suspect, weapon, room = (card.get_name() for card in GameCard.from_mask(self.game.envelope))
+        result = self.engine.accuse(1, "alice", suspect, weapon, room)
+        self.assertTrue(result['correct'])
+        self.assertEqual(result['winner'], "alice")
+        self.assertFalse(self.game.active)
+        with self.assertRaisesMessage(ValueError, "Game 1 is not live."):
+            self.engine.end_turn(1, "alice")
+
+    def test_finished_game_is_no_longer_live(self):
+        suspect, weapon, room = (card.get_name() for card in GameCard.from_mask(self.game.envelope))
+        self.engine.accuse(1, "alice", suspect, weapon, room)
+        self.assertFalse(self.engine.is_live(1))
+        self.assertEqual(self.engine.live_games(), [])
+        self.assertIs(self.changes[-1], self.game)  # The final state was handed over to be saved
+        self.assertEqual(self.game.version, len(self.changes))
+        self.engine.start_game(1, ["alice", "bob"], self.board, game_seed=4)
+
+    def test_wrong_accusation_eliminates(self):
+        envelope = GameCard.from_mask(self.game.envelope)
+        wrong_room = next(name for name in GameCard.VALID_ROOMS if name != envelope[2].get_name())
+        result = self.engine.accuse(1, "alice", envelope[0].get_name(), envelope[1].get_name(), wrong_room)
+        self.assertFalse(result['correct'])
+        self.assertIn(0, self.game.eliminated)
+        self.assertEqual(self.game.current_player().playerName, "bob")
+        self.engine.end_turn(1, "bob")
+        self.engine.end_turn(1, "carol")
+        self.assertEqual(self.game.current_player().playerName, "bob")
+        self.assertEqual(self.game.round_counter, 1)
+
+    def test_last_player_standing_wins(self):
+        envelope = GameCard.from_mask(self.game.envelope)
+        wrong_room = next(name for name in GameCard.VALID_ROOMS if name != envelope[2].get_name())
+        self.engine.accuse(1, "alice", envelope[0].get_name(), envelope[1].get_name(), wrong_room)
+        self.engine.accuse(1, "bob", envelope[0].get_name(), envelope[1].get_name(), wrong_room)
+        self.assertFalse(self.game.active)
+        self.assertEqual(self.game.winner.playerName, "carol")
+
+    def test_view_hides_other_hands(self):
+        view = self.game.view_for("bob")
+        self.assertNotIn('envelope', view)
+        self.assertIn('hand', view['players'][1])
+        self.assertNotIn('hand', view['players'][0])
+        self.assertEqual(view['valid_actions'], [])
+
+    def test_apply_rejects_unknown_action(self):
+        with self.assertRaisesMessage(ValueError, "fly is not a valid action."):
+            self.engine.apply(1, "alice", "fly", {})
+        with self.assertRaisesMessage(ValueError, "Missing field room for move."):
+            self.engine.apply(1, "alice", "move", {})
+
+
+class WriteBehindQueueTest(TestCase):
+    def setUp(self):
+        user = create_user()
+        self.game_row = Game.objects.create(name="Game1", state="")
+        self.game_row.players.add(user)
+        self.session = GameSession.objects.create()
+        self.queue = WriteBehindQueue(autostart=False)
+        self.engine = GameEngine(on_change=self.queue.schedule)
+        self.game = self.engine.start_game(self.game_row.pk, ["testuser"], BoardGraph.standard(),
+                                           session_id=self.session.pk)
+
+    def test_changes_are_coalesced(self):
+        self.engine.move(self.game_row.pk, "testuser", "Hall")
+        self.engine.end_turn(self.game_row.pk, "testuser")
+        self.assertEqual(self.queue.pending(), 1)
+        with self.assertNumQueries(4):  # one bulk update per table, inside a savepoint
+            self.assertEqual(self.queue.flush(), 1)
+        self.assertEqual(self.queue.pending(), 0)
+
+    def test_flush_writes_game_and_session(self):
+        self.engine.move(self.game_row.pk, "testuser", "Hall")
+        self.engine.end_turn(self.game_row.pk, "testuser")
+        self.queue.flush()
+
+        state = json.loads(Game.objects.get(pk=self.game_row.pk).state)
+        self.assertEqual(state['players'][0]['location'], "Hall")
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.turn_counter, 1)
+        self.assertEqual(self.session.round_counter, 1)
+
+    def test_flush_with_nothing_pending(self):
+        self.queue.flush()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.queue.flush(), 0)
+
+
+class GameActionViewTest(TestCase):
+    def setUp(self):
+        live_write_behind.autostart = False
+        self.user = User.objects.create_user(username='testuser', password='password12345')
+        self.other = User.objects.create_user(username='testuser2', password='password12345')
+        self.game_row = Game.objects.create(name="Game1", state="")
+        self.game_row.players.set([self.user, self.other])
+        self.client.login(username='testuser', password='password12345')
+
+    def tearDown(self):
+        for game in live_engine.live_games():
+            live_engine.end_game(game.game_id)
+        live_write_behind.flush()
+
+    def test_start_move_and_read_state(self):
+        response = self.client.post(reverse('start_game'), data={'game_id': self.game_row.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['valid_actions'], ["Move", "Accusation"])
+
+        response = self.client.post(reverse('player_move'), data={'game_id': self.game_row.pk, 'room': 'Hall'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['location'], 'Hall')
+
+        with self.assertNumQueries(2):  # session and user lookups only
+            response = self.client.get(reverse('game_state', args=[self.game_row.pk]))
+        self.assertEqual(response.json()['players'][0]['location'], 'Hall')
+
+        response = self.client.post(reverse('end_turn'), data={'game_id': self.game_row.pk})
+        self.assertEqual(response.json()['next_player'], 'testuser2')
+
+    def test_start_sends_each_player_their_hand(self):
+        layer = get_channel_layer()
+        channels = {user.username: async_to_sync(layer.new_channel)() for user in (self.user, self.other)}
+        for user in (self.user, self.other):
+            async_to_sync(layer.group_add)(user_group(user.pk), channels[user.username])
+
+        self.client.post(reverse('start_game'), data={'game_id': self.game_row.pk})
+
+        game = live_engine.get_game(self.game_row.pk)
+        for player in game.players:
+            event = async_to_sync(layer.receive)(channels[player.playerName])
+            hand = ", ".join(card.get_name() for card in GameCard.from_mask(player.playerHand))
+            self.assertEqual(json.loads(event['text']), {'message': f"Your hand: {hand}."})
+        for user in (self.user, self.other):
+            async_to_sync(layer.group_discard)(user_group(user.pk), channels[user.username])
+
+    def test_failed_start_leaves_no_session(self):
+        self.client.post(reverse('start_game'), data={'game_id': self.game_row.pk})
+        sessions = GameSession.objects.count()
+        response = self.client.post(reverse('start_game'), data={'game_id': self.game_row.pk})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], f"Game {self.game_row.pk} has already started.")
+        self.assertEqual(GameSession.objects.count(), sessions)
+
+    def test_views_are_async(self):
+        for view in (GameView, StartGameView, PlayerMoveView, MakeSuggestionView,
+                     MakeAccusationView, EndTurnView):
+            self.assertTrue(view.view_is_async, view.__name__)
+
+    def test_invalid_action(self):
+        self.client.post(reverse('start_game'), data={'game_id': self.game_row.pk})
+        response = self.client.post(reverse('player_move'), data={'game_id': self.game_row.pk, 'room': 'Kitchen'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'You cannot move to the Kitchen.')
+
+    def test_game_not_live(self):
+        response = self.client.get(reverse('game_state', args=[self.game_row.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_action_requires_login(self):
+        self.client.logout()
+        response = self.client.post(reverse('end_turn'), data={'game_id': self.game_row.pk})
+        self.assertEqual(response.status_code, 403)
+
+    def test_unavailable_shard(self):
+        with mock.patch.object(live_router, 'call', side_effect=ShardUnavailable("Shard 1 did not answer.")):
+            response = self.client.post(reverse('end_turn'), data={'game_id': self.game_row.pk})
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.json()['error'], "Shard 1 did not answer.")
+            response = self.client.get(reverse('game_state', args=[self.game_row.pk]))
+            self.assertEqual(response.status_code, 503)
+
+
+class GameActorsTest(SimpleTestCase):
+    def setUp(self):
+        self.engine = GameEngine()
+        self.actors = GameActors(self.engine)
+        self.engine.start_game(1, ["alice", "bob"], BoardGraph.standard(), game_seed=1)
+        self.engine.start_game(2, ["carol", "dave"], BoardGraph.standard(), game_seed=2)
+
+    async def test_actions_of_one_game_run_in_order(self):
+        results = await asyncio.gather(*(
+            self.actors.submit(1, name, 'end_turn', {}) for name in ["alice", "bob", "alice", "bob"]
+        ))
+        self.assertEqual([result['next_player'] for result in results], ["bob", "alice", "bob", "alice"])
+        self.assertEqual(self.engine.get_game(1).turn_counter, 4)
+
+    async def test_rejected_action_raises(self):
+        with self.assertRaisesMessage(ValueError, "It is not your turn."):
+            await self.actors.submit(1, "bob", 'end_turn', {})
+        # The actor outlives assertRaises clearing the error's traceback
+        result = await asyncio.wait_for(self.actors.submit(1, "alice", 'end_turn', {}), 5)
+        self.assertEqual(result['next_player'], "bob")
+
+    async def test_games_have_separate_actors(self):
+        self.assertIsNot(self.actors.get(1), self.actors.get(2))
+        self.assertIs(self.actors.get(1), self.actors.get(1))
+        first, second = await asyncio.gather(self.actors.submit(1, "alice", 'end_turn', {}),
+                                             self.actors.submit(2, "carol", 'end_turn', {}))
+        self.assertEqual((first['next_player'], second['next_player']), ("bob", "dave"))
+        await self.actors.close(1)
+        await self.actors.close(2)
+        self.assertEqual(self.actors._actors, {})
+
+    async def test_game_not_live(self):
+        with self.assertRaisesMessage(ValueError, "Game 3 is not live."):
+            await self.actors.submit(3, "alice", 'end_turn', {})
+
+    def test_submit_sync(self):
+        result = self.actors.submit_sync(1, "alice", 'end_turn', {})
+        self.assertEqual(result['next_player'], "bob")
+
+    def test_actors_of_closed_loops_are_dropped(self):
+        for name in ["alice", "bob", "alice"]:
+            self.actors.submit_sync(1, name, 'end_turn', {})  # Each call runs on a new loop
+        self.assertEqual(len(self.actors._actors), 1)
+
+    async def test_finished_game_closes_its_actor(self):
+        suspect, weapon, room = (card.get_name() for card in GameCard.from_mask(self.engine.get_game(1).envelope))
+        actor = self.actors.get(1)
+        result = await self.actors.submit(1, "alice", 'accusation', {'character': suspect, 'weapon': weapon, 'room': room})
+        self.assertEqual(result['winner'], "alice")
+        self.assertFalse(actor.is_running())
+        self.assertEqual(self.actors._actors, {})
+
+
+class ShardingTest(TestCase):
+    def setUp(self):
+        self.engines = [GameEngine(), GameEngine()]
+        self.shards = [GameRouter(engine, GameActors(engine), shard_count=2, shard=shard)
+                       for shard, engine in enumerate(self.engines)]
+        self.front = GameRouter(None, None, shard_count=2, shard=None)
+
+    async def serve(self, shard, router):
+        """Run a ShardConsumer for one shard, as `runworker game-shard-<n>` would."""
+        consumer = type('ShardConsumer', (ShardConsumer,), {'router': router})
+        communicator = ApplicationCommunicator(consumer.as_asgi(),
+                                               {'type': 'channel', 'channel': shard_channel(shard)})
+        channel_layer = get_channel_layer()
+
+        async def pump():
+            while True:
+                await communicator.send_input(await channel_layer.receive(shard_channel(shard)))
+
+        task = asyncio.ensure_future(pump())
+        return task, communicator
+
+    async def stop(self, servers):
+        for task, communicator in servers:
+            task.cancel()
+            communicator.stop()
+
+    def games_of(self, shard, count):
+        return [game_id for game_id in range(1, 200) if shard_of(game_id, 2) == shard][:count]
+
+    def test_shard_of_is_stable_and_even(self):
+        owners = [shard_of(game_id, 4) for game_id in range(4000)]
+        self.assertEqual(owners, [shard_of(game_id, 4) for game_id in range(4000)])
+        for shard in range(4):
+            self.assertAlmostEqual(owners.count(shard) / 4000, 0.25, delta=0.05)
+
+    def test_growing_only_moves_games_to_the_new_shard(self):
+        for game_id in range(2000):
+            before, after = shard_of(game_id, 3), shard_of(game_id, 4)
+            self.assertIn(after, (before, 3))
+        self.assertEqual(jump_hash(12345, 1), 0)
+
+    async def test_calls_run_on_the_owning_shard(self):
+        servers = [await self.serve(shard, router) for shard, router in enumerate(self.shards)]
+        local_game, = self.games_of(0, 1)
+        remote_game, = self.games_of(1, 1)
+
+        for game_id in (local_game, remote_game):
+            view = await self.shards[0].call(game_id, 'start', player_names=["alice", "bob"], player="alice")
+            self.assertEqual(view['valid_actions'], ["Move", "Accusation"])
+        self.assertEqual([game.game_id for game in self.engines[0].live_games()], [local_game])
+        self.assertEqual([game.game_id for game in self.engines[1].live_games()], [remote_game])
+
+        result = await self.front.call(remote_game, 'apply', player="alice", action='move', data={'room': 'Hall'})
+        self.assertEqual(result['location'], 'Hall')
+        view = await self.shards[0].call(remote_game, 'view', player="bob")
+        self.assertEqual(view['players'][0]['location'], 'Hall')
+        with self.assertRaisesMessage(ValueError, "It is not your turn."):
+            await self.front.call(remote_game, 'apply', player="bob", action='end_turn', data={})
+
+        metrics = await self.front.all_metrics()
+        self.assertEqual([shard['live_games'] for shard in metrics], [1, 1])
+        self.assertEqual(metrics[1]['errors'], 1)
+        self.assertEqual(metrics[0]['forwarded'], 2)  # The start and the view of the remote game
+        await self.stop(servers)
+
+    async def test_slow_call_does_not_hold_up_other_games(self):
+        servers = [await self.serve(0, self.shards[0])]
+        slow_game, fast_game = self.games_of(0, 2)
+        for game_id in (slow_game, fast_game):
+            await self.shards[0].call(game_id, 'start', player_names=["alice", "bob"], player="alice")
+
+        release = asyncio.Event()
+        handle = self.shards[0]._handle
+
+        async def slow_handle(op, game_id=None, **args):
+            if game_id == slow_game:
+                await release.wait()
+            return await handle(op, game_id=game_id, **args)
+
+        with mock.patch.object(self.shards[0], '_handle', slow_handle):
+            slow = asyncio.ensure_future(self.front.call(slow_game, 'view', player="alice"))
+            await asyncio.sleep(0.05)
+            view = await asyncio.wait_for(self.front.call(fast_game, 'view', player="bob"), 5)
+            self.assertEqual(view['valid_actions'], [])
+            self.assertFalse(slow.done())
+            release.set()
+            view = await asyncio.wait_for(slow, 5)
+            self.assertEqual(view['valid_actions'], ["Move", "Accusation"])
+        await self.stop(servers)
+
+    async def test_rebalance_moves_games_to_new_shard(self):
+        engine = GameEngine()
+        single = GameRouter(engine, GameActors(engine), shard_count=1, shard=0)
+        servers = [await self.serve(0, single), await self.serve(1, self.shards[1])]
+        game_ids = list(range(1, 11))
+        for game_id in game_ids:
+            engine.start_game(game_id, ["alice", "bob"], BoardGraph.standard(), game_seed=game_id)
+
+        moves = await single.rebalance(2)
+
+        moved = sorted(game_id for game_id, _, _ in moves)
+        self.assertEqual(moved, [game_id for game_id in game_ids if shard_of(game_id, 2) == 1])
+        self.assertTrue(moved)
+        self.assertEqual(sorted(game.game_id for game in self.engines[1].live_games()), moved)
+        self.assertEqual(sorted(game.game_id for game in engine.live_games()),
+                         [game_id for game_id in game_ids if game_id not in moved])
+
+        # A process that still uses the old shard map reaches the game through its old shard
+        stale = GameRouter(None, None, shard_count=1, shard=None)
+        result = await stale.call(moved[0], 'apply', player="alice", action='end_turn', data={})
+        self.assertEqual(result['next_player'], "bob")
+        self.assertEqual(self.engines[1].get_game(moved[0]).turn, 1)
+        await self.stop(servers)
+
+    async def test_unanswered_call_raises_shard_unavailable(self):
+        remote_game, = self.games_of(1, 1)
+        self.front.timeout = 0.05
+        with self.assertRaisesMessage(ShardUnavailable, "Shard 1 did not answer."):
+            await self.front.call(remote_game, 'view', player="alice")
+
+        # A shard that moved the game answers for its new owner, which does not answer either
+        local_game, = self.games_of(0, 1)
+        servers = [await self.serve(0, self.shards[0])]
+        self.shards[0].timeout = 0.05
+        self.shards[0]._moved[local_game] = 1
+        self.front.timeout = 1.0
+        with self.assertRaisesMessage(ShardUnavailable, "Shard 1 did not answer."):
+            await self.front.call(local_game, 'view', player="alice")
+        await self.stop(servers)
+
+    def test_game_shards_command_needs_a_shared_layer(self):
+        with self.assertRaisesMessage(CommandError, "can only be reached over a channel layer shared"):
+            call_command("game_shards", stdout=StringIO())
+
+    def test_game_shards_command_reaches_the_workers(self):
+        """The command is a front-end: it reports and moves the games held by the shard workers."""
+        tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp.name, "channels.sock")
+        layers = {'default': {'BACKEND': 'Backend.MessageTranslator.broker.BrokerChannelLayer',
+                              'CONFIG': {'path': path}}}
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+
+        def run(coroutine):
+            return asyncio.run_coroutine_threadsafe(coroutine, loop).result(10)
+
+        async def start_broker():
+            broker = ChannelBroker(path)
+            await broker.start()
+            return broker
+
+        with override_settings(CHANNEL_LAYERS=layers, GAME_SHARDS=2):
+            broker = run(start_broker())
+            with self.assertRaisesMessage(CommandError, "Shard 0 did not answer."):
+                call_command("game_shards", "--timeout", "0.2", stdout=StringIO())
+
+            engine = GameEngine()
+            single = GameRouter(engine, GameActors(engine), shard_count=1, shard=0)
+            servers = [run(self.serve(0, single)), run(self.serve(1, self.shards[1]))]
+            for game_id in range(1, 11):
+                engine.start_game(game_id, ["alice", "bob"], BoardGraph.standard(), game_seed=game_id)
+
+            with override_settings(GAME_SHARDS=1):
+                out = StringIO()
+                call_command("game_shards", stdout=out)
+                lines = out.getvalue().splitlines()
+                self.assertEqual(lines[0].split()[:2], ['shard', 'live_games'])
+                self.assertEqual(lines[1].split()[:2], ['0', '10'])
+
+                out = StringIO()
+                call_command("game_shards", "--rebalance", "2", stdout=out)
+            moved = [game_id for game_id in range(1, 11) if shard_of(game_id, 2) == 1]
+            self.assertIn(f"Moved {len(moved)} games.", out.getvalue())
+            self.assertEqual(sorted(game.game_id for game in self.engines[1].live_games()), moved)
+
+            run(self.stop(servers))
+            run(get_channel_layer().close())
+            run(broker.close())
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        tmp.cleanup()
+
+
+class LoadTestTest(SimpleTestCase):
+    def play(self, game_seed, names, max_turns=60):
+        """Play a game with scripted players straight against an engine, as the load test does over the network."""
+        engine = GameEngine()
+        board = BoardGraph.standard()
+        game = engine.start_game(1, names, board, game_seed=game_seed)
+        bots = {name: ScriptedPlayer(name, Random(f"{game_seed}-{name}"), board, max_turns) for name in names}
+        actions = []
+        while game.active:
+            player = game.current_player().playerName
+            bots[player].begin_turn(game.view_for(player))
+            turn = game.turn_counter
+            while game.active and game.turn_counter == turn and game.current_player().playerName == player:
+                action, data = bots[player].next_action()
+                try:
+                    result = engine.apply(1, player, action, data)
+                except ValueError:
+                    bots[player].rejected(action)
+                    continue
+                bots[player].observe(action, data, result)
+                actions.append(action)
+        return game, actions
+
+    def test_scripted_players_finish_the_game(self):
+        for game_seed in range(20):
+            game, actions = self.play(game_seed, ["alice", "bob", "carol"])
+            self.assertFalse(game.active)
+            self.assertIsNotNone(game.winner)
+            self.assertIn('suggestion', actions)
+
+    def test_games_are_reproducible_from_the_seed(self):
+        self.assertEqual(self.play(7, ["alice", "bob", "carol", "dave"])[1],
+                         self.play(7, ["alice", "bob", "carol", "dave"])[1])
+
+    def test_solved_player_accuses_correctly(self):
+        for game_seed in range(10):
+            game, _ = self.play(game_seed, ["alice", "bob", "carol"], max_turns=1000)
+            self.assertLess(game.turn_counter, 1000)
+            self.assertEqual(game.eliminated, set())  # Deductions are sound, so no one guesses wrong
+
+    def test_percentiles(self):
+        samples = [i / 1000 for i in range(1, 101)]
+        self.assertEqual(percentile(samples, 50), 0.05)
+        self.assertEqual(percentile(samples, 99), 0.099)
+        self.assertEqual(percentile([], 95), 0.0)
+
+        recorder = LatencyRecorder()
+        recorder.record('login', 0.002)
+        recorder.record('login', 0.004, ok=False)
+        summary = recorder.summary()['login']
+        self.assertEqual((summary['count'], summary['errors'], summary['max_ms']), (2, 1, 4.0))
@@ -1,17 +1,63 @@
 from django.views import View
 from django.http import JsonResponse
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
 from django.shortcuts import render
+from .announcements import announce, notify_players
+from .live import router
+from .models import Game, GameSession
+from .sharding import ShardUnavailable
+
+
+async def _game_action(request, action: str, fields: tuple) -> JsonResponse:
+    """
+    Apply a game action from a POST request on the shard that owns the game.
+
+    The same actions can be sent as frames over the game's WebSocket, see
+    GameConsumer.
+
+    Args:
+        request: The HTTP request object with 'game_id' and the action's fields.
+        action (str): The engine action name.
+        fields (tuple): Names of the POST fields passed to the action.
+
+    Returns:
+        JsonResponse: The action result, or the reason it was rejected.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'You must be logged in.'}, status=403)
+    try:
+        game_id = int(request.POST.get('game_id', ''))
+        data = {field: request.POST[field] for field in fields if field in request.POST}
+        result = await router.call(game_id, 'apply', player=user.username, action=action, data=data)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except ShardUnavailable as e:
+        return JsonResponse({'error': str(e)}, status=503)
+
+    # Awaited rather than scheduled, so the game's notifications keep the order of its actions
+    await announce(game_id, result)
+    return JsonResponse(result, status=200)
+
 
 class GameView(View):
-        def post(self, request):
+        async def post(self, request):
             # Logic to start a new game or join an existing one
             pass
 
-        def get(self, request, game_id):
-            # Logic to retrieve game state
-              pass
+        async def get(self, request, game_id) -> JsonResponse:
+            """
+            Return the state of a live game as seen by the requesting player.
+
+            The state is read from the shard that holds the game and never from the database.
+            """
+            user = await request.auser()
+            try:
+                state = await router.call(game_id, 'view', player=user.username)
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=404)
+            except ShardUnavailable as e:
+                return JsonResponse({'error': str(e)}, status=503)
+            return JsonResponse(state, status=200)
 
 class CreateGameView(View):
     """
@@ -23,7 +69,7 @@ class CreateGameView(View):
         post(request): Handles creating game lobbies via POST request.
     """
 
-    def post(self, request) -> JsonResponse:
+    async def post(self, request) -> JsonResponse:
         """
         Handles creating game lobbies via POST request.
 
@@ -50,7 +96,7 @@ class JoinGameView(View):
         post(request): Handles joining game lobbies via POST request.
     """
 
-    def post(self, request) -> JsonResponse:
+    async def post(self, request) -> JsonResponse:
         """
         Handles joining game lobbies via POST request.
 
@@ -77,7 +123,7 @@ class LeaveGameView(View):
         post(request): Handles leaving game lobbies via POST request.
     """
 
-    def post(self, request) -> JsonResponse:
+    async def post(self, request) -> JsonResponse:
         """
         Handles leaving game lobbies via POST request.
 
@@ -104,22 +150,57 @@ class StartGameView(View):
         post(request): Handles start games via POST request.
     """
 
-    def post(self, request) -> JsonResponse:
+    async def post(self, request) -> JsonResponse:
         """
         Handles starting games via POST request.
 
+        Deals the game on the shard that owns it. From then on the game is
+        read and changed in that shard's memory and written back in the background.
+        An optional integer 'seed' fixes the deal, so scripted games can be replayed.
+        Each player is then sent their hand, on their own user group.
+
         Args:
             request: The HTTP request object.
 
         Returns:
             JsonResponse: A JSON response indicating success or failure.
         """
-
-        # TODO: THIS IS A STUB
-        # TODO: THIS IS A STUB
-        # TODO: THIS IS A STUB
-
-        return JsonResponse({'message': 'This feature has not been implemented yet.'}, status=200)
+        user = await request.auser()
+        if not user.is_authenticated:
+            return JsonResponse({'error': 'You must be logged in.'}, status=403)
+        try:
+            game = await Game.objects.aget(pk=int(request.POST.get('game_id', '')))
+        except (ValueError, Game.DoesNotExist):
+            return JsonResponse({'error': 'Game not found.'}, status=404)
+
+        usernames = [username async for username in
+                     game.players.order_by('pk').values_list('username', flat=True)]
+        if user.username not in usernames:
+            return JsonResponse({'error': 'You are not playing in this game.'}, status=403)
+        try:
+            seed = request.POST.get('seed')
+            game_seed = int(seed) if seed is not None else None
+        except ValueError:
+            return JsonResponse({'error': f"{seed} is not a valid seed."}, status=400)
+        session = await GameSession.objects.acreate()
+        try:
+            state = await router.call(game.pk, 'start', player_names=usernames, session_id=session.pk,
+                                      game_seed=game_seed, player=user.username)
+        except ValueError as e:
+            await session.adelete()  # The game did not start, so nothing refers to the session
+            return JsonResponse({'error': str(e)}, status=400)
+        except ShardUnavailable as e:
+            # The shard may yet start the game with this session, so it is kept
+            return JsonResponse({'error': str(e)}, status=503)
+
+        # Each player is dealt a hand only they may see
+        hands = {}
+        for username in usernames:
+            view = state if username == user.username else await router.call(game.pk, 'view', player=username)
+            hand = next(player['hand'] for player in view['players'] if player['name'] == username)
+            hands[username] = f"Your hand: {', '.join(hand)}."
+        await notify_players(hands)
+        return JsonResponse(state, status=200)
     
 class ChooseCharacterView(View):
     """
@@ -131,7 +212,7 @@ class ChooseCharacterView(View):
         post(request): Handles choosing character via POST request.
     """
 
-    def post(self, request) -> JsonResponse:
+    async def post(self, request) -> JsonResponse:
         """
         Handles choosing characters via POST request.
 
@@ -150,57 +231,28 @@ class ChooseCharacterView(View):
     
 class PlayerMoveView(View):
 
-    def post(self, request) -> JsonResponse:
-
-        # TODO: THIS IS A STUB
-        # TODO: THIS IS A STUB
-        # TODO: THIS IS A STUB
-
-        return JsonResponse({'message': 'This feature has not been implemented yet.'}, status=200)
+    async def post(self, request) -> JsonResponse:
+        return await _game_action(request, 'move', ('room',))
     
 class MakeSuggestionView(View):
 
-    def post(self, request) -> JsonResponse:
-
-        # TODO: THIS IS A STUB
-        # TODO: THIS IS A STUB
-        # TODO: THIS IS A STUB
-        # Notify all clients of the new login
-        channel_layer = get_channel_layer()
-        username = request.user.username 
-        async_to_sync(channel_layer.group_send)(
-            "notifications",
-            {
-                'type': 'notify',
-                'message': f" {username} Made a Suggestion.",
-            }
-        )
-
-        return JsonResponse({'message': 'This feature has not been implemented yet.'}, status=200)
+    async def post(self, request) -> JsonResponse:
+        # Notify the game's clients of the new suggestion. The card shown stays private.
+        return await _game_action(request, 'suggestion', ('character', 'weapon', 'room'))
  
 class MakeAccusationView(View):
 
-    def post(self, request) -> JsonResponse:
-
-        # TODO: THIS IS A STUB
-        # TODO: THIS IS A STUB
-        # TODO: THIS IS A STUB
-
-        return JsonResponse({'message': 'This feature has not been implemented yet.'}, status=200)
+    async def post(self, request) -> JsonResponse:
+        return await _game_action(request, 'accusation', ('character', 'weapon', 'room'))
     
 class EndTurnView(View):
 
-    def post(self, request) -> JsonResponse:
-
-        # TODO: THIS IS A STUB
-        # TODO: THIS IS A STUB
-        # TODO: THIS IS A STUB
-
-        return JsonResponse({'message': 'This feature has not been implemented yet.'}, status=200)
+    async def post(self, request) -> JsonResponse:
+        return await _game_action(request, 'end_turn', ())
     
 class EndGameEarlyRequestView(View):
 
-    def post(self, request) -> JsonResponse:
+    async def post(self, request) -> JsonResponse:
 
         # TODO: THIS IS A STUB
         # TODO: THIS IS A STUB
@@ -210,7 +262,7 @@ class EndGameEarlyRequestView(View):
     
 class EndGameEarlyVoteView(View):
 
-    def post(self, request) -> JsonResponse:
+    async def post(self, request) -> JsonResponse:
 
         # TODO: THIS IS A STUB
         # TODO: THIS IS A STUB
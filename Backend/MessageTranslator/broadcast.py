@@ -0,0 +1,66 @@
+"""
+Sending notifications to channel layer groups.
+
+A notification is encoded to its JSON text once, by the sender, and the event
+carries that text. Consumers forward it to their socket unchanged, so a group of N
+sockets costs one encode instead of N, and the channel layer only copies a string.
+"""
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+
+def encode_notification(message) -> str:
+    """Return the text sent to a socket for a notification message."""
+    return json.dumps({'message': message})
+
+
+def notification_event(message) -> dict:
+    """Return the channel layer event of a notification, with its text already encoded."""
+    return {
+        'type': 'notify',
+        'text': encode_notification(message),
+    }
+
+
+async def broadcast(group: str, message) -> None:
+    """
+    Send a notification to every socket in a group.
+
+    Args:
+        group (str): The channel layer group to send to.
+        message: The JSON-serializable notification message.
+    """
+    await get_channel_layer().group_send(group, notification_event(message))
+
+
+def broadcast_sync(group: str, message) -> None:
+    """Send a notification to every socket in a group from synchronous code, such as a view."""
+    async_to_sync(broadcast)(group, message)
+
+
+# Tasks of the broadcasts still being sent. The event loop only keeps weak
+# references to tasks, so they are held here until they finish.
+_in_flight = set()
+
+
+def broadcast_later(group: str, message) -> asyncio.Task:
+    """
+    Schedule a notification on the running event loop and return without waiting for it.
+
+    For notifications nobody waits on, such as login announcements, so the
+    response can be sent before the channel layer has delivered them.
+    """
+    task = asyncio.get_running_loop().create_task(broadcast(group, message))
+    _in_flight.add(task)
+    task.add_done_callback(_broadcast_done)
+    return task
+
+
+def _broadcast_done(task: asyncio.Task) -> None:
+    _in_flight.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        # Log the error or handle it appropriately
+        print(f"Error while sending notification: {task.exception()}")
@@ -0,0 +1,465 @@
+"""
+A channel layer shared by the worker processes of one host.
+
+The broker is a small asyncio process that owns every group and queued channel
+and listens on a Unix socket. Each worker talks to it through
+BrokerChannelLayer, so a group send in one worker reaches the sockets held by
+every other worker without Redis or any other outside service.
+
+Frames on the socket are a 4-byte big-endian length followed by a JSON object.
+Bytes in a message are sent as {"__bytes__": <base64>}.
+
+Channels made by new_channel() belong to the connection that made them: the
+broker pushes their messages to it as soon as they arrive, and the layer keeps
+them in a local queue until a consumer receives them; the queue is dropped once
+it is empty again, or after `expiry` seconds if nobody receives from it. Messages
+for any other channel are queued by the broker until a receive() asks for them. A
+receive() that is cancelled while waiting withdraws its request, and a message
+the broker had already sent it is handed back to the front of the channel's queue.
+
+A worker that reconnects after a broker restart sends its routes and group
+memberships again.
+
+Run the broker with `manage.py run_channel_broker`, and point the workers at it
+with the CLUE_LESS_CHANNEL_BROKER setting (see settings.py).
+"""
+import asyncio
+import base64
+import itertools
+import json
+import os
+import socket
+import time
+import uuid
+from collections import deque
+
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+
+DEFAULT_BROKER_PATH = "/tmp/clue_less_channels.sock"
+
+
+def encode_frame(data: dict) -> bytes:
+    body = json.dumps(data, default=_encode_bytes).encode()
+    return len(body).to_bytes(4, "big") + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> dict:
+    """Read one frame, or return None at the end of the stream."""
+    try:
+        header = await reader.readexactly(4)
+        body = await reader.readexactly(int.from_bytes(header, "big"))
+    except asyncio.IncompleteReadError:
+        return None
+    return json.loads(body, object_hook=_decode_bytes)
+
+
+def _encode_bytes(value):
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode()}
+    raise TypeError(f"{type(value).__name__} cannot be sent through the channel layer.")
+
+
+def _decode_bytes(value: dict):
+    if len(value) == 1 and "__bytes__" in value:
+        return base64.b64decode(value["__bytes__"])
+    return value
+
+
+def route_of(channel: str) -> str:
+    """Return the part of a process-specific channel name that the broker routes on."""
+    return channel[:channel.index("!") + 1]
+
+
+class ChannelBroker():
+    """
+    The broker process: holds the groups and queued channels of every worker.
+
+    Attributes:
+        path (str): Path of the Unix socket the broker listens on.
+        capacity (int): Most messages queued on a channel nobody is receiving from.
+        expiry (int): Seconds a queued message is kept.
+    """
+
+    def __init__(self, path: str = DEFAULT_BROKER_PATH, capacity: int = 100, expiry: int = 60):
+        self.path = path
+        self.capacity = capacity
+        self.expiry = expiry
+        self._server = None
+        self._routes = {}   # Route of process-specific channels -> writer of their connection
+        self._queues = {}   # Channel -> deque of (expires, message)
+        self._waiters = {}  # Channel -> deque of (writer, request id) waiting in receive()
+        self._groups = {}   # Group -> set of channels
+        self._clients = {}  # Writer of each connected worker -> the task serving it
+
+    async def start(self) -> None:
+        """Start listening on the socket, replacing a stale socket file."""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._serve, path=self.path)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        clients = list(self._clients.items())
+        for writer, _ in clients:
+            writer.close()
+        await asyncio.gather(*(task for _, task in clients), return_exceptions=True)
+
+    def group_count(self) -> int:
+        return len(self._groups)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        routes = set()
+        self._clients[writer] = asyncio.current_task()
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    return
+                if frame["op"] == "route":
+                    self._routes[frame["route"]] = writer
+                    routes.add(frame["route"])
+                    continue
+                if frame["op"] == "cancel":
+                    if self._cancel(frame["channel"], writer, frame["request"]):
+                        writer.write(encode_frame({"op": "cancelled", "request": frame["request"]}))
+                    continue
+                if frame["op"] == "requeue":
+                    self._deliver(frame["channel"], frame["message"], front=True)
+                    continue
+                reply = self._handle(frame, writer)
+                if reply is not None:
+                    reply["id"] = frame["id"]
+                    writer.write(encode_frame(reply))
+        except ConnectionError:
+            return
+        finally:
+            del self._clients[writer]
+            self._disconnected(writer, routes)
+            writer.close()
+
+    def _handle(self, frame: dict, writer: asyncio.StreamWriter):
+        op = frame["op"]
+        if op == "send":
+            return {} if self._deliver(frame["channel"], frame["message"]) else {"error": "full"}
+        if op == "group_add":
+            self._groups.setdefault(frame["group"], set()).add(frame["channel"])
+            return {}
+        if op == "group_discard":
+            members = self._groups.get(frame["group"])
+            if members is not None:
+                members.discard(frame["channel"])
+                if not members:
+                    del self._groups[frame["group"]]
+            return {}
+        if op == "group_send":
+            # Full channels are skipped, as channel layers do for group sends
+            for channel in list(self._groups.get(frame["group"], ())):
+                self._deliver(channel, frame["message"])
+            return {}
+        if op == "receive":
+            message = self._pop(frame["channel"])
+            if message is None:
+                self._waiters.setdefault(frame["channel"], deque()).append((writer, frame["id"]))
+                return None  # Answered by _deliver when a message arrives
+            return {"message": message}
+        if op == "flush":
+            self._queues.clear()
+            self._groups.clear()
+            return {}
+        return {"error": f"{op} is not a valid operation."}
+
+    def _deliver(self, channel: str, message: dict, front: bool = False) -> bool:
+        """
+        Hand a message to the channel's process or queue it. Returns False if it was dropped.
+
+        A message put back by a cancelled receive goes to the front of the queue, over capacity if need be.
+        """
+        if "!" in channel:
+            writer = self._routes.get(route_of(channel))
+            if writer is None:
+                return False
+            writer.write(encode_frame({"op": "deliver", "channel": channel, "message": message}))
+            return True
+
+        waiters = self._waiters.get(channel)
+        while waiters:
+            writer, request_id = waiters.popleft()
+            if not writer.is_closing():
+                writer.write(encode_frame({"id": request_id, "message": message}))
+                return True
+        queue = self._queues.setdefault(channel, deque())
+        self._expire(queue)
+        if front:
+            queue.appendleft((time.time() + self.expiry, message))
+            return True
+        if len(queue) >= self.capacity:
+            return False
+        queue.append((time.time() + self.expiry, message))
+        return True
+
+    def _cancel(self, channel: str, writer: asyncio.StreamWriter, request_id: int) -> bool:
+        """Withdraw a waiting receive. Returns False if it was already answered."""
+        waiters = self._waiters.get(channel)
+        if not waiters or (writer, request_id) not in waiters:
+            return False
+        waiters.remove((writer, request_id))
+        if not waiters:
+            del self._waiters[channel]
+        return True
+
+    def _pop(self, channel: str):
+        queue = self._queues.get(channel)
+        if not queue:
+            return None
+        self._expire(queue)
+        if not queue:
+            return None
+        return queue.popleft()[1]
+
+    def _expire(self, queue: deque) -> None:
+        now = time.time()
+        while queue and queue[0][0] < now:
+            queue.popleft()
+
+    def _disconnected(self, writer: asyncio.StreamWriter, routes: set) -> None:
+        """Forget a worker that went away: its routes and the group memberships of its channels."""
+        for route in routes:
+            if self._routes.get(route) is writer:
+                del self._routes[route]
+        for group, members in list(self._groups.items()):
+            members.difference_update([channel for channel in members
+                                       if "!" in channel and route_of(channel) in routes])
+            if not members:
+                del self._groups[group]
+
+
+class _BrokerConnection():
+    """The connection of one event loop to the broker."""
+
+    def __init__(self, layer: "BrokerChannelLayer", loop: asyncio.AbstractEventLoop):
+        self.layer = layer
+        self.loop = loop
+        self.client_id = uuid.uuid4().hex
+        self.sock = None
+        self.writer = None
+        self.routes = set()
+        self.groups = set()  # (group, channel) memberships added through this connection
+        self.queues = {}  # Process-specific channel -> asyncio.Queue of pushed messages
+        self._delivered = {}  # Process-specific channel -> loop time a message was last pushed to it
+        self._next_sweep = 0.0
+        self._cancelled = {}  # Request id of a cancelled receive -> its channel
+        self._lock = asyncio.Lock()
+        self._pending = {}
+        self._request_ids = itertools.count(1)
+        self._reader_task = None
+
+    def is_open(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def open(self) -> None:
+        async with self._lock:
+            if self.is_open():
+                return
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.setblocking(False)
+            await self.loop.sock_connect(self.sock, self.layer.path)
+            reader, self.writer = await asyncio.open_unix_connection(sock=self.sock)
+            for route in self.routes:
+                self.writer.write(encode_frame({"op": "route", "route": route}))
+            for group, channel in self.groups:
+                self.writer.write(encode_frame({"op": "group_add", "group": group, "channel": channel,
+                                                "id": next(self._request_ids)}))
+            self._reader_task = self.loop.create_task(self._read(reader))
+
+    def add_route(self, route: str) -> None:
+        if route not in self.routes:
+            self.routes.add(route)
+            self.writer.write(encode_frame({"op": "route", "route": route}))
+
+    def queue(self, channel: str) -> asyncio.Queue:
+        queue = self.queues.get(channel)
+        if queue is None:
+            queue = self.queues[channel] = asyncio.Queue(maxsize=self.layer.get_capacity(channel))
+        return queue
+
+    async def receive(self, channel: str) -> dict:
+        """Receive from a process-specific channel, dropping its queue once it is empty."""
+        try:
+            return await self.queue(channel).get()
+        finally:
+            queue = self.queues.get(channel)
+            if queue is not None and queue.empty():
+                del self.queues[channel]
+                self._delivered.pop(channel, None)
+
+    def _push(self, channel: str, message: dict) -> None:
+        """Queue a message the broker pushed, and drop the queues nobody received from within the expiry."""
+        now = self.loop.time()
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.layer.expiry
+            for stale in [stale for stale, pushed in self._delivered.items() if pushed < now - self.layer.expiry]:
+                del self._delivered[stale]
+                self.queues.pop(stale, None)
+        try:
+            self.queue(channel).put_nowait(message)
+        except asyncio.QueueFull:
+            return  # Nobody is reading the channel; drop the message
+        self._delivered[channel] = now
+
+    async def request(self, frame: dict) -> dict:
+        await self.open()
+        frame["id"] = next(self._request_ids)
+        future = self.loop.create_future()
+        self._pending[frame["id"]] = future
+        self.writer.write(encode_frame(frame))
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if frame["op"] == "receive" and self.is_open():
+                if future.done() and not future.cancelled():
+                    # The message arrived as the receive was cancelled: hand it back
+                    self.writer.write(encode_frame({"op": "requeue", "channel": frame["channel"],
+                                                    "message": future.result()["message"]}))
+                else:
+                    # Withdraw the wait, or hand back the message if the broker already sent it
+                    self._cancelled[frame["id"]] = frame["channel"]
+                    self.writer.write(encode_frame({"op": "cancel", "channel": frame["channel"],
+                                                    "request": frame["id"]}))
+            raise
+        finally:
+            self._pending.pop(frame["id"], None)
+
+    def close(self) -> None:
+        """Close the socket, even if the connection's event loop has already closed."""
+        if self.sock is not None:
+            self.sock.close()
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    break
+                if frame.get("op") == "deliver":
+                    self._push(frame["channel"], frame["message"])
+                    continue
+                if frame.get("op") == "cancelled":
+                    self._cancelled.pop(frame["request"], None)
+                    continue
+                channel = self._cancelled.pop(frame["id"], None)
+                if channel is not None and "message" in frame:
+                    self.writer.write(encode_frame({"op": "requeue", "channel": channel, "message": frame["message"]}))
+                    continue
+                future = self._pending.get(frame["id"])
+                if future is not None and not future.done():
+                    future.set_result(frame)
+        finally:
+            self.writer.close()
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Lost the connection to the channel broker."))
+
+
+class BrokerChannelLayer(BaseChannelLayer):
+    """
+    Channel layer backed by a ChannelBroker on the same host.
+
+    Supports the same send/receive/new_channel/group_add/group_discard/group_send
+    API as the in-memory layer. Each event loop gets its own connection, since
+    asyncio streams cannot be shared between loops.
+
+    Attributes:
+        path (str): Path of the broker's Unix socket.
+    """
+
+    extensions = ["groups", "flush"]
+
+    def __init__(self, path: str = DEFAULT_BROKER_PATH, expiry: int = 60, capacity: int = 100,
+                 channel_capacity: dict = None):
+        super().__init__(expiry=expiry, capacity=capacity)
+        self.channel_capacity = self.compile_capacities(channel_capacity or {})
+        self.path = path
+        self._connections = {}
+
+    async def _connection(self) -> _BrokerConnection:
+        loop = asyncio.get_running_loop()
+        connection = self._connections.get(loop)
+        if connection is None:
+            # Drop the connections of event loops that have finished, such as
+            # the ones async_to_sync makes for sync views
+            for old_loop in [old_loop for old_loop in self._connections if old_loop.is_closed()]:
+                self._connections.pop(old_loop).close()
+            connection = self._connections[loop] = _BrokerConnection(self, loop)
+        await connection.open()
+        return connection
+
+    async def _request(self, frame: dict) -> dict:
+        return await (await self._connection()).request(frame)
+
+    async def send(self, channel: str, message: dict) -> None:
+        """
+        Send a message onto a channel.
+
+        Raises:
+            ChannelFull: If the channel's queue in the broker is full.
+        """
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_channel_name(channel)
+        reply = await self._request({"op": "send", "channel": channel, "message": message})
+        if reply.get("error") == "full":
+            raise ChannelFull(channel)
+
+    async def receive(self, channel: str) -> dict:
+        """Receive the first message that arrives on a channel."""
+        self.require_valid_channel_name(channel)
+        connection = await self._connection()
+        if "!" in channel:
+            connection.add_route(route_of(channel))
+            return await connection.receive(channel)
+        return (await connection.request({"op": "receive", "channel": channel}))["message"]
+
+    async def new_channel(self, prefix: str = "specific") -> str:
+        """Return a new channel name whose messages are pushed to this event loop's connection."""
+        connection = await self._connection()
+        channel = f"{prefix}.{connection.client_id}!{uuid.uuid4().hex}"
+        connection.add_route(route_of(channel))
+        return channel
+
+    async def group_add(self, group: str, channel: str) -> None:
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        connection = await self._connection()
+        connection.groups.add((group, channel))  # Added again if the broker restarts
+        await connection.request({"op": "group_add", "group": group, "channel": channel})
+
+    async def group_discard(self, group: str, channel: str) -> None:
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        connection = await self._connection()
+        connection.groups.discard((group, channel))
+        await connection.request({"op": "group_discard", "group": group, "channel": channel})
+
+    async def group_send(self, group: str, message: dict) -> None:
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_group_name(group)
+        await self._request({"op": "group_send", "group": group, "message": message})
+
+    async def flush(self) -> None:
+        for connection in self._connections.values():
+            connection.groups.clear()
+        await self._request({"op": "flush"})
+
+    async def close(self) -> None:
+        """Close this event loop's connection to the broker."""
+        connection = self._connections.pop(asyncio.get_running_loop(), None)
+        if connection is not None and connection.writer is not None:
+            connection.writer.close()
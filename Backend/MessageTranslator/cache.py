@@ -0,0 +1,142 @@
+import bisect
+import threading
+from collections import OrderedDict, deque
+
+DEFAULT_CACHE_SIZE = 100
+DEFAULT_MAX_CHANNELS = 1000
+
+
+class RecentMessages():
+    """
+    Ring buffer of the most recent messages of each chat channel.
+
+    The buffer of a channel always holds an unbroken run of its newest messages, so
+    any page of the latest messages that fits in the buffer can be answered
+    without the database. Writes append to the buffer and the oldest message falls
+    out once the buffer is full. A buffer is filled from the database on the first
+    read that misses, and is marked complete when it holds the channel's whole
+    history.
+
+    The cache is per process: messages written by another process are only seen
+    after the buffer is refilled. Channel names come from clients, so at most
+    `max_channels` buffers are kept, and the least recently used one is dropped
+    to make room for a new one.
+
+    Attributes:
+        size (int): Most messages kept per channel.
+        max_channels (int): Most channels kept.
+        hits (int): Reads answered from the cache.
+        misses (int): Reads that had to go to the database.
+    """
+
+    def __init__(self, size: int = DEFAULT_CACHE_SIZE, max_channels: int = DEFAULT_MAX_CHANNELS):
+        self.size = size
+        self.max_channels = max_channels
+        self.hits = 0
+        self.misses = 0
+        self._buffers = OrderedDict()
+        self._complete = set()
+        self._lock = threading.Lock()
+
+    def append(self, channel: str, row: dict) -> None:
+        """
+        Add a message that was just written to its channel's buffer.
+
+        Messages normally arrive in order and go at the end. A message older than the
+        buffer's newest (one whose write was retried after newer ones) is inserted
+        at its place, unless the buffer already holds it because it was filled
+        from the database after the write.
+        """
+        with self._lock:
+            buffer = self._buffers.get(channel)
+            if buffer and (row['timestamp'], row['id']) < (buffer[-1]['timestamp'], buffer[-1]['id']):
+                self._insert(channel, buffer, row)
+                return
+            if buffer and row['id'] == buffer[-1]['id']:
+                return
+            if buffer is None:
+                buffer = self._store(channel, deque(maxlen=self.size))
+                self._complete.discard(channel)
+            elif len(buffer) == self.size:
+                self._complete.discard(channel)  # The oldest message is about to fall out
+            buffer.append(row)
+
+    def _insert(self, channel: str, buffer: deque, row: dict) -> None:
+        """Insert a message older than a buffer's newest at its place in the buffer."""
+        keys = [(other['timestamp'], other['id']) for other in buffer]
+        index = bisect.bisect_left(keys, (row['timestamp'], row['id']))
+        if index < len(keys) and keys[index][1] == row['id']:
+            return  # Already read from the database
+        if index == 0 and len(buffer) == self.size:
+            return  # Older than every message the buffer keeps
+        if index == 0 and channel not in self._complete:
+            # Messages between this one and the buffer may be missing: refill on the next read
+            del self._buffers[channel]
+            return
+        if len(buffer) == self.size:
+            buffer.popleft()
+            self._complete.discard(channel)
+            index -= 1
+        buffer.insert(index, row)
+
+    def fill(self, channel: str, rows: list, complete: bool) -> None:
+        """
+        Replace a channel's buffer with messages read from the database.
+
+        Args:
+            rows (list): The channel's newest messages, newest first.
+            complete (bool): True if the rows are the channel's whole history.
+        """
+        with self._lock:
+            self._store(channel, deque(reversed(rows[:self.size]), maxlen=self.size))
+            if complete and len(rows) <= self.size:
+                self._complete.add(channel)
+            else:
+                self._complete.discard(channel)
+
+    def latest(self, channel: str, limit: int):
+        """
+        Return a channel's newest messages, newest first, if the cache can answer.
+
+        Returns:
+            tuple: (rows, has_older), or None on a miss.
+        """
+        with self._lock:
+            buffer = self._buffers.get(channel)
+            complete = channel in self._complete
+            if buffer is None or (len(buffer) < limit and not complete):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._buffers.move_to_end(channel)
+            rows = [buffer[-1 - i] for i in range(min(limit, len(buffer)))]
+            return rows, len(buffer) > limit or not complete
+
+    def _store(self, channel: str, buffer: deque) -> deque:
+        """Set a channel's buffer as the most recently used, dropping the least recently used past max_channels."""
+        self._buffers[channel] = buffer
+        self._buffers.move_to_end(channel)
+        while len(self._buffers) > self.max_channels:
+            evicted, _ = self._buffers.popitem(last=False)
+            self._complete.discard(evicted)
+        return buffer
+
+    def clear(self) -> None:
+        """Drop every buffer and reset the counters."""
+        with self._lock:
+            self._buffers.clear()
+            self._complete.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'channels': len(self._buffers),
+                'messages': sum(len(buffer) for buffer in self._buffers.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+recent_messages = RecentMessages()
@@ -1,6 +1,11 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.layers import get_channel_layer
+from Backend.GameManagement.announcements import announce
+from Backend.GameManagement.live import router
+from Backend.GameManagement.sharding import ShardUnavailable
+from .broadcast import encode_notification
+from .groups import LOBBY_GROUP, game_group, user_group
 
 class NotificationConsumer(AsyncWebsocketConsumer):
     """
@@ -10,20 +15,36 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     It allows clients to connect to a notification group and receive messages in real-time.
 
     Methods:
-        connect(): Accepts the WebSocket connection and joins the notifications group.
-        disconnect(close_code): Leaves the notifications group upon disconnection.
+        get_groups(): Returns the groups the connection belongs to.
+        connect(): Accepts the WebSocket connection and joins its groups.
+        disconnect(close_code): Leaves the groups upon disconnection.
         notify(event): Sends a notification message to the WebSocket client.
     """
+    def get_groups(self) -> list:
+        """
+        Return the groups this connection joins.
+
+        Every connection joins the lobby 'notifications' group, and the group of
+        its user when the user is logged in.
+        """
+        groups = [LOBBY_GROUP]
+        user = self.scope.get('user')
+        if user is not None and user.is_authenticated:
+            groups.append(user_group(user.pk))
+        return groups
+
     async def connect(self):
         """
         Handle WebSocket connection requests.
 
         This method is called when a client connects to the WebSocket.
-        It adds the client to the 'notifications' group and accepts the connection.
+        It adds the client to its groups and accepts the connection.
         """
         try:
             self.channel_layer = get_channel_layer()  # Get the channel layer
-            await self.channel_layer.group_add("notifications", self.channel_name)  # Join the notifications group
+            self.joined_groups = self.get_groups()
+            for group in self.joined_groups:
+                await self.channel_layer.group_add(group, self.channel_name)  # Join the group
             await self.accept()  # Accept the WebSocket connection
         except Exception as e:
             # Log the error or handle it appropriately
@@ -34,13 +55,14 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         Handle WebSocket disconnection requests.
 
         This method is called when a client disconnects from the WebSocket.
-        It removes the client from the 'notifications' group.
+        It removes the client from the groups it joined.
 
         Args:
             close_code (int): The code indicating why the WebSocket connection was closed.
         """
         try:
-            await self.channel_layer.group_discard("notifications", self.channel_name)  # Leave the notifications group
+            for group in getattr(self, 'joined_groups', []):
+                await self.channel_layer.group_discard(group, self.channel_name)  # Leave the group
         except Exception as e:
             # Log the error or handle it appropriately
             print(f"Error while disconnecting from notifications group: {e}")
@@ -49,17 +71,99 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         """
         Send a notification message to the WebSocket client.
 
-        This method is called when a notification event occurs. It sends the message
-        contained in the event to the connected WebSocket client.
+        This method is called when a notification event occurs. Events built by
+        broadcast() carry the encoded 'text' (or 'bytes'), which is forwarded as-is.
+        Events that only carry a 'message' are encoded here.
 
         Args:
-            event (dict): The event dictionary containing the notification message.
+            event (dict): The event dictionary containing the notification.
         """
         try:
-            message = event['message']  # Extract the message from the event
-            await self.send(text_data=json.dumps({'message': message}))  # Send the notification message to WebSocket
+            if 'text' in event:
+                await self.send(text_data=event['text'])  # Forward the pre-encoded notification
+            elif 'bytes' in event:
+                await self.send(bytes_data=event['bytes'])
+            else:
+                message = event['message']  # Extract the message from the event
+                await self.send(text_data=encode_notification(message))  # Send the notification message to WebSocket
         except KeyError:
             print("Notification event does not contain 'message' key.")
         except Exception as e:
             # Log the error or handle it appropriately
-            print(f"Error while sending notification: {e}")
\ No newline at end of file
+            print(f"Error while sending notification: {e}")
+
+class GameConsumer(NotificationConsumer):
+    """
+    A WebSocket consumer for a single game.
+
+    Players and spectators of a game connect to ws/games/<game_id>/. The connection
+    joins the game's group and its user's group, so game events are only sent to
+    the sockets watching that game.
+
+    Players can also take their turn over the socket instead of posting to the game
+    views. An action frame names the action the same way the engine does and
+    carries a request id chosen by the client:
+
+        {"type": "action", "id": 7, "action": "move", "data": {"room": "Hall"}}
+
+    Each frame is answered on the same socket with an ack holding the action's
+    result, or an error, tagged with the same id:
+
+        {"type": "ack", "id": 7, "result": {...}}
+        {"type": "error", "id": 7, "error": "It is not your turn."}
+
+    Accepted actions are then announced to the game's group like the views do, and
+    what only some players may see, such as the card shown to disprove a
+    suggestion, is sent to their user groups.
+    """
+    def get_groups(self) -> list:
+        """Return the game's group and, when logged in, the user's group."""
+        groups = [game_group(self.scope['url_route']['kwargs']['game_id'])]
+        user = self.scope.get('user')
+        if user is not None and user.is_authenticated:
+            groups.append(user_group(user.pk))
+        return groups
+
+    async def receive(self, text_data=None, bytes_data=None) -> None:
+        """
+        Apply an action frame on the shard that owns the game and acknowledge it.
+
+        Args:
+            text_data (str): The JSON action frame.
+            bytes_data (bytes): The JSON action frame, if sent as binary.
+        """
+        try:
+            frame = json.loads(text_data if text_data is not None else bytes_data)
+        except ValueError:
+            frame = None
+        if not isinstance(frame, dict):
+            await self.send_error(None, "Frames must be JSON objects.")
+            return
+
+        request_id = frame.get('id')
+        if frame.get('type') != 'action':
+            await self.send_error(request_id, f"{frame.get('type')} is not a valid frame type.")
+            return
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.send_error(request_id, "You must be logged in.")
+            return
+        data = frame.get('data', {})
+        if not isinstance(data, dict):
+            await self.send_error(request_id, "Action data must be a JSON object.")
+            return
+
+        game_id = int(self.scope['url_route']['kwargs']['game_id'])
+        try:
+            result = await router.call(game_id, 'apply', player=user.username,
+                                       action=str(frame.get('action')), data=data)
+        except (ValueError, ShardUnavailable) as e:
+            await self.send_error(request_id, str(e))
+            return
+
+        await self.send(text_data=json.dumps({'type': 'ack', 'id': request_id, 'result': result}))
+        await announce(game_id, result)
+
+    async def send_error(self, request_id, error: str) -> None:
+        """Tell the client why the frame with the given request id was rejected."""
+        await self.send(text_data=json.dumps({'type': 'error', 'id': request_id, 'error': error}))
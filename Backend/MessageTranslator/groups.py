@@ -0,0 +1,19 @@
+"""
+Names of the channel layer groups that notifications are sent to.
+
+Game events go to the group of one game and reach only the sockets watching that
+game. Messages for one person go to their user group. Only lobby-wide
+announcements, such as logins, go to the "notifications" group every socket joins.
+"""
+
+LOBBY_GROUP = "notifications"
+
+
+def game_group(game_id) -> str:
+    """Return the group of the sockets watching a game, players and spectators alike."""
+    return f"game_{game_id}"
+
+
+def user_group(user_id) -> str:
+    """Return the group of every socket opened by one user."""
+    return f"user_{user_id}"
@@ -0,0 +1,116 @@
+"""
+Keyset pagination of the chat history.
+
+Pages are read newest first. A cursor names the (timestamp, id) of a message, and a
+page holds the messages just before or just after it in that order. Each page is
+one range scan of the (channel, timestamp, id) index, however many messages are
+older, and fetches the sender's name in the same query. The latest page of a
+channel is served from the recent message cache when it can be.
+"""
+from datetime import datetime, timezone
+
+from .cache import recent_messages
+from .models import LOBBY_CHANNEL, Message
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+ROW_FIELDS = ('id', 'timestamp', 'content', 'sender__username')
+
+
+def encode_cursor(timestamp: datetime, message_id: int) -> str:
+    """Return the cursor of a message: its timestamp in microseconds and its id."""
+    micros = (timestamp - datetime(1970, 1, 1, tzinfo=timezone.utc)) // datetime.resolution
+    return f"{micros}-{message_id}"
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Return the (timestamp, id) named by a cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        micros, message_id = (int(part) for part in cursor.split("-"))
+    except ValueError:
+        raise ValueError(f"{cursor} is not a valid cursor.") from None
+    return datetime(1970, 1, 1, tzinfo=timezone.utc) + micros * datetime.resolution, message_id
+
+
+def message_row(message: Message) -> dict:
+    """Return a saved message in the form history pages and the cache hold it."""
+    return {
+        'id': message.pk,
+        'timestamp': message.timestamp,
+        'content': message.content,
+        'sender__username': message.sender.username,
+    }
+
+
+def message_page(channel: str = LOBBY_CHANNEL, before: str = None, after: str = None,
+                 limit: int = DEFAULT_PAGE_SIZE) -> dict:
+    """
+    Return one page of a channel's chat history, newest message first.
+
+    Args:
+        channel (str): The chat channel to read.
+        before (str): Cursor of the message the page ends just before (older messages).
+        after (str): Cursor of the message the page starts just after (newer messages).
+            Without either cursor the page holds the latest messages.
+        limit (int): Number of messages on the page.
+
+    Returns:
+        dict: The page's 'messages', and the 'before' and 'after' cursors of the
+        neighbouring pages (None when there is nothing there).
+
+    Raises:
+        ValueError: If both cursors are given, a cursor is malformed or the limit is out of range.
+    """
+    if before is not None and after is not None:
+        raise ValueError("Give either before or after, not both.")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"The page size must be between 1 and {MAX_PAGE_SIZE}.")
+
+    rows = Message.objects.filter(channel=channel).values(*ROW_FIELDS)
+    if after is not None:
+        timestamp, message_id = decode_cursor(after)
+        # Walk forward from the cursor, then put the page back in newest first order.
+        # The range on timestamp alone is what lets the index seek to the cursor.
+        rows = (rows.filter(timestamp__gte=timestamp)
+                .exclude(timestamp=timestamp, id__lte=message_id)
+                .order_by('timestamp', 'id'))
+        rows = list(rows[:limit + 1])
+        return _page(rows[:limit][::-1], has_newer=len(rows) > limit, has_older=True)
+
+    if before is not None:
+        timestamp, message_id = decode_cursor(before)
+        rows = (rows.filter(timestamp__lte=timestamp)
+                .exclude(timestamp=timestamp, id__gte=message_id)
+                .order_by('-timestamp', '-id'))
+        rows = list(rows[:limit + 1])
+        return _page(rows[:limit], has_newer=True, has_older=len(rows) > limit)
+
+    cached = recent_messages.latest(channel, limit)
+    if cached is not None:
+        rows, has_older = cached
+        return _page(rows, has_newer=False, has_older=has_older)
+
+    # Read enough to fill the cache as well as the page
+    wanted = max(limit, recent_messages.size)
+    rows = list(rows.order_by('-timestamp', '-id')[:wanted + 1])
+    recent_messages.fill(channel, rows[:wanted], complete=len(rows) <= wanted)
+    return _page(rows[:limit], has_newer=False, has_older=len(rows) > limit)
+
+
+def _page(rows: list, has_newer: bool, has_older: bool) -> dict:
+    return {
+        'messages': [{
+            'id': row['id'],
+            'sender': row['sender__username'],
+            'content': row['content'],
+            'timestamp': row['timestamp'].isoformat(),
+        } for row in rows],
+        'before': encode_cursor(rows[-1]['timestamp'], rows[-1]['id']) if rows and has_older else None,
+        'after': encode_cursor(rows[0]['timestamp'], rows[0]['id']) if rows and has_newer else None,
+    }
@@ -0,0 +1,178 @@
+import atexit
+import threading
+from collections import deque
+
+from django.db import InterfaceError, OperationalError, transaction
+from django.utils import timezone
+
+from .cache import recent_messages
+from .history import message_row
+from .models import Message
+
+
+class MessageIngestQueue():
+    """
+    Writes posted chat messages to the database in batches.
+
+    add() only queues the message and returns, so a post is acknowledged without
+    waiting on the database. A background thread writes the queued messages with a
+    single bulk insert every `interval` seconds, or as soon as `max_batch` are
+    waiting. The queue holds at most `max_pending` messages: when it is full, the
+    caller writes the batch itself before its message is queued. Once written,
+    messages are added to the recent message cache.
+
+    When a batch cannot be inserted, its messages are written one at a time so
+    that one bad row does not hold back the others. A message that fails for a
+    reason that can pass, such as a lost connection or a locked database, is
+    retried with the next flushes, `max_attempts` times in all. Any other failure,
+    such as a sender deleted since the post, can never succeed, and the message is
+    moved to `dead_letters` at once.
+
+    Attributes:
+        interval (float): Seconds between flushes.
+        max_batch (int): Number of queued messages that triggers an early flush.
+        max_pending (int): Most messages the queue holds.
+        max_attempts (int): Flushes a message may fail before it is given up on.
+        autostart (bool): Start the background thread on the first add() call.
+        dead_letters (deque): The most recent messages given up on, with the error.
+    """
+
+    def __init__(self, interval: float = 0.005, max_batch: int = 500, max_pending: int = 10000,
+                 max_attempts: int = 3, autostart: bool = True):
+        self.interval = interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.autostart = autostart
+        self.dead_letters = deque(maxlen=1000)
+        self._pending = []
+        self._attempts = {}  # id() of a queued message -> flushes it has failed
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # Batches are written one at a time, in order
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add(self, sender, channel: str, content: str) -> Message:
+        """
+        Queue a message to be written.
+
+        Returns:
+            Message: The unsaved message, timestamped with the time it was posted.
+        """
+        return self.add_many(sender, [(channel, content)])[0]
+
+    def add_many(self, sender, messages: list) -> list:
+        """
+        Queue several messages from one sender, in order.
+
+        Args:
+            messages (list): (channel, content) of each message.
+
+        Returns:
+            list: The unsaved messages.
+        """
+        while True:
+            with self._lock:
+                if len(self._pending) + len(messages) <= self.max_pending or not self._pending:
+                    # Timestamps are taken under the lock so they follow the queue order
+                    queued = [Message(sender=sender, channel=channel, content=content, timestamp=timezone.now())
+                              for channel, content in messages]
+                    self._pending.extend(queued)
+                    pending = len(self._pending)
+                    break
+            self.flush()  # The queue is full: write a batch before queueing more
+
+        if self._thread is None and self.autostart:
+            self.start()
+        if pending >= self.max_batch:
+            self._wake.set()
+        return queued
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write every queued message to the database.
+
+        Never raises: messages that cannot be written are retried or dead-lettered.
+
+        Returns:
+            int: The number of messages written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                Message.objects.bulk_create(batch)
+                written = batch
+            except Exception:
+                written = self._write_one_by_one(batch)
+
+            for message in written:
+                self._attempts.pop(id(message), None)
+                if message.pk is not None:  # Only set where the database returns inserted ids
+                    recent_messages.append(message.channel, message_row(message))
+            return len(written)
+
+    def _write_one_by_one(self, batch: list) -> list:
+        """Write the messages of a failed batch one at a time. Returns the ones written."""
+        written, retry = [], []
+        for message in batch:
+            try:
+                with transaction.atomic():
+                    message.save()
+            except Exception as e:
+                message.pk = None  # The insert may have run before its transaction was rolled back
+                attempts = self._attempts.get(id(message), 0) + 1
+                if not isinstance(e, (OperationalError, InterfaceError)) or attempts >= self.max_attempts:
+                    self._attempts.pop(id(message), None)
+                    self.dead_letters.append((message, e))
+                    print(f"Dropped a chat message from {message.sender_id} on {message.channel}: {e}")
+                else:
+                    self._attempts[id(message)] = attempts
+                    retry.append(message)
+            else:
+                written.append(message)
+        if retry:
+            # Put the messages to retry back in front of anything queued since
+            with self._lock:
+                self._pending[:0] = retry
+        return written
+
+    def start(self) -> None:
+        """Start the background flushing thread."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="chat-ingest", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Stop the background thread and write anything still queued."""
+        thread = self._thread
+        if thread is not None:
+            self._stopped.set()
+            self._wake.set()
+            thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Log the error or handle it appropriately
+                print(f"Error while writing chat messages: {e}")
+
+
+ingest_queue = MessageIngestQueue()
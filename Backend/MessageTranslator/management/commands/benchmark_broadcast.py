@@ -0,0 +1,71 @@
+import asyncio
+import time
+from copy import deepcopy
+
+from django.core.management.base import BaseCommand
+
+from Backend.MessageTranslator.broadcast import notification_event
+from Backend.MessageTranslator.consumers import NotificationConsumer
+
+
+def sample_message() -> dict:
+    """Return a notification about the size of a game state update."""
+    return {
+        'event': 'state',
+        'turn': 3,
+        'players': [{'name': f"player{seat}", 'location': "Hall-Lounge Hallway",
+                     'valid_actions': ["Move", "Suggestion", "Accusation"]}
+                    for seat in range(6)],
+    }
+
+
+async def _discard(message: dict) -> None:
+    pass
+
+
+async def time_broadcast(subscribers: int, event: dict, repeat: int) -> float:
+    """
+    Return the CPU seconds of one broadcast to a group of consumers.
+
+    A broadcast delivers a copy of the event to every consumer, as the in-memory
+    channel layer does, and each consumer handles it with notify(). The layer itself
+    is left out because its receive() scans every channel, which would swamp the
+    measurement at 10,000 subscribers. Socket writes are discarded.
+    """
+    consumers = []
+    for _ in range(subscribers):
+        consumer = NotificationConsumer()
+        consumer.base_send = _discard
+        consumers.append(consumer)
+
+    best = None
+    for _ in range(repeat):
+        start = time.process_time()
+        for consumer in consumers:
+            await consumer.notify(deepcopy(event))
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    help = ("Compare the CPU cost of a broadcast when every consumer encodes the message "
+            "against encoding it once at the sender.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subscribers", type=int, nargs="+", default=[100, 1000, 10000],
+                            help="Group sizes to measure.")
+        parser.add_argument("--repeat", type=int, default=5,
+                            help="Broadcasts per measurement; the fastest is reported.")
+
+    def handle(self, *args, **options):
+        message = sample_message()
+        per_consumer = {'type': 'notify', 'message': message}
+        encoded_once = notification_event(message)
+
+        self.stdout.write(f"{'subscribers':>12} {'per-consumer ms':>16} {'encoded-once ms':>16} {'speedup':>8}")
+        for subscribers in options["subscribers"]:
+            before = asyncio.run(time_broadcast(subscribers, per_consumer, options["repeat"]))
+            after = asyncio.run(time_broadcast(subscribers, encoded_once, options["repeat"]))
+            speedup = before / after if after else float("inf")
+            self.stdout.write(f"{subscribers:>12} {before * 1000:>16.2f} {after * 1000:>16.2f} {speedup:>7.1f}x")
@@ -0,0 +1,24 @@
+import asyncio
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Backend.MessageTranslator.broker import DEFAULT_BROKER_PATH, ChannelBroker
+
+
+class Command(BaseCommand):
+    help = "Run the local broker that lets several worker processes share one channel layer."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default=getattr(settings, "CHANNEL_BROKER_PATH", None) or DEFAULT_BROKER_PATH,
+                            help="Path of the Unix socket to listen on.")
+        parser.add_argument("--capacity", type=int, default=100,
+                            help="Most messages queued on a channel nobody is receiving from.")
+
+    def handle(self, *args, **options):
+        broker = ChannelBroker(options["path"], capacity=options["capacity"])
+        self.stdout.write(f"Channel broker listening on {options['path']}")
+        try:
+            asyncio.run(broker.serve_forever())
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MessageTranslator', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='channel',
+            field=models.CharField(default='lobby', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['channel', '-timestamp', '-id'], name='message_channel_history_idx'),
+        ),
+    ]
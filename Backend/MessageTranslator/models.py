@@ -1,10 +1,22 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+LOBBY_CHANNEL = "lobby"
+
 
 class Message(models.Model):
     sender = models.ForeignKey(User, on_delete=models.CASCADE)
+    channel = models.CharField(max_length=100, default=LOBBY_CHANNEL)
     content = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the message is posted, not when the batch holding it is written
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # History pages of a channel are read newest first, with the id breaking timestamp ties
+            models.Index(fields=['channel', '-timestamp', '-id'], name='message_channel_history_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sender.username}: {self.content}"
\ No newline at end of file
@@ -3,4 +3,5 @@ from Backend.MessageTranslator import consumers # Import the consumer
 
 websocket_urlpatterns = [
     re_path(r"ws/notifications/$", consumers.NotificationConsumer.as_asgi()),
+    re_path(r"ws/games/(?P<game_id>\d+)/$", consumers.GameConsumer.as_asgi()),
 ]
\ No newline at end of file
@@ -1,3 +1,660 @@
-from django.test import TestCase
-
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+from django.conf import settings
+from django.test import override_settings
+from django.core.management import call_command
+from django.test import TestCase, SimpleTestCase, TransactionTestCase
+from django.contrib.auth.models import User
+from django.db import IntegrityError, OperationalError
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from Backend.GameEngine.board import BoardGraph
+from Backend.GameManagement.announcements import announce
+from Backend.GameManagement.live import engine as live_engine, router as live_router, write_behind as live_write_behind
+from Backend.GameManagement.sharding import ShardUnavailable
+from datetime import timedelta
+from django.urls import reverse
+from django.utils import timezone
+from channels.exceptions import ChannelFull
+from .broker import BrokerChannelLayer, ChannelBroker
+from .cache import RecentMessages, recent_messages
+from .history import decode_cursor, encode_cursor
+from .ingest import MessageIngestQueue, ingest_queue
+from .models import Message
+from .broadcast import broadcast, encode_notification, notification_event
+from .groups import LOBBY_GROUP, game_group, user_group
+from .routing import websocket_urlpatterns
 # Create your tests here.
+
+class GameGroupTest(SimpleTestCase):
+
+    async def connect(self, path, user=None):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), path)
+        if user is not None:
+            communicator.scope['user'] = user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_game_events_reach_only_that_game(self):
+        player = await self.connect("/ws/games/1/")
+        spectator = await self.connect("/ws/games/1/")
+        other_game = await self.connect("/ws/games/2/")
+        lobby = await self.connect("/ws/notifications/")
+
+        await get_channel_layer().group_send(game_group(1), {'type': 'notify', 'message': 'Your turn.'})
+
+        self.assertEqual(await player.receive_json_from(), {'message': 'Your turn.'})
+        self.assertEqual(await spectator.receive_json_from(), {'message': 'Your turn.'})
+        self.assertTrue(await other_game.receive_nothing())
+        self.assertTrue(await lobby.receive_nothing())
+
+        for communicator in (player, spectator, other_game, lobby):
+            await communicator.disconnect()
+
+    async def test_user_group_reaches_all_of_a_users_sockets(self):
+        user = User(pk=42, username='testuser')
+        game_socket = await self.connect("/ws/games/1/", user)
+        lobby_socket = await self.connect("/ws/notifications/", user)
+        anonymous = await self.connect("/ws/notifications/")
+
+        await get_channel_layer().group_send(user_group(42), {'type': 'notify', 'message': 'Hello.'})
+
+        self.assertEqual(await game_socket.receive_json_from(), {'message': 'Hello.'})
+        self.assertEqual(await lobby_socket.receive_json_from(), {'message': 'Hello.'})
+        self.assertTrue(await anonymous.receive_nothing())
+
+        for communicator in (game_socket, lobby_socket, anonymous):
+            await communicator.disconnect()
+
+    async def test_disconnect_leaves_groups(self):
+        communicator = await self.connect("/ws/games/3/")
+        await communicator.disconnect()
+        self.assertEqual(get_channel_layer().groups.get(game_group(3), {}), {})
+
+    def test_group_names(self):
+        self.assertEqual(LOBBY_GROUP, "notifications")
+        self.assertEqual(game_group(7), "game_7")
+        self.assertEqual(user_group(7), "user_7")
+
+
+class BroadcastTest(SimpleTestCase):
+
+    async def test_encoded_text_is_forwarded_unchanged(self):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), "/ws/games/5/")
+        await communicator.connect()
+
+        await broadcast(game_group(5), {'event': 'turn', 'player': 'testuser'})
+
+        text = await communicator.receive_from()
+        self.assertEqual(text, encode_notification({'event': 'turn', 'player': 'testuser'}))
+        self.assertEqual(json.loads(text), {'message': {'event': 'turn', 'player': 'testuser'}})
+        await communicator.disconnect()
+
+    async def test_message_events_are_still_encoded_by_the_consumer(self):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), "/ws/games/6/")
+        await communicator.connect()
+
+        await get_channel_layer().group_send(game_group(6), {'type': 'notify', 'message': 'Hello.'})
+
+        self.assertEqual(await communicator.receive_json_from(), {'message': 'Hello.'})
+        await communicator.disconnect()
+
+    def test_notification_event_is_encoded_once(self):
+        event = notification_event("Hello.")
+        self.assertEqual(event['type'], 'notify')
+        self.assertEqual(event['text'], '{"message": "Hello."}')
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command("benchmark_broadcast", "--subscribers", "10", "--repeat", "1", stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[1].split()[0], "10")
+
+
+class GameProtocolTest(TestCase):
+    def setUp(self):
+        live_write_behind.autostart = False
+        live_engine.start_game(9, ["testuser", "testuser2"], BoardGraph.standard(), game_seed=1)
+        self.user = User(pk=1, username='testuser')
+
+    def tearDown(self):
+        for game in live_engine.live_games():
+            live_engine.end_game(game.game_id)
+        live_write_behind.flush()
+
+    async def connect(self, user=None):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), "/ws/games/9/")
+        if user is not None:
+            communicator.scope['user'] = user
+        await communicator.connect()
+        return communicator
+
+    async def test_action_is_acknowledged_and_announced(self):
+        player = await self.connect(self.user)
+        spectator = await self.connect()
+
+        await player.send_json_to({'type': 'action', 'id': 1, 'action': 'move', 'data': {'room': 'Hall'}})
+
+        ack = await player.receive_json_from()
+        self.assertEqual(ack['type'], 'ack')
+        self.assertEqual(ack['id'], 1)
+        self.assertEqual(ack['result']['location'], 'Hall')
+        self.assertEqual(await player.receive_json_from(), {'message': 'testuser moved to the Hall.'})
+        self.assertEqual(await spectator.receive_json_from(), {'message': 'testuser moved to the Hall.'})
+        self.assertEqual(live_engine.get_game(9).players[0].currLocation,
+                         live_engine.get_game(9).board.space_id('Hall'))
+
+        await player.send_json_to({'type': 'action', 'id': 2, 'action': 'end_turn'})
+        ack = await player.receive_json_from()
+        self.assertEqual((ack['id'], ack['result']['next_player']), (2, 'testuser2'))
+
+        await player.disconnect()
+        await spectator.disconnect()
+
+    async def test_disproval_card_reaches_only_the_players_involved(self):
+        suggester, disprover, spectator = [await self.connect(await User.objects.acreate(username=name))
+                                           for name in ('alice', 'bob', 'carol')]
+
+        await announce(9, {'action': 'suggestion', 'player': 'alice', 'suspect': 'Mrs. White', 'weapon': 'Rope',
+                           'room': 'Hall', 'disprover': 'bob', 'card': 'Rope'})
+
+        public = {'message': 'alice suggested Mrs. White with the Rope in the Hall.'}
+        for communicator in (suggester, disprover, spectator):
+            self.assertEqual(await communicator.receive_json_from(), public)
+        self.assertEqual(await suggester.receive_json_from(), {'message': 'bob showed you the Rope.'})
+        self.assertEqual(await disprover.receive_json_from(), {'message': 'You showed alice the Rope.'})
+        self.assertTrue(await spectator.receive_nothing())
+        for communicator in (suggester, disprover, spectator):
+            await communicator.disconnect()
+
+    async def test_rejected_action_returns_error(self):
+        player = await self.connect(User(pk=2, username='testuser2'))
+
+        await player.send_json_to({'type': 'action', 'id': 'a', 'action': 'end_turn'})
+
+        self.assertEqual(await player.receive_json_from(),
+                         {'type': 'error', 'id': 'a', 'error': 'It is not your turn.'})
+        self.assertTrue(await player.receive_nothing())
+        await player.disconnect()
+
+    async def test_unavailable_shard_returns_error(self):
+        player = await self.connect(self.user)
+
+        with mock.patch.object(live_router, 'call', side_effect=ShardUnavailable("Shard 1 did not answer.")):
+            await player.send_json_to({'type': 'action', 'id': 6, 'action': 'end_turn'})
+            self.assertEqual(await player.receive_json_from(),
+                             {'type': 'error', 'id': 6, 'error': 'Shard 1 did not answer.'})
+        await player.disconnect()
+
+    async def test_invalid_frames(self):
+        player = await self.connect(self.user)
+
+        await player.send_to(text_data="not json")
+        self.assertEqual((await player.receive_json_from())['error'], "Frames must be JSON objects.")
+
+        await player.send_json_to({'type': 'chat', 'id': 3})
+        self.assertEqual(await player.receive_json_from(),
+                         {'type': 'error', 'id': 3, 'error': 'chat is not a valid frame type.'})
+
+        await player.send_json_to({'type': 'action', 'id': 4, 'action': 'fly', 'data': {}})
+        self.assertEqual((await player.receive_json_from())['error'], "fly is not a valid action.")
+
+        await player.send_json_to({'type': 'action', 'id': 5, 'action': 'move', 'data': {}})
+        self.assertEqual((await player.receive_json_from())['error'], "Missing field room for move.")
+        await player.disconnect()
+
+    async def test_anonymous_socket_cannot_act(self):
+        spectator = await self.connect()
+
+        await spectator.send_json_to({'type': 'action', 'id': 1, 'action': 'end_turn'})
+
+        self.assertEqual((await spectator.receive_json_from())['error'], "You must be logged in.")
+        await spectator.disconnect()
+
+
+class MessageHistoryTest(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password12345')
+        self.bob = User.objects.create_user(username='bob', password='password12345')
+        start = timezone.now()
+        for i in range(25):
+            message = Message.objects.create(sender=self.alice if i % 2 else self.bob, content=f"message {i}")
+            # Messages 10 to 14 share a timestamp, so only their ids order them
+            offset = 10 if 10 <= i < 15 else i
+            Message.objects.filter(pk=message.pk).update(timestamp=start + timedelta(seconds=offset))
+        recent_messages.clear()  # The timestamps were changed behind the cache's back
+
+    def page(self, **params):
+        response = self.client.get(reverse('messages'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_latest_page(self):
+        with self.assertNumQueries(1):
+            page = self.page(limit=5)
+        self.assertEqual([m['content'] for m in page['messages']],
+                         ["message 24", "message 23", "message 22", "message 21", "message 20"])
+        self.assertEqual(page['messages'][0]['sender'], 'bob')
+        self.assertIsNone(page['after'])
+        self.assertIsNotNone(page['before'])
+
+    def test_pages_cover_history_without_gaps(self):
+        seen = []
+        page = self.page(limit=4)
+        while True:
+            seen.extend(m['content'] for m in page['messages'])
+            if page['before'] is None:
+                break
+            page = self.page(before=page['before'], limit=4)
+        self.assertEqual(seen, [f"message {i}" for i in reversed(range(25))])
+
+    def test_after_cursor_returns_newer_messages(self):
+        older = self.page(limit=13)
+        older = self.page(before=older['before'], limit=5)  # messages 11 down to 7
+        newer = self.page(after=older['after'], limit=3)
+        self.assertEqual([m['content'] for m in newer['messages']],
+                         ["message 14", "message 13", "message 12"])
+        self.assertIsNotNone(newer['after'])
+        self.assertIsNotNone(newer['before'])
+
+    def test_invalid_requests(self):
+        for params in ({'before': 'x'}, {'limit': '0'}, {'limit': 'ten'},
+                       {'before': '1-1', 'after': '1-1'}):
+            response = self.client.get(reverse('messages'), params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_cursor_round_trip(self):
+        message = Message.objects.order_by('id').first()
+        self.assertEqual(decode_cursor(encode_cursor(message.timestamp, message.pk)),
+                         (message.timestamp, message.pk))
+
+
+class RecentMessagesTest(TestCase):
+    def setUp(self):
+        ingest_queue.autostart = False
+        recent_messages.clear()
+        self.user = User.objects.create_user(username='testuser', password='password12345')
+        self.client.login(username='testuser', password='password12345')
+
+    def row(self, i):
+        return {'id': i, 'timestamp': timezone.now(), 'content': f"message {i}", 'sender__username': 'testuser'}
+
+    def test_ring_buffer_evicts_oldest(self):
+        cache = RecentMessages(size=3)
+        for i in range(5):
+            cache.append('lobby', self.row(i))
+        rows, has_older = cache.latest('lobby', 3)
+        self.assertEqual([row['id'] for row in rows], [4, 3, 2])
+        self.assertTrue(has_older)
+        self.assertIsNone(cache.latest('lobby', 4))  # Older messages were evicted
+        self.assertIsNone(cache.latest('game_1', 1))
+        self.assertEqual(cache.stats(), {'channels': 1, 'messages': 3, 'hits': 1, 'misses': 2})
+
+    def test_complete_buffer_answers_any_page_size(self):
+        cache = RecentMessages(size=3)
+        cache.fill('lobby', [self.row(1), self.row(0)], complete=True)
+        rows, has_older = cache.latest('lobby', 50)
+        self.assertEqual([row['id'] for row in rows], [1, 0])
+        self.assertFalse(has_older)
+        for i in range(2, 4):
+            cache.append('lobby', self.row(i))
+        self.assertIsNone(cache.latest('lobby', 50))  # Message 0 fell out
+
+    def test_late_message_is_inserted_in_order(self):
+        cache = RecentMessages(size=3)
+        rows = [self.row(i) for i in range(5)]
+        cache.fill('lobby', [rows[1], rows[0]], complete=True)
+        cache.append('lobby', rows[3])
+        cache.append('lobby', rows[2])  # Written after message 3, posted before it
+        self.assertEqual([row['id'] for row in cache.latest('lobby', 3)[0]], [3, 2, 1])
+        cache.append('lobby', rows[2])
+        cache.append('lobby', rows[0])  # Older than the full buffer
+        self.assertEqual([row['id'] for row in cache.latest('lobby', 3)[0]], [3, 2, 1])
+
+        cache.append('game_1', rows[4])
+        cache.append('game_1', rows[3])  # Messages before 4 were never read: refill instead
+        self.assertIsNone(cache.latest('game_1', 1))
+
+    def test_least_recently_used_channel_is_dropped(self):
+        cache = RecentMessages(size=3, max_channels=2)
+        cache.fill('lobby', [self.row(0)], complete=True)
+        cache.fill('game_1', [self.row(1)], complete=True)
+        self.assertIsNotNone(cache.latest('lobby', 1))
+        cache.append('game_2', self.row(2))
+        self.assertIsNone(cache.latest('game_1', 1))
+        self.assertIsNotNone(cache.latest('lobby', 1))
+        self.assertEqual(cache.stats()['channels'], 2)
+
+    def test_first_page_is_served_from_cache(self):
+        for i in range(3):
+            self.client.post(reverse('messages'), {'content': f"message {i}"})
+        self.client.post(reverse('messages'), {'content': "hello", 'channel': 'game_1'})
+        ingest_queue.flush()
+
+        with self.assertNumQueries(0):
+            page = self.client.get(reverse('messages'), {'limit': 2}).json()
+        self.assertEqual([m['content'] for m in page['messages']], ["message 2", "message 1"])
+        self.assertIsNotNone(page['before'])
+        self.assertEqual((recent_messages.hits, recent_messages.misses), (1, 0))
+
+        # The buffer may be missing older messages until it has been filled from the database
+        with self.assertNumQueries(1):
+            page = self.client.get(reverse('messages'), {'limit': 10}).json()
+        with self.assertNumQueries(0):
+            cached = self.client.get(reverse('messages'), {'limit': 10}).json()
+        self.assertEqual(cached, page)
+        self.assertEqual(len(page['messages']), 3)
+        self.assertIsNone(page['before'])
+        self.assertEqual((recent_messages.hits, recent_messages.misses), (2, 1))
+
+        # Older pages always come from the database
+        with self.assertNumQueries(1):
+            older = self.client.get(reverse('messages'), {'before': encode_cursor(timezone.now(), 0)}).json()
+        self.assertEqual(len(older['messages']), 3)
+
+    def test_channels_are_separate(self):
+        self.client.post(reverse('messages'), {'content': "hello", 'channel': 'game_1'})
+        ingest_queue.flush()
+        page = self.client.get(reverse('messages'), {'channel': 'game_1'}).json()
+        self.assertEqual([m['content'] for m in page['messages']], ["hello"])
+        self.assertEqual(self.client.get(reverse('messages')).json()['messages'], [])
+
+
+class MessageIngestTest(TestCase):
+    def setUp(self):
+        ingest_queue.autostart = False
+        recent_messages.clear()
+        self.user = User.objects.create_user(username='testuser', password='password12345')
+        self.client.login(username='testuser', password='password12345')
+
+    def tearDown(self):
+        ingest_queue.flush()
+
+    def test_post_is_acknowledged_before_it_is_written(self):
+        response = self.client.post(reverse('messages'), {'content': "hello"})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json(), {'message': {'sender': 'testuser', 'content': "hello"}})
+        self.assertEqual(Message.objects.count(), 0)
+
+        self.assertEqual(ingest_queue.flush(), 1)
+        self.assertEqual(Message.objects.get().content, "hello")
+
+    def test_batch_is_one_insert(self):
+        queue = MessageIngestQueue(autostart=False)
+        posted = [queue.add(self.user, 'lobby', f"message {i}") for i in range(20)]
+        with self.assertNumQueries(1):
+            self.assertEqual(queue.flush(), 20)
+        self.assertEqual(list(Message.objects.order_by('timestamp', 'id').values_list('content', flat=True)),
+                         [f"message {i}" for i in range(20)])
+        self.assertEqual([message.timestamp for message in posted],
+                         sorted(message.timestamp for message in posted))
+        rows, _ = recent_messages.latest('lobby', 20)
+        self.assertEqual(rows[0]['content'], "message 19")
+
+    def test_full_queue_writes_before_queueing(self):
+        queue = MessageIngestQueue(max_pending=5, autostart=False)
+        for i in range(12):
+            queue.add(self.user, 'lobby', f"message {i}")
+        self.assertEqual(Message.objects.count(), 10)
+        self.assertEqual(queue.pending(), 2)
+        queue.stop()
+        self.assertEqual(Message.objects.count(), 12)
+
+    def test_failing_rows_are_retried_then_dead_lettered(self):
+        queue = MessageIngestQueue(max_attempts=2, autostart=False)
+        queue.add(self.user, 'lobby', "stuck")
+        with mock.patch.object(Message, 'save', side_effect=OperationalError("database is locked")), \
+                mock.patch.object(type(Message.objects), 'bulk_create', side_effect=OperationalError("database is locked")):
+            self.assertEqual(queue.flush(), 0)
+            self.assertEqual(queue.pending(), 1)
+            self.assertEqual(queue.flush(), 0)
+        self.assertEqual(queue.pending(), 0)
+        self.assertEqual([message.content for message, _ in queue.dead_letters], ["stuck"])
+
+        queue.add(self.user, 'lobby', "next")
+        self.assertEqual(queue.flush(), 1)
+
+    def test_retried_row_reaches_the_first_page(self):
+        self.assertEqual(self.client.get(reverse('messages')).json()['messages'], [])  # Cache the empty lobby
+        save, locked = Message.save, []
+
+        def save_after_a_lock(message, *args, **kwargs):
+            if message.content == "A" and not locked:
+                locked.append(message)  # Only the first attempt fails, so A is written after B
+                raise OperationalError("database is locked")
+            return save(message, *args, **kwargs)
+
+        ingest_queue.add(self.user, 'lobby', "A")
+        ingest_queue.add(self.user, 'lobby', "B")
+        with mock.patch.object(Message, 'save', autospec=True, side_effect=save_after_a_lock), \
+                mock.patch.object(type(Message.objects), 'bulk_create', side_effect=OperationalError("database is locked")):
+            self.assertEqual(ingest_queue.flush(), 1)
+            self.assertEqual(ingest_queue.flush(), 1)
+
+        self.assertEqual(list(Message.objects.order_by('timestamp', 'id').values_list('content', flat=True)), ["A", "B"])
+        with self.assertNumQueries(0):
+            page = self.client.get(reverse('messages')).json()
+        self.assertEqual([message['content'] for message in page['messages']], ["B", "A"])
+
+    def test_bulk_post(self):
+        body = [{'content': "first"}, {'content': "second", 'channel': 'game_1'}]
+        response = self.client.post(reverse('messages_bulk'), json.dumps(body), content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json(), {'accepted': 2})
+        ingest_queue.flush()
+        self.assertEqual(list(Message.objects.order_by('id').values_list('channel', 'content')),
+                         [('lobby', "first"), ('game_1', "second")])
+
+    def test_bulk_post_rejects_bad_bodies(self):
+        for body in ('{"content": "x"}', 'not json', '[{"channel": "lobby"}]', '["x"]'):
+            response = self.client.post(reverse('messages_bulk'), body, content_type='application/json')
+            self.assertEqual(response.status_code, 400, body)
+        self.assertEqual(ingest_queue.pending(), 0)
+
+    def test_post_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.post(reverse('messages'), {'content': "hello"}).status_code, 403)
+        self.assertEqual(self.client.post(reverse('messages_bulk'), '[]',
+                                          content_type='application/json').status_code, 403)
+
+
+class MessageIngestThreadTest(TransactionTestCase):
+    def test_bad_row_does_not_block_the_queue(self):
+        user = User.objects.create_user(username='testuser', password='password12345')
+        gone = User.objects.create_user(username='gone', password='password12345')
+        queue = MessageIngestQueue(max_pending=3, autostart=False)
+        queue.add_many(user, [('lobby', "first")])
+        queue.add(gone, 'lobby', "orphan")
+        queue.add(user, 'lobby', "second")
+        User.objects.filter(pk=gone.pk).delete()
+
+        for i in range(3):
+            queue.add(user, 'lobby', f"later {i}")  # Writes the full queue first, without raising
+        self.assertEqual(queue.flush(), 3)
+        self.assertEqual(list(Message.objects.order_by('id').values_list('content', flat=True)),
+                         ["first", "second", "later 0", "later 1", "later 2"])
+        (message, error), = queue.dead_letters
+        self.assertEqual(message.content, "orphan")
+        self.assertIsInstance(error, IntegrityError)
+
+    def test_background_thread_flushes(self):
+        user = User.objects.create_user(username='testuser', password='password12345')
+        queue = MessageIngestQueue(interval=0.001)
+        queue.add(user, 'lobby', "hello")
+        for _ in range(1000):
+            if not queue.pending():
+                break
+            time.sleep(0.001)
+        queue.stop()
+        self.assertEqual(queue.pending(), 0)
+        self.assertEqual(Message.objects.get().content, "hello")
+
+
+class BrokerChannelLayerTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "channels.sock")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def start(self, **kwargs):
+        broker = ChannelBroker(self.path, **kwargs)
+        await broker.start()
+        return broker
+
+    async def test_group_send_reaches_every_worker(self):
+        broker = await self.start()
+        first, second = BrokerChannelLayer(self.path), BrokerChannelLayer(self.path)
+        channel_a = await first.new_channel()
+        channel_b = await second.new_channel()
+        await first.group_add("game_1", channel_a)
+        await second.group_add("game_1", channel_b)
+
+        await second.group_send("game_1", {'type': 'notify', 'text': 'hello', 'data': b'\x00\xff'})
+
+        for layer, channel in ((first, channel_a), (second, channel_b)):
+            message = await asyncio.wait_for(layer.receive(channel), timeout=1)
+            self.assertEqual(message, {'type': 'notify', 'text': 'hello', 'data': b'\x00\xff'})
+
+        await first.group_discard("game_1", channel_a)
+        await second.group_send("game_1", {'type': 'notify', 'text': 'again'})
+        self.assertEqual((await asyncio.wait_for(second.receive(channel_b), timeout=1))['text'], 'again')
+        self.assertTrue(first._connections[asyncio.get_running_loop()].queue(channel_a).empty())
+
+        await first.close()
+        await second.close()
+        await broker.close()
+
+    async def test_named_channels_are_queued_by_the_broker(self):
+        broker = await self.start(capacity=2)
+        sender, receiver = BrokerChannelLayer(self.path), BrokerChannelLayer(self.path)
+
+        waiting = asyncio.ensure_future(receiver.receive("worker"))
+        await asyncio.sleep(0.01)
+        await sender.send("worker", {'type': 'first'})
+        self.assertEqual(await asyncio.wait_for(waiting, timeout=1), {'type': 'first'})
+
+        await sender.send("worker", {'type': 'second'})
+        await sender.send("worker", {'type': 'third'})
+        with self.assertRaises(ChannelFull):
+            await sender.send("worker", {'type': 'fourth'})
+        self.assertEqual(await receiver.receive("worker"), {'type': 'second'})
+
+        await sender.close()
+        await receiver.close()
+        await broker.close()
+
+    async def test_received_channels_drop_their_queues(self):
+        broker = await self.start()
+        layer = BrokerChannelLayer(self.path, expiry=0)
+        connection = await layer._connection()
+        reply_to = await layer.new_channel()
+        await layer.send(reply_to, {'type': 'reply'})
+        self.assertEqual(await asyncio.wait_for(layer.receive(reply_to), timeout=1), {'type': 'reply'})
+        self.assertNotIn(reply_to, connection.queues)
+
+        # A reply nobody receives is dropped once it has expired
+        late = await layer.new_channel()
+        await layer.send(late, {'type': 'late'})
+        await asyncio.sleep(0.05)
+        other = await layer.new_channel()
+        await layer.send(other, {'type': 'other'})
+        await asyncio.sleep(0.05)
+        self.assertNotIn(late, connection.queues)
+        self.assertEqual(await layer.receive(other), {'type': 'other'})
+
+        await layer.close()
+        await broker.close()
+
+    async def test_cancelled_receive_loses_no_message(self):
+        broker = await self.start()
+        sender, receiver = BrokerChannelLayer(self.path), BrokerChannelLayer(self.path)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(receiver.receive("game-shard-0"), timeout=0.05)
+        await sender.send("game-shard-0", {'type': 'first'})
+        self.assertEqual(await asyncio.wait_for(receiver.receive("game-shard-0"), timeout=1), {'type': 'first'})
+
+        # Cancelled after the broker has handed over the message, before the receiver has read it
+        waiting = asyncio.ensure_future(receiver.receive("game-shard-0"))
+        await asyncio.sleep(0.01)
+        transport = receiver._connections[asyncio.get_running_loop()].writer.transport
+        transport.pause_reading()
+        await sender.send("game-shard-0", {'type': 'second'})
+        waiting.cancel()
+        transport.resume_reading()
+        await asyncio.gather(waiting, return_exceptions=True)
+        self.assertEqual(await asyncio.wait_for(receiver.receive("game-shard-0"), timeout=1), {'type': 'second'})
+
+        await sender.close()
+        await receiver.close()
+        await broker.close()
+
+    async def test_memberships_survive_a_broker_restart(self):
+        broker = await self.start()
+        layer = BrokerChannelLayer(self.path)
+        channel = await layer.new_channel()
+        await layer.group_add("lobby", channel)
+        await layer.group_add("game_1", channel)
+        await layer.group_discard("game_1", channel)
+
+        await broker.close()
+        await asyncio.sleep(0.05)
+        broker = await self.start()
+        await layer.group_send("lobby", {'type': 'notify', 'text': 'back'})
+
+        self.assertEqual(await asyncio.wait_for(layer.receive(channel), timeout=1), {'type': 'notify', 'text': 'back'})
+        self.assertEqual(broker.group_count(), 1)
+        await layer.close()
+        await broker.close()
+
+    async def test_groups_forget_workers_that_disconnect(self):
+        broker = await self.start()
+        layer = BrokerChannelLayer(self.path)
+        await layer.group_add("lobby", await layer.new_channel())
+        self.assertEqual(broker.group_count(), 1)
+
+        await layer.close()
+        await asyncio.sleep(0.05)
+        self.assertEqual(broker.group_count(), 0)
+        await broker.close()
+
+    async def test_send_from_another_process(self):
+        broker = await self.start()
+        layer = BrokerChannelLayer(self.path)
+        channel = await layer.new_channel()
+        await layer.group_add("lobby", channel)
+
+        script = ("import asyncio; from Backend.MessageTranslator.broker import BrokerChannelLayer; "
+                  f"asyncio.run(BrokerChannelLayer({self.path!r}).group_send('lobby', {{'type': 'notify', 'text': 'hi'}}))")
+        process = await asyncio.create_subprocess_exec(sys.executable, "-c", script, cwd=settings.BASE_DIR)
+        self.assertEqual(await process.wait(), 0)
+
+        self.assertEqual(await asyncio.wait_for(layer.receive(channel), timeout=5), {'type': 'notify', 'text': 'hi'})
+        await layer.close()
+        await broker.close()
+
+    async def test_consumers_on_the_broker_layer(self):
+        broker = await self.start()
+        layers = {'default': {'BACKEND': 'Backend.MessageTranslator.broker.BrokerChannelLayer',
+                              'CONFIG': {'path': self.path}}}
+        with override_settings(CHANNEL_LAYERS=layers):
+            communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), "/ws/games/4/")
+            await communicator.connect()
+
+            await BrokerChannelLayer(self.path).group_send(game_group(4), notification_event("Your turn."))
+
+            self.assertEqual(await communicator.receive_json_from(), {'message': "Your turn."})
+            await communicator.disconnect()
+            await get_channel_layer().close()
+        await broker.close()
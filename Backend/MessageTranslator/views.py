@@ -1,14 +1,74 @@
 # backend/messaging/views.py
+import json
 from django.http import JsonResponse
 from django.views import View
-from .models import Message
+from .history import DEFAULT_PAGE_SIZE, message_page
+from .ingest import ingest_queue
+from .models import LOBBY_CHANNEL
+
+MAX_BULK_MESSAGES = 1000
 
 class MessageView(View):
     def get(self, request):
-        messages = Message.objects.all().order_by('-timestamp')[:50]
-        return JsonResponse({'messages': [{'sender': msg.sender.username, 'content': msg.content} for msg in messages]})
+        """
+        Return a page of the chat history, newest message first.
+
+        Query parameters 'channel' picks the chat channel (the lobby by default),
+        'before' and 'after' take the cursors returned with a previous page, and
+        'limit' sets the page size.
+        """
+        limit = request.GET.get('limit', str(DEFAULT_PAGE_SIZE))
+        if not limit.isdigit():
+            return JsonResponse({'error': f"{limit} is not a valid page size."}, status=400)
+        try:
+            page = message_page(channel=request.GET.get('channel', LOBBY_CHANNEL),
+                                before=request.GET.get('before'),
+                                after=request.GET.get('after'),
+                                limit=int(limit))
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        return JsonResponse(page)
 
     def post(self, request):
+        """
+        Post a chat message.
+
+        The message is queued and written with the next batch, so it is
+        acknowledged with 202 before it reaches the database.
+        """
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'You must be logged in.'}, status=403)
         content = request.POST['content']
-        message = Message.objects.create(sender=request.user, content=content)
-        return JsonResponse({'message': {'sender': message.sender.username, 'content': message.content}}, status=201)
\ No newline at end of file
+        channel = request.POST.get('channel', LOBBY_CHANNEL)
+        message = ingest_queue.add(request.user, channel, content)
+        return JsonResponse({'message': {'sender': message.sender.username, 'content': message.content}}, status=202)
+
+
+class MessageBulkView(View):
+    def post(self, request):
+        """
+        Post several chat messages at once, for replay and import tools.
+
+        The body is a JSON array of objects with a 'content' and an optional
+        'channel'. The messages are queued in order and written in batches.
+        """
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'You must be logged in.'}, status=403)
+        try:
+            items = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({'error': 'The body must be a JSON array of messages.'}, status=400)
+        if not isinstance(items, list):
+            return JsonResponse({'error': 'The body must be a JSON array of messages.'}, status=400)
+        if len(items) > MAX_BULK_MESSAGES:
+            return JsonResponse({'error': f"At most {MAX_BULK_MESSAGES} messages can be posted at once."}, status=400)
+
+        messages = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not isinstance(item.get('content'), str) \
+                    or not isinstance(item.get('channel', LOBBY_CHANNEL), str):
+                return JsonResponse({'error': f"Message {index} needs a 'content' string."}, status=400)
+            messages.append((item.get('channel', LOBBY_CHANNEL), item['content']))
+
+        ingest_queue.add_many(request.user, messages)
+        return JsonResponse({'accepted': len(messages)}, status=202)
\ No newline at end of file
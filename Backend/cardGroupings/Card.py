@@ -20,11 +20,26 @@ class Card:
     """
     Class object to represent valid card types in the game clue-less.
 
+    There are exactly 21 cards in the game, so every card is created once when this
+    module is imported and kept in a registry. Calling Card(name, card_type) or
+    Card.from_name(name) returns the registered instance instead of building a new
+    object, which makes comparisons identity checks and lets cards be used in sets
+    and as dictionary keys.
+
+    Each card carries a stable ordinal (0-20): suspects first, then weapons, then
+    rooms, each in the order of the VALID_* lists below. A card's mask is
+    1 << ordinal, so any group of cards fits in a single integer bitset.
+
     Attributes:
         VALID_SUSPECTS: List of valid suspect
         VALID_WEAPONS: List of valid weapons
         VALID_ROOMS: List of valid rooms
+        ALL_CARDS: Tuple of every card, indexed by ordinal
+        SORTED_CARDS: Tuple of every card in sort order
+        SUSPECT_MASK, WEAPON_MASK, ROOM_MASK, ALL_MASK: Bitsets of each card type
     """
+    __slots__ = ("_name", "_card_type", "_ordinal", "_mask", "_hash", "_sort_rank")
+
     VALID_SUSPECTS = [
         "Miss Scarlet",
         "Professor Plum",
@@ -55,16 +70,59 @@ class Card:
         "Billiard Room"
         ]
 
-    def __init__(self, name: str, card_type: CardType):
-        if card_type == CardType.SUSPECT and name not in self.VALID_SUSPECTS:
-            raise ValueError(f"{name} is not a valid suspect.")
-        elif card_type == CardType.WEAPON and name not in self.VALID_WEAPONS:
-            raise ValueError(f"{name} is not a valid weapon.")
-        elif card_type == CardType.ROOM and name not in self.VALID_ROOMS:
-            raise ValueError(f"{name} is not a valid room.")
-
-        self._name = name
-        self._card_type = card_type
+    # Filled in once the class body has been evaluated (see _build_registry)
+    ALL_CARDS: tuple = ()
+    SORTED_CARDS: tuple = ()
+    SUSPECT_MASK: int = 0
+    WEAPON_MASK: int = 0
+    ROOM_MASK: int = 0
+    ALL_MASK: int = 0
+    _BY_KEY: dict = {}
+    _BY_NAME: dict = {}
+
+    def __new__(cls, name: str, card_type: CardType):
+        card = cls._BY_KEY.get((name, card_type))
+        if card is None:
+            if card_type == CardType.SUSPECT:
+                raise ValueError(f"{name} is not a valid suspect.")
+            elif card_type == CardType.WEAPON:
+                raise ValueError(f"{name} is not a valid weapon.")
+            elif card_type == CardType.ROOM:
+                raise ValueError(f"{name} is not a valid room.")
+            raise ValueError(f"{card_type} is not a valid card type.")
+        return card
+
+    @classmethod
+    def from_name(cls, name: str) -> "Card":
+        """Return the card with the given name. Card names are unique across types."""
+        try:
+            return cls._BY_NAME[name]
+        except KeyError:
+            raise ValueError(f"{name} is not a valid card.") from None
+
+    @classmethod
+    def from_ordinal(cls, ordinal: int) -> "Card":
+        """Return the card with the given ordinal."""
+        return cls.ALL_CARDS[ordinal]
+
+    @classmethod
+    def mask_of(cls, cards) -> int:
+        """Return the bitset of an iterable of cards."""
+        mask = 0
+        for card in cards:
+            mask |= card._mask
+        return mask
+
+    @classmethod
+    def from_mask(cls, mask: int) -> list:
+        """Return the cards in a bitset, in ordinal order."""
+        cards = []
+        all_cards = cls.ALL_CARDS
+        while mask:
+            low = mask & -mask
+            cards.append(all_cards[low.bit_length() - 1])
+            mask ^= low
+        return cards
 
     def get_name(self) -> str:
         return self._name
@@ -72,21 +130,38 @@ class Card:
     def get_card_type(self) -> CardType:
         return self._card_type
 
-    # Compare function
+    def get_ordinal(self) -> int:
+        return self._ordinal
+
+    def get_mask(self) -> int:
+        return self._mask
+
+    # Compare function. Cards are interned, so identity is equality.
     def __eq__(self, other) -> bool:
         if not isinstance(other, Card):
             return NotImplemented
-        return self._name == other._name and self._card_type == other._card_type
+        return self is other
+
+    def __hash__(self) -> int:
+        return self._hash
 
     # Less than Function : Used for sorting
     def __lt__(self, other):
         if not isinstance(other, Card):
             return NotImplemented
 
-        # Compare by card_type first, then by name
-        if self._card_type == other.get_card_type():
-            return self._name < other.get_name()
-        return self._card_type.value < other.get_card_type().value
+        # Compare by card_type first, then by name (precomputed in _sort_rank)
+        return self._sort_rank < other._sort_rank
+
+    # Copies and pickles resolve back to the registered instance
+    def __reduce__(self):
+        return (Card, (self._name, self._card_type))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __repr__(self) -> str:
         return f"Card(name='{self._name}', card_type={self._card_type})"
@@ -94,6 +169,38 @@ class Card:
     def __str__(self) -> str:
         return f"name='{self._name}', card_type={self._card_type}"
 
+
+def _build_registry():
+    """Create the 21 card instances and the lookup tables that index them."""
+    cards = []
+    for names, card_type in ((Card.VALID_SUSPECTS, CardType.SUSPECT),
+                             (Card.VALID_WEAPONS, CardType.WEAPON),
+                             (Card.VALID_ROOMS, CardType.ROOM)):
+        for name in names:
+            card = object.__new__(Card)
+            card._name = name
+            card._card_type = card_type
+            card._ordinal = len(cards)
+            card._mask = 1 << card._ordinal
+            card._hash = card._ordinal  # stable across processes, unlike hash(str)
+            cards.append(card)
+
+    sorted_cards = sorted(cards, key=lambda c: (c._card_type.value, c._name))
+    for rank, card in enumerate(sorted_cards):
+        card._sort_rank = rank
+
+    Card.ALL_CARDS = tuple(cards)
+    Card.SORTED_CARDS = tuple(sorted_cards)
+    Card.SUSPECT_MASK = Card.mask_of(c for c in cards if c._card_type == CardType.SUSPECT)
+    Card.WEAPON_MASK = Card.mask_of(c for c in cards if c._card_type == CardType.WEAPON)
+    Card.ROOM_MASK = Card.mask_of(c for c in cards if c._card_type == CardType.ROOM)
+    Card.ALL_MASK = (1 << len(cards)) - 1
+    Card._BY_KEY = {(card._name, card._card_type): card for card in cards}
+    Card._BY_NAME = {card._name: card for card in cards}
+
+
+_build_registry()
+
 if __name__ == "__main__":
     card1 = Card(Card.VALID_SUSPECTS[2], CardType.SUSPECT)
     card2 = Card(Card.VALID_ROOMS[4], CardType.ROOM)
@@ -106,4 +213,5 @@ if __name__ == "__main__":
     # Comparing cards
     card4 = Card(Card.VALID_SUSPECTS[2], CardType.SUSPECT)
     print(card1 == card4)  # Output: True
-    print(card1 == card2)  # Output: False
\ No newline at end of file
+    print(card1 == card2)  # Output: False
+    print(card1 is card4)  # Output: True
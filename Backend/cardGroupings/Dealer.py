@@ -0,0 +1,174 @@
+from .Card import Card, CardType
+from .Deck import Deck
+from .Hand import Hand
+from hashlib import blake2b
+from random import Random
+import numpy as np
+
+def derive_seed(base_seed, index: int) -> int:
+    """
+    Derive the seed of one game from a base seed and the game's index.
+
+    The result only depends on the two arguments, so workers in different
+    processes can derive their games' seeds without sharing any RNG state.
+    """
+    digest = blake2b(f"{base_seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+def game_rng(game_seed) -> Random:
+    """Return an independent random generator seeded from a game seed."""
+    return Random(game_seed)
+
+def deal_game(n_players: int, game_seed=None) -> tuple:
+    """
+    Draw the solution envelope and deal the hands of a single game.
+
+    The same game seed always produces the same envelope and hands. Without a
+    seed the game is dealt from a fresh, unseeded generator.
+
+    Args:
+        n_players (int): Number of players in the game.
+        game_seed: Seed of the game's random generator.
+
+    Returns:
+        tuple: The envelope as a Hand and the list of dealt Hands, in seat order.
+    """
+    if not 1 <= n_players <= len(Card.VALID_SUSPECTS):
+        raise ValueError(f"{n_players} is not a valid number of players.")
+    rng = game_rng(game_seed)
+
+    envelope = Hand([
+        Card(rng.choice(Card.VALID_SUSPECTS), CardType.SUSPECT),
+        Card(rng.choice(Card.VALID_WEAPONS), CardType.WEAPON),
+        Card(rng.choice(Card.VALID_ROOMS), CardType.ROOM),
+    ])
+
+    deck = Deck(rng)
+    for card in Card.ALL_CARDS:
+        if not envelope.has_card(card):
+            deck.add_card(card)
+    deck.shuffle()
+
+    hands = [Hand() for _ in range(n_players)]
+    seat = 0
+    while len(deck):
+        hands[seat].add_card(deck.deal())
+        seat = (seat + 1) % n_players
+    return envelope, hands
+
+
+class DealBatch():
+    """
+    DealBatch: The solution envelopes and dealt hands of many games at once
+
+    Every card set is stored as an integer bitset over card ordinals (see
+    Card.get_mask), so a whole batch is two small integer arrays. Deck and Hand
+    objects for a single game are only built when asked for.
+
+    Attributes:
+        envelopes (ndarray: int64): Envelope bitset of each game, shape (n_games,)
+        hands (ndarray: int64): Hand bitset of each seat, shape (n_games, n_players)
+        order (ndarray: uint8): Card ordinals in deal order, shape (n_games, 18)
+    """
+    def __init__(self, envelopes: np.ndarray, hands: np.ndarray, order: np.ndarray):
+        self.envelopes = envelopes
+        self.hands = hands
+        self.order = order
+
+    def __len__(self) -> int:
+        return len(self.envelopes)
+
+    def get_player_count(self) -> int:
+        """Return the number of players dealt into each game."""
+        return self.hands.shape[1]
+
+    def get_envelope(self, game: int) -> Hand:
+        """Return the solution envelope of a game as a Hand."""
+        return Hand.from_mask(int(self.envelopes[game]))
+
+    def get_hand(self, game: int, seat: int) -> Hand:
+        """Return the hand dealt to one seat of a game."""
+        return Hand.from_mask(int(self.hands[game, seat]))
+
+    def get_hands(self, game: int) -> list:
+        """Return the hands dealt to every seat of a game, in seat order."""
+        return [Hand.from_mask(int(mask)) for mask in self.hands[game]]
+
+    def get_deck(self, game: int) -> Deck:
+        """
+        Return the shuffled deck of a game after the envelope was drawn.
+
+        Dealing the returned deck round-robin from seat 0 reproduces get_hands(game).
+        """
+        deck = Deck()
+        for ordinal in self.order[game][::-1]:
+            deck.add_card(Card.from_ordinal(int(ordinal)))
+        return deck
+
+
+def deal_batch(n_games: int, n_players: int, rng: np.random.Generator = None, seed=None) -> DealBatch:
+    """
+    Draw the solution envelopes and deal the remaining cards for many games at once.
+
+    One suspect, one weapon and one room are drawn per game for the envelope. The
+    other 18 cards are put in a random order with a single vectorized sort and dealt
+    round-robin starting from seat 0, so hand sizes differ by at most one card.
+
+    The whole batch is reproducible from its seed. Use deal_game to reproduce a
+    single game from its own seed.
+
+    Args:
+        n_games (int): Number of games to deal.
+        n_players (int): Number of players in every game.
+        rng (Generator): NumPy random generator. Created from seed if omitted.
+        seed: Seed of the batch, used when no generator is given.
+
+    Returns:
+        DealBatch: The envelopes and hands of every game.
+    """
+    if n_games < 0:
+        raise ValueError("Number of games cannot be negative.")
+    if not 1 <= n_players <= len(Card.VALID_SUSPECTS):
+        raise ValueError(f"{n_players} is not a valid number of players.")
+    if rng is None:
+        rng = np.random.default_rng(seed)
+
+    n_suspects = len(Card.VALID_SUSPECTS)
+    n_weapons = len(Card.VALID_WEAPONS)
+    n_rooms = len(Card.VALID_ROOMS)
+    first_weapon = Card(Card.VALID_WEAPONS[0], CardType.WEAPON).get_ordinal()
+    first_room = Card(Card.VALID_ROOMS[0], CardType.ROOM).get_ordinal()
+    n_cards = len(Card.ALL_CARDS)
+
+    games = np.arange(n_games)
+    suspects = rng.integers(0, n_suspects, n_games)
+    weapons = rng.integers(0, n_weapons, n_games) + first_weapon
+    rooms = rng.integers(0, n_rooms, n_games) + first_room
+
+    # Random sort keys in [0, 1); the envelope cards get keys past the end so they
+    # sort last and are cut off, leaving a uniform permutation of the other cards.
+    keys = rng.random((n_games, n_cards))
+    keys[games, suspects] = 2.0
+    keys[games, weapons] = 2.0
+    keys[games, rooms] = 2.0
+    order = np.argsort(keys, axis=1)[:, :n_cards - 3].astype(np.uint8)
+
+    bits = np.left_shift(np.int64(1), order.astype(np.int64))
+    hands = np.empty((n_games, n_players), dtype=np.int64)
+    for seat in range(n_players):
+        hands[:, seat] = bits[:, seat::n_players].sum(axis=1)
+
+    envelopes = (np.left_shift(np.int64(1), suspects)
+                 | np.left_shift(np.int64(1), weapons)
+                 | np.left_shift(np.int64(1), rooms))
+
+    return DealBatch(envelopes, hands, order)
+
+# Sample
+if __name__ == "__main__":
+    batch = deal_batch(3, 4)
+
+    for game in range(len(batch)):
+        print(f"Game {game} envelope:", batch.get_envelope(game).get_hand())
+        for seat, hand in enumerate(batch.get_hands(game)):
+            print(f"  Seat {seat}:", hand.get_hand())
@@ -1,5 +1,5 @@
-from Card import Card, CardType
-from random import shuffle
+from .Card import Card, CardType
+from random import Random
 
 class Deck():
     """
@@ -8,44 +8,57 @@ class Deck():
     This class provides methods for the management of a deck of cards. It provides
     operations for shuffling, dealing, adding, and removing cards.
 
+    The deck keeps its cards in a list, since shuffling and dealing depend on order,
+    and mirrors them in an integer bitset (see Card.get_mask) so membership and
+    duplicate checks do not scan the list.
+
+    Each deck shuffles with its own random generator instead of the module-global
+    one. Pass a seeded generator (see Dealer.game_rng) to make shuffles repeatable.
+
     Attributes:
         cards (List: Card): List of Cards in the deck
+        mask (int): Bitset of the cards in the deck
+        rng (Random): Random generator used by shuffle
     """
-    def __init__(self):
+    def __init__(self, rng: Random = None):
         # Initialize Deck with an empty list of cards
         self._cards = []
-
-    def add_card(self, card: Card):
-        if card in self.cards:
-            raise ValueError(f"The card '{card._name}' is already in the deck.")
-        self.cards.append(card)
+        self._mask = 0
+        self._rng = rng if rng is not None else Random()
 
     def __contains__(self, card):
-        return card in self._cards
+        return isinstance(card, Card) and bool(self._mask & card._mask)
+
+    def __len__(self) -> int:
+        return len(self._cards)
 
     def shuffle(self):
         """Shuffle the deck of cards."""
-        shuffle(self._cards)
+        self._rng.shuffle(self._cards)
 
     def deal(self) -> Card:
         """Deal a card from the deck. Returns None if the deck is empty."""
         if self._cards:
-            return self._cards.pop()
+            card = self._cards.pop()
+            self._mask ^= card._mask
+            return card
         return None
 
     def add_card(self, card: Card):
         """Add a card to the deck."""
         if isinstance(card, Card):
-            if card in self._cards:
+            if self._mask & card._mask:
                 raise ValueError(f"The card '{card._name}' is already in the deck.")
             self._cards.append(card)
+            self._mask |= card._mask
         else:
             raise ValueError("Must add an instance of Card.")
 
     def remove_card(self, card: Card):
         """Remove a card from the deck."""
-        if card in self._cards:
+        if card in self:
             self._cards.remove(card)
+            self._mask ^= card._mask
         else:
             raise ValueError("Card not found in the deck.")
 
@@ -53,6 +66,10 @@ class Deck():
         """Return the current state of the deck."""
         return self._cards
 
+    def get_mask(self) -> int:
+        """Return the bitset of the cards in the deck."""
+        return self._mask
+
 # Sample
 if __name__ == "__main__":
     deck = Deck()
@@ -1,5 +1,4 @@
-from Card import Card, CardType
-from random import shuffle
+from .Card import Card, CardType
 
 class Hand():
     """
@@ -8,48 +7,112 @@ class Hand():
     This class provides methods for the management of a hand of cards. It provides
     operations for shuffling, dealing, adding, and removing cards.
 
+    The hand is stored as a single integer bitset over card ordinals (see
+    Card.get_mask), so membership checks and set operations between hands are
+    one integer operation each.
+
     Attributes:
-        cards (List: Card): List of Cards in the hand
+        mask (int): Bitset of the cards in the hand
     """
-    def __init__(self):
-        # Initialize Hand with an empty list of cards
-        self._cards = []
+    def __init__(self, cards=None):
+        # Initialize Hand with an empty bitset of cards
+        self._mask = 0
+        self._sorted = False
+        if cards is not None:
+            for card in cards:
+                self.add_card(card)
+
+    @classmethod
+    def from_mask(cls, mask: int) -> "Hand":
+        """Build a hand directly from a card bitset."""
+        hand = cls()
+        hand._mask = mask
+        return hand
 
     def add_card(self, card: Card):
         """Add a card to the hand."""
         if isinstance(card, Card):
-            if card in self._cards:
+            if self._mask & card._mask:
                 raise ValueError(f"The card '{card._name}' is already in the hand.")
-            self._cards.append(card)
+            self._mask |= card._mask
         else:
             raise ValueError("Must add an instance of Card.")
 
     def remove_card(self, card: Card):
         """Remove a card from the hand."""
-        if card in self._cards:
-            self._cards.remove(card)
+        if isinstance(card, Card) and self._mask & card._mask:
+            self._mask ^= card._mask
         else:
             raise ValueError("Card not found in the hand.")
 
     def get_hand(self) -> list:
         """Return the current state of the hand."""
-        return self._cards
+        if self._sorted:
+            mask = self._mask
+            return [card for card in Card.SORTED_CARDS if mask & card._mask]
+        return Card.from_mask(self._mask)
+
+    def get_mask(self) -> int:
+        """Return the bitset of the cards in hand."""
+        return self._mask
 
     def clear_hand(self):
         """Clear all cards from the hand."""
-        self._cards.clear()
+        self._mask = 0
+        self._sorted = False
 
     def has_card(self, card: Card):
         """Check if a specific card is in hand."""
-        return card in self._cards
+        return isinstance(card, Card) and bool(self._mask & card._mask)
 
     def sort_hand(self):
         """Sort the cards in hand."""
-        self._cards.sort()
+        self._sorted = True
+
+    def count(self) -> int:
+        """Return the number of cards in hand."""
+        return self._mask.bit_count()
+
+    def union(self, other) -> "Hand":
+        """Return a new hand with the cards of both hands."""
+        return Hand.from_mask(self._mask | _mask_of(other))
+
+    def intersection(self, other) -> "Hand":
+        """Return a new hand with the cards held in both hands."""
+        return Hand.from_mask(self._mask & _mask_of(other))
+
+    def difference(self, other) -> "Hand":
+        """Return a new hand with the cards of this hand that are not in the other."""
+        return Hand.from_mask(self._mask & ~_mask_of(other))
+
+    def intersects(self, other) -> bool:
+        """Check if the hands share at least one card."""
+        return bool(self._mask & _mask_of(other))
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def __len__(self) -> int:
+        return self._mask.bit_count()
+
+    def __contains__(self, card) -> bool:
+        return self.has_card(card)
+
+    def __iter__(self):
+        return iter(self.get_hand())
 
     def display_hand(self):
         """Display the cards in hand."""
-        return ', '.join(str(card) for card in self._cards)
+        return ', '.join(str(card) for card in self.get_hand())
+
+
+def _mask_of(other) -> int:
+    """Return the bitset of a Hand, Deck, Card or raw integer mask."""
+    if isinstance(other, int):
+        return other
+    return other.get_mask()
+
 # Sample
 if __name__ == "__main__":
     hand = Hand()
@@ -0,0 +1,446 @@
+"""
+Micro-benchmarks of the card and game-rule hot paths.
+
+Every benchmark builds its inputs from fixed seeds before it is timed, so two runs
+measure exactly the same work. Each one is timed with timeit in repeated rounds
+and the fastest round is reported as nanoseconds per operation, which is the
+figure least disturbed by other processes.
+
+Run as a module from the repository root:
+
+    python -m Backend.cardGroupings.benchmarks                  # print a table
+    python -m Backend.cardGroupings.benchmarks --json           # machine-readable results
+    python -m Backend.cardGroupings.benchmarks --save Backend/cardGroupings/benchmark_baseline.json
+    python -m Backend.cardGroupings.benchmarks --compare        # exit 1 on a regression
+
+--compare checks against benchmark_baseline.json next to this file unless
+--baseline names another file. Timings only compare on the same machine, so
+re-save the baseline where the comparison runs, and whenever a change makes a
+hot path faster on purpose.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from random import Random
+
+from Backend.GameEngine.Actions import Accusation, Suggestion
+from Backend.GameEngine.board import BoardGraph
+from Backend.GameEngine.deduction import Knowledge
+from Backend.GameEngine.disproval import DisprovalResolver, suggestion_mask
+from Backend.GameEngine.engine import GameEngine, GameState
+from Backend.GameEngine.paths import PathTable
+from Backend.GameEngine.planner import SuggestionPlanner
+from Backend.GameEngine.player_turn import Player_Turn
+from Backend.GameEngine.posterior import Posterior
+
+from .Card import Card
+from .Dealer import deal_game
+from .Deck import Deck
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+SEED = 20240917
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str, ops: int):
+    """
+    Register a benchmark.
+
+    The decorated function builds the inputs and returns a function without
+    arguments that does `ops` operations each time it is called.
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, ops)
+        return setup
+    return register
+
+
+@benchmark("card.construct", ops=21)
+def card_construct():
+    keys = [(card.get_name(), card.get_card_type()) for card in Card.ALL_CARDS]
+    return lambda: [Card(name, card_type) for name, card_type in keys]
+
+
+@benchmark("card.from_name", ops=21)
+def card_from_name():
+    names = [card.get_name() for card in Card.ALL_CARDS]
+    return lambda: [Card.from_name(name) for name in names]
+
+
+@benchmark("card.compare", ops=21 * 21)
+def card_compare():
+    cards = list(Card.ALL_CARDS)
+    return lambda: [a < b or a == b for a in cards for b in cards]
+
+
+@benchmark("card.sort", ops=1)
+def card_sort():
+    cards = list(Card.ALL_CARDS)
+    Random(SEED).shuffle(cards)
+    return lambda: sorted(cards)
+
+
+@benchmark("deck.shuffle", ops=1)
+def deck_shuffle():
+    deck = Deck(Random(SEED))
+    for card in Card.ALL_CARDS:
+        deck.add_card(card)
+    return deck.shuffle
+
+
+@benchmark("deck.build_and_deal", ops=21)
+def deck_build_and_deal():
+    rng = Random(SEED)
+
+    def build_and_deal():
+        deck = Deck(rng)
+        for card in Card.ALL_CARDS:
+            deck.add_card(card)
+        while len(deck):
+            deck.deal()
+    return build_and_deal
+
+
+@benchmark("hand.has_card", ops=21)
+def hand_has_card():
+    _, hands = deal_game(3, SEED)
+    hand = hands[0]
+    cards = Card.ALL_CARDS
+    return lambda: [hand.has_card(card) for card in cards]
+
+
+@benchmark("hand.sort_hand", ops=1)
+def hand_sort_hand():
+    _, hands = deal_game(3, SEED)
+    hand = hands[0]
+
+    def sort_hand():
+        hand.sort_hand()
+        return hand.get_hand()
+    return sort_hand
+
+
+@benchmark("hand.set_ops", ops=3)
+def hand_set_ops():
+    _, hands = deal_game(3, SEED)
+    a, b, c = hands
+    return lambda: ((a | b) - c).intersects(a)
+
+
+@benchmark("dealer.deal_game", ops=1)
+def dealer_deal_game():
+    return lambda: deal_game(6, SEED)
+
+
+def _game(n_players: int = 6) -> GameState:
+    return GameState(1, [f"player{seat}" for seat in range(n_players)], BoardGraph.standard(), game_seed=SEED)
+
+
+@benchmark("rules.suggestion_mask", ops=1)
+def rules_suggestion_mask():
+    return lambda: suggestion_mask("Colonel Mustard", "Rope", "Library")
+
+
+@benchmark("rules.disprove", ops=6)
+def rules_disprove():
+    game = _game()
+    masks = [suggestion_mask(suspect, weapon, room)
+             for suspect, weapon, room in zip(Card.VALID_SUSPECTS, Card.VALID_WEAPONS, Card.VALID_ROOMS)]
+    resolve = game.resolver.resolve
+    return lambda: [resolve(seat, mask) for seat, mask in enumerate(masks)]
+
+
+@benchmark("rules.suggestion", ops=1)
+def rules_suggestion():
+    game = _game()
+    player = game.players[0]
+    game.move_token(player, game.board.space_id("Library"))
+
+    def suggest():
+        action = Suggestion(player, Player_Turn(player))
+        action.create_suggestion("Colonel Mustard", "Rope", "Library")
+        action.validate(game)
+        return action.perform_action(game)
+    return suggest
+
+
+@benchmark("rules.accusation", ops=1)
+def rules_accusation():
+    game = _game()
+    player = game.players[0]
+    suspect, weapon, room = (card.get_name() for card in Card.from_mask(game.envelope))
+
+    def accuse():
+        action = Accusation(player, Player_Turn(player))
+        action.create_accusation(suspect, weapon, room)
+        action.validate(game)
+        result = action.perform_action(game)
+        game.active = True  # A correct accusation ends the game; reopen it for the next call
+        return result
+    return accuse
+
+
+@benchmark("rules.valid_actions", ops=1)
+def rules_valid_actions():
+    game = _game()
+    return lambda: game.player_turn.get_valid_actions(game)
+
+
+@benchmark("rules.view_for", ops=1)
+def rules_view_for():
+    game = _game()
+    return lambda: game.view_for("player0")
+
+
+@benchmark("paths.build", ops=1)
+def paths_build():
+    board = BoardGraph.standard()
+    return lambda: PathTable.build(board)
+
+
+@benchmark("paths.distances_to", ops=1)
+def paths_distances_to():
+    """Moves from every space to the nearest of three rooms, as the bots ask for a new set of rooms."""
+    board = BoardGraph.standard()
+    table = PathTable.build(board)
+    targets = sum(1 << board.space_id(room) for room in ("Kitchen", "Hall", "Library"))
+    return lambda: table.distances_to(targets)
+
+
+@benchmark("deduction.observe", ops=40)
+def deduction_observe():
+    """Seat 0's knowledge through 40 suggestions of a four player game, asking for the solution after each."""
+    game = _game(4)
+    rng = Random(SEED)
+    suggestions = []
+    for _ in range(40):
+        suggester = rng.randrange(4)
+        mask = suggestion_mask(rng.choice(Card.VALID_SUSPECTS), rng.choice(Card.VALID_WEAPONS),
+                               rng.choice(Card.VALID_ROOMS))
+        disprover, matching = game.resolver.resolve(suggester, mask)
+        shown = Card.from_mask(matching)[0] if suggester == 0 and matching else None
+        suggestions.append((suggester, mask, disprover, shown))
+    hand = game.players[0].playerHand
+
+    def observe():
+        knowledge = Knowledge(4)
+        knowledge.observe_hand(0, hand)
+        for suggestion in suggestions:
+            knowledge.observe_suggestion(*suggestion)
+            knowledge.solution()
+        return knowledge
+    return observe
+
+
+@benchmark("posterior.observe", ops=1000)
+def posterior_observe():
+    """One suggestion in each of 250 four player games, for all 1000 observers in one batched update."""
+    rng = Random(SEED)
+    seats, hands, suggesters, suggested, disprovers, shown = [], [], [], [], [], []
+    for _ in range(250):
+        dealt = [hand.get_mask() for hand in deal_game(4, rng.getrandbits(64))[1]]
+        suggester = rng.randrange(4)
+        mask = suggestion_mask(rng.choice(Card.VALID_SUSPECTS), rng.choice(Card.VALID_WEAPONS),
+                               rng.choice(Card.VALID_ROOMS))
+        disprover, matching = DisprovalResolver(dealt).resolve(suggester, mask)
+        for seat in range(4):
+            seats.append(seat)
+            hands.append(dealt[seat])
+            suggesters.append(suggester)
+            suggested.append(mask)
+            disprovers.append(-1 if disprover is None else disprover)
+            shown.append(matching & -matching if seat == suggester else 0)
+    posterior = Posterior(4, seats, hands)
+    start = posterior.weights.copy()
+
+    def observe():
+        posterior.weights[:] = start
+        posterior.observe_suggestion(None, suggesters, suggested, disprovers, shown)
+        return posterior.marginals()
+    return observe
+
+
+@benchmark("planner.choose", ops=100)
+def planner_choose():
+    """The most informative suggestion for 100 seats of four player games after 10 suggestions each, uncached."""
+    rng = Random(SEED)
+    decisions = []
+    for _ in range(25):
+        dealt = [hand.get_mask() for hand in deal_game(4, rng.getrandbits(64))[1]]
+        resolver = DisprovalResolver(dealt)
+        posterior = Posterior(4, range(4), dealt)
+        for _ in range(10):
+            suggester = rng.randrange(4)
+            mask = suggestion_mask(rng.choice(Card.VALID_SUSPECTS), rng.choice(Card.VALID_WEAPONS),
+                                   rng.choice(Card.VALID_ROOMS))
+            disprover, matching = resolver.resolve(suggester, mask)
+            posterior.observe_suggestion(None, suggester, mask, -1 if disprover is None else disprover,
+                                         [matching & -matching if seat == suggester else 0 for seat in range(4)])
+        decisions += [(posterior.weights[seat], dealt[seat], rng.choice(Card.VALID_ROOMS)) for seat in range(4)]
+
+    def choose():
+        planner = SuggestionPlanner()
+        return [planner.choose(*decision) for decision in decisions]
+    return choose
+
+
+@benchmark("engine.full_game", ops=1)
+def engine_full_game():
+    """A four player game, each player suggesting the first cards it has not seen and accusing once sure."""
+    board = BoardGraph.standard()
+    names = [f"player{seat}" for seat in range(4)]
+    type_masks = (Card.SUSPECT_MASK, Card.WEAPON_MASK, Card.ROOM_MASK)
+    rng = Random(SEED)
+
+    def first(mask):
+        return Card.ALL_CARDS[(mask & -mask).bit_length() - 1]
+
+    def play():
+        engine = GameEngine()
+        game = engine.start_game(1, names, board, game_seed=rng.getrandbits(32))
+        seen = [player.playerHand for player in game.players]
+        while game.active:
+            player = game.current_player()
+            name, seat = player.playerName, player.playerID
+            unseen = Card.ALL_MASK & ~seen[seat]
+            guess = [first(unseen & type_mask) for type_mask in type_masks]
+            if unseen.bit_count() == 3:
+                engine.accuse(1, name, *(card.get_name() for card in guess))
+                continue
+            moves = board.spaces_of(board.valid_moves(player.currLocation, game.occupied_hallways))
+            if moves:
+                engine.move(1, name, board.names[rng.choice(moves)])
+            if board.is_room(player.currLocation):
+                guess[2] = Card.from_name(board.names[player.currLocation])
+                result = engine.suggest(1, name, *(card.get_name() for card in guess))
+                if result['card'] is not None:
+                    seen[seat] |= Card.from_name(result['card']).get_mask()
+                else:
+                    for card, type_mask in zip(guess, type_masks):
+                        if card.get_mask() & unseen:
+                            seen[seat] |= type_mask & ~card.get_mask()
+            engine.end_turn(1, name)
+        return game
+    return play
+
+
+def run(names=None, repeat: int = 5, min_time: float = 0.1) -> dict:
+    """
+    Time the benchmarks.
+
+    Args:
+        names (list: str): Benchmarks to run, or None for all of them.
+        repeat (int): Timed rounds per benchmark; the fastest is kept.
+        min_time (float): Seconds each round lasts at least.
+
+    Returns:
+        dict: ns_per_op, ops and calls of each benchmark, by name.
+
+    Raises:
+        ValueError: If a benchmark name is unknown.
+    """
+    for name in names or ():
+        if name not in BENCHMARKS:
+            raise ValueError(f"{name} is not a benchmark.")
+    results = {}
+    for name in names or BENCHMARKS:
+        setup, ops = BENCHMARKS[name]
+        timer = timeit.Timer(setup())
+        calls, elapsed = timer.autorange()
+        calls = max(1, int(calls * min_time / elapsed))
+        best = min(timer.repeat(repeat=repeat, number=calls))
+        results[name] = {'ns_per_op': round(best / calls / ops * 1e9, 2), 'ops': ops, 'calls': calls}
+    return results
+
+
+def report(results: dict) -> dict:
+    """Wrap results with a description of the machine that produced them."""
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'seed': SEED,
+        'results': results,
+    }
+
+
+def compare(baseline: dict, results: dict, threshold: float = 0.25) -> list:
+    """
+    Compare results with a baseline report.
+
+    Args:
+        baseline (dict): A report saved with --save.
+        results (dict): Results of run().
+        threshold (float): Slowdown ratio tolerated before flagging, 0.25 for 25%.
+
+    Returns:
+        list: (name, baseline ns/op, current ns/op, ratio, regressed) for every
+        benchmark found in both.
+    """
+    rows = []
+    for name, current in results.items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        ratio = current['ns_per_op'] / before['ns_per_op']
+        rows.append((name, before['ns_per_op'], current['ns_per_op'], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time the card and game-rule hot paths.")
+    parser.add_argument("names", nargs="*", help="Benchmarks to run (default: all).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per benchmark.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    parser.add_argument("--save", metavar="FILE", help="Write the results to FILE as a baseline.")
+    parser.add_argument("--compare", action="store_true", help="Flag benchmarks slower than the baseline.")
+    parser.add_argument("--baseline", metavar="FILE", default=BASELINE,
+                        help="Baseline read by --compare (default: benchmark_baseline.json).")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Slowdown tolerated by --compare, as a ratio (default: 0.25).")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit.")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+    try:
+        results = run(args.names, repeat=args.repeat)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report(results), file, indent=2)
+            file.write("\n")
+
+    rows = None
+    if args.compare:
+        with open(args.baseline) as file:
+            rows = compare(json.load(file), results, args.threshold)
+
+    if args.json:
+        output = report(results)
+        if rows is not None:
+            output['comparison'] = [{'name': name, 'baseline_ns': before, 'ns': after,
+                                     'ratio': round(ratio, 3), 'regressed': regressed}
+                                    for name, before, after, ratio, regressed in rows]
+        print(json.dumps(output, indent=2))
+    elif rows is not None:
+        print(f"{'benchmark':<24}{'baseline ns':>14}{'ns/op':>12}{'ratio':>8}")
+        for name, before, after, ratio, regressed in rows:
+            print(f"{name:<24}{before:>14.1f}{after:>12.1f}{ratio:>8.2f}" + ("  REGRESSION" if regressed else ""))
+    else:
+        print(f"{'benchmark':<24}{'ns/op':>12}{'calls':>10}")
+        for name, result in results.items():
+            print(f"{name:<24}{result['ns_per_op']:>12.1f}{result['calls']:>10}")
+
+    return 1 if rows is not None and any(regressed for *_, regressed in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 # tests/test_card.py
 import pytest
-from Card import CardType, Card
+from Backend.cardGroupings.Card import CardType, Card
 
 @pytest.fixture
 def card():
@@ -41,4 +41,50 @@ def test_card_repr(card):
 
 def test_card_str(card):
     """Test the __str__ method."""
-    assert str(card) == f"name='{Card.VALID_SUSPECTS[2]}', card_type=CardType.SUSPECT"
\ No newline at end of file
+    assert str(card) == f"name='{Card.VALID_SUSPECTS[2]}', card_type=CardType.SUSPECT"
+
+def test_card_is_interned():
+    """Constructing the same card twice returns the registered instance."""
+    card1 = Card("Kitchen", CardType.ROOM)
+    card2 = Card("Kitchen", CardType.ROOM)
+    assert card1 is card2
+    assert Card.from_name("Kitchen") is card1
+
+def test_card_from_name_invalid():
+    with pytest.raises(ValueError, match="Knife is not a valid card."):
+        Card.from_name("Knife")
+
+def test_card_registry_ordinals():
+    """Every card has a unique ordinal that indexes Card.ALL_CARDS."""
+    assert len(Card.ALL_CARDS) == 21
+    for ordinal, card in enumerate(Card.ALL_CARDS):
+        assert card.get_ordinal() == ordinal
+        assert Card.from_ordinal(ordinal) is card
+    assert Card(Card.VALID_SUSPECTS[0], CardType.SUSPECT).get_ordinal() == 0
+    assert Card(Card.VALID_WEAPONS[0], CardType.WEAPON).get_ordinal() == 6
+    assert Card(Card.VALID_ROOMS[0], CardType.ROOM).get_ordinal() == 12
+
+def test_card_hashable():
+    """Cards can be used in sets and as dictionary keys."""
+    cards = {Card("Rope", CardType.WEAPON), Card("Rope", CardType.WEAPON), Card("Hall", CardType.ROOM)}
+    assert len(cards) == 2
+    owners = {Card("Rope", CardType.WEAPON): "Player1"}
+    assert owners[Card.from_name("Rope")] == "Player1"
+
+def test_card_has_no_dict():
+    with pytest.raises(AttributeError):
+        Card("Rope", CardType.WEAPON).extra = 1
+
+def test_card_sorting():
+    """Cards sort by card type value first, then by name."""
+    cards = sorted([Card("Rope", CardType.WEAPON), Card("Mr. Green", CardType.SUSPECT),
+                    Card("Study", CardType.ROOM), Card("Ballroom", CardType.ROOM)])
+    assert [card.get_name() for card in cards] == ["Ballroom", "Study", "Mr. Green", "Rope"]
+
+def test_card_copy_and_pickle_keep_identity():
+    import copy
+    import pickle
+    card = Card("Dagger", CardType.WEAPON)
+    assert copy.copy(card) is card
+    assert copy.deepcopy(card) is card
+    assert pickle.loads(pickle.dumps(card)) is card
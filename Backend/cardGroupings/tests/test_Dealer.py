@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from Backend.cardGroupings.Card import Card, CardType
+from Backend.cardGroupings.Dealer import deal_batch, deal_game, derive_seed, game_rng
+from Backend.cardGroupings.Hand import Hand
+
+@pytest.fixture
+def batch():
+    """Fixture to deal a small batch of four player games."""
+    return deal_batch(200, 4, np.random.default_rng(7))
+
+def test_batch_shapes(batch):
+    assert len(batch) == 200
+    assert batch.get_player_count() == 4
+    assert batch.envelopes.shape == (200,)
+    assert batch.hands.shape == (200, 4)
+
+def test_envelope_has_one_card_of_each_type(batch):
+    for game in range(len(batch)):
+        envelope = batch.get_envelope(game).get_hand()
+        assert [card.get_card_type() for card in envelope] == [CardType.SUSPECT, CardType.WEAPON, CardType.ROOM]
+
+def test_hands_partition_remaining_cards(batch):
+    for game in range(len(batch)):
+        hands = batch.hands[game]
+        assert int(np.bitwise_or.reduce(hands) | batch.envelopes[game]) == Card.ALL_MASK
+        assert int(hands.sum() + batch.envelopes[game]) == Card.ALL_MASK  # no overlaps
+        sizes = [int(mask).bit_count() for mask in hands]
+        assert max(sizes) - min(sizes) <= 1
+
+def test_deck_view_deals_the_same_hands(batch):
+    deck = batch.get_deck(5)
+    assert len(deck) == 18
+    hands = [[] for _ in range(batch.get_player_count())]
+    seat = 0
+    while len(deck):
+        hands[seat % len(hands)].append(deck.deal())
+        seat += 1
+    for seat, hand in enumerate(batch.get_hands(5)):
+        assert sorted(hands[seat]) == sorted(hand.get_hand())
+
+def test_invalid_player_count():
+    with pytest.raises(ValueError, match="7 is not a valid number of players."):
+        deal_batch(1, 7)
+
+def test_empty_batch():
+    assert len(deal_batch(0, 3)) == 0
+
+def test_same_seed_same_batch():
+    batch1 = deal_batch(50, 5, seed=1234)
+    batch2 = deal_batch(50, 5, seed=1234)
+    assert np.array_equal(batch1.envelopes, batch2.envelopes)
+    assert np.array_equal(batch1.hands, batch2.hands)
+
+def test_same_seed_same_game():
+    envelope1, hands1 = deal_game(4, game_seed=99)
+    envelope2, hands2 = deal_game(4, game_seed=99)
+    assert envelope1.get_mask() == envelope2.get_mask()
+    assert [hand.get_mask() for hand in hands1] == [hand.get_mask() for hand in hands2]
+
+def test_deal_game_partitions_cards():
+    envelope, hands = deal_game(3, game_seed="replay-17")
+    assert len(envelope) == 3
+    assert sum(len(hand) for hand in hands) == 18
+    assert Hand.from_mask(envelope.get_mask()).union(hands[0]).union(hands[1]).union(hands[2]).get_mask() == Card.ALL_MASK
+
+def test_derive_seed_is_stable():
+    assert derive_seed(42, 0) == derive_seed(42, 0)
+    assert derive_seed(42, 0) != derive_seed(42, 1)
+    assert derive_seed(42, 0) != derive_seed(43, 0)
+
+def test_game_rng_streams_are_independent():
+    rng1 = game_rng(5)
+    rng2 = game_rng(5)
+    first = rng1.random()
+    rng1.random()  # advancing one stream does not affect the other
+    assert rng2.random() == first
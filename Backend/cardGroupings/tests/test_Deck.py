@@ -1,6 +1,7 @@
 import pytest
-from Card import Card, CardType
-from Deck import Deck
+from random import Random
+from Backend.cardGroupings.Card import Card, CardType
+from Backend.cardGroupings.Deck import Deck
 
 @pytest.fixture
 def card_suspect():
@@ -71,4 +72,33 @@ def test_add_duplicate_card_to_deck(card_suspect):
     deck = Deck()
     deck.add_card(card_suspect)  # Add the card once
     with pytest.raises(ValueError, match=f"The card '{card_suspect.get_name()}' is already in the deck."):
-        deck.add_card(card_suspect)  # Attempt to add the same card again
\ No newline at end of file
+        deck.add_card(card_suspect)  # Attempt to add the same card again
+
+def test_deck_contains(card_suspect, card_room):
+    deck = Deck()
+    deck.add_card(card_suspect)
+    assert card_suspect in deck
+    assert card_room not in deck
+    assert deck.get_mask() == card_suspect.get_mask()
+
+def test_deck_mask_tracks_deal_and_remove(card_suspect, card_room, card_weapon):
+    deck = Deck()
+    deck.add_card(card_suspect)
+    deck.add_card(card_room)
+    deck.add_card(card_weapon)
+    deck.remove_card(card_room)
+    assert deck.get_mask() == card_suspect.get_mask() | card_weapon.get_mask()
+    dealt_card = deck.deal()
+    assert dealt_card not in deck
+    assert deck.get_mask() == card_suspect.get_mask()
+    assert len(deck) == 1
+
+def test_seeded_shuffle_is_reproducible():
+    orders = []
+    for _ in range(2):
+        deck = Deck(Random(2024))
+        for card in Card.ALL_CARDS:
+            deck.add_card(card)
+        deck.shuffle()
+        orders.append(list(deck.get_deck()))
+    assert orders[0] == orders[1]
@@ -1,6 +1,6 @@
 import pytest
-from Card import Card, CardType
-from Hand import Hand
+from Backend.cardGroupings.Card import Card, CardType
+from Backend.cardGroupings.Hand import Hand
 
 @pytest.fixture
 def card_suspect():
@@ -51,4 +51,39 @@ def test_add_duplicate_card_to_hand(card_weapon):
     hand = Hand()
     hand.add_card(card_weapon)  # Add the card once
     with pytest.raises(ValueError, match=f"The card '{card_weapon.get_name()}' is already in the hand."):
-        hand.add_card(card_weapon)  # Attempt to add the same card again
\ No newline at end of file
+        hand.add_card(card_weapon)  # Attempt to add the same card again
+
+def test_has_card(card_suspect, card_room):
+    hand = Hand()
+    hand.add_card(card_suspect)
+    assert hand.has_card(card_suspect)
+    assert not hand.has_card(card_room)
+    assert card_suspect in hand
+
+def test_hand_mask(card_suspect, card_weapon):
+    hand = Hand()
+    hand.add_card(card_suspect)
+    hand.add_card(card_weapon)
+    assert hand.get_mask() == card_suspect.get_mask() | card_weapon.get_mask()
+    assert Hand.from_mask(hand.get_mask()).get_hand() == [card_suspect, card_weapon]
+
+def test_sort_hand(card_suspect, card_weapon, card_room):
+    hand = Hand()
+    hand.add_card(card_weapon)
+    hand.add_card(card_suspect)
+    hand.add_card(card_room)
+    hand.sort_hand()
+    assert hand.get_hand() == sorted([card_suspect, card_weapon, card_room])
+
+def test_hand_set_operations(card_suspect, card_weapon, card_room):
+    hand1 = Hand([card_suspect, card_weapon])
+    hand2 = Hand([card_weapon, card_room])
+
+    assert (hand1 | hand2).get_hand() == [card_suspect, card_weapon, card_room]
+    assert (hand1 & hand2).get_hand() == [card_weapon]
+    assert (hand1 - hand2).get_hand() == [card_suspect]
+    assert hand1.union(hand2).count() == 3
+    assert hand1.intersection(hand2.get_mask()).count() == 1
+    assert hand1.intersects(hand2)
+    assert not hand1.difference(hand2).intersects(hand2)
+    assert len(hand1) == 2
@@ -0,0 +1,22 @@
+import pytest
+from Backend.cardGroupings.benchmarks import BENCHMARKS, compare, report, run
+
+def test_every_benchmark_runs():
+    for name, (setup, ops) in BENCHMARKS.items():
+        setup()()  # Should not raise an exception
+        assert ops > 0, name
+
+def test_run_selected_benchmarks():
+    results = run(["card.from_name", "rules.disprove"], repeat=1, min_time=0.001)
+    assert list(results) == ["card.from_name", "rules.disprove"]
+    assert all(result['ns_per_op'] > 0 for result in results.values())
+
+def test_unknown_benchmark():
+    with pytest.raises(ValueError, match="card.fly is not a benchmark."):
+        run(["card.fly"])
+
+def test_compare_flags_slowdowns_over_threshold():
+    baseline = report({'a': {'ns_per_op': 100.0}, 'b': {'ns_per_op': 100.0}, 'gone': {'ns_per_op': 1.0}})
+    rows = compare(baseline, {'a': {'ns_per_op': 120.0}, 'b': {'ns_per_op': 130.0}, 'new': {'ns_per_op': 5.0}},
+                   threshold=0.25)
+    assert [(name, regressed) for name, _, _, _, regressed in rows] == [('a', False), ('b', True)]
@@ -0,0 +1,212 @@
+import asyncio
+import itertools
+import json
+import time
+
+import aiohttp
+
+
+class AsyncClientIF():
+    """
+    Asynchronous client interface, for scripted players.
+
+    Follows the ClientIF API (register, login, createGame, joinGame, startGame and
+    the game actions) over an aiohttp session, so one process can run thousands of
+    clients on a single event loop. Instead of printing, each method returns the
+    server's JSON reply, and game actions raise ValueError with the reason the
+    server rejected them.
+
+    Attributes:
+        base_url (str): The base URL of the server.
+        ws_url (str): The base URL of the server's WebSockets.
+        game_id (int): The game the player's actions are sent to.
+        use_socket (bool): Send game actions as frames over the game socket, once it
+            is open, instead of HTTP requests.
+        timeout (float): Seconds to wait for the server to acknowledge a frame.
+        on_request (callable): Called with (endpoint, seconds, ok) after every
+            request and acknowledged frame.
+        on_notification (callable): Called with (message, received_at) for every
+            notification on the game socket; received_at is a time.perf_counter() value.
+    """
+
+    def __init__(self, base_url: str, connector: aiohttp.BaseConnector = None, use_socket: bool = True,
+                 timeout: float = 30.0, on_request=None, on_notification=None) -> None:
+        """
+        Initialize the client with the base URL.
+
+        Args:
+            base_url (str): The base URL of the server.
+            connector (aiohttp.BaseConnector): Connection pool shared with other clients.
+                Each client still keeps its own cookies and so its own login.
+        """
+        self.base_url = base_url.rstrip('/')
+        self.ws_url = 'ws' + self.base_url[len('http'):]
+        self.session = aiohttp.ClientSession(connector=connector, connector_owner=connector is None,
+                                             cookie_jar=aiohttp.CookieJar(unsafe=True))
+        self.is_logged_in = False
+        self.game_id = None
+        self.game_socket = None
+        self.use_socket = use_socket
+        self.timeout = timeout
+        self.on_request = on_request
+        self.on_notification = on_notification
+        self._request_ids = itertools.count(1)
+        self._pending = {}  # Request id -> future of the frames awaiting an ack
+        self._reader = None
+
+    async def register(self, username: str, password: str) -> dict:
+        """Register a new account. Returns the reply, which holds 'errors' if it was refused."""
+        _, body = await self._request('register', 'register', {
+            'username': username,
+            'password1': password,
+            'password2': password,
+        })
+        return body
+
+    async def login(self, username: str, password: str) -> dict:
+        """
+        Log in to the account.
+
+        Raises:
+            ValueError: If the credentials are refused.
+        """
+        status, body = await self._request('login', 'login', {'username': username, 'password': password})
+        if status >= 400:
+            raise ValueError(body.get('error', f"Login failed with status {status}."))
+        self.is_logged_in = True
+        return body
+
+    async def logout(self) -> dict:
+        _, body = await self._request('logout', 'logout', {})
+        self.is_logged_in = False
+        return body
+
+    async def createGame(self) -> dict:
+        _, body = await self._request('create_game', 'create_game', {})
+        return body
+
+    async def joinGame(self, key: str) -> dict:
+        _, body = await self._request('join_game', 'join_game', {'key': key})
+        return body
+
+    async def startGame(self, game_id: int, seed: int = None) -> dict:
+        """
+        Start a game and return the starting player's view of it.
+
+        Raises:
+            ValueError: If the game could not be started.
+        """
+        self.game_id = game_id
+        data = {'game_id': game_id}
+        if seed is not None:
+            data['seed'] = seed
+        return await self._checked('start_game', 'start_game', data)
+
+    async def gameState(self) -> dict:
+        """
+        Return this player's view of the game.
+
+        Raises:
+            ValueError: If the game is not live.
+        """
+        return await self._checked('game_state', f"games/{self.game_id}", None)
+
+    async def openGameSocket(self, game_id: int) -> None:
+        """Connect to ws/games/<game_id>/, which receives the game's notifications."""
+        self.game_id = game_id
+        start = time.perf_counter()
+        self.game_socket = await self.session.ws_connect(f"{self.ws_url}/ws/games/{game_id}/")
+        self._timed('game_socket', start, True)
+        self._reader = asyncio.ensure_future(self._read())
+
+    async def playerMove(self, room: str) -> dict:
+        return await self._gameAction('move', {'room': room}, 'player_move')
+
+    async def makeSuggestion(self, character: str, weapon: str, room: str) -> dict:
+        return await self._gameAction('suggestion', {'character': character, 'weapon': weapon, 'room': room},
+                                      'make_suggestion')
+
+    async def makeAccusation(self, character: str, weapon: str, room: str) -> dict:
+        return await self._gameAction('accusation', {'character': character, 'weapon': weapon, 'room': room},
+                                      'make_accusation')
+
+    async def EndTurn(self) -> dict:
+        return await self._gameAction('end_turn', {}, 'end_turn')
+
+    async def close(self) -> None:
+        """Close the game socket and the HTTP session."""
+        if self.game_socket is not None:
+            await self.game_socket.close()
+            await self._reader
+            self.game_socket = None
+        await self.session.close()
+
+    async def _gameAction(self, action: str, data: dict, path: str) -> dict:
+        """
+        Send a game action over the game socket if it is open, else as an HTTP POST.
+
+        Raises:
+            ValueError: If the server rejects the action.
+        """
+        if self.use_socket and self.game_socket is not None:
+            return await self._sendFrame(action, data)
+        return await self._checked(path, path, {'game_id': self.game_id, **data})
+
+    async def _sendFrame(self, action: str, data: dict) -> dict:
+        """Send an action frame and wait for the server's ack."""
+        request_id = next(self._request_ids)
+        reply = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = reply
+        start = time.perf_counter()
+        try:
+            await self.game_socket.send_str(json.dumps({'type': 'action', 'id': request_id,
+                                                        'action': action, 'data': data}))
+            frame = await asyncio.wait_for(reply, self.timeout)
+        except asyncio.TimeoutError:
+            self._timed(f"ws:{action}", start, False)
+            raise ValueError(f"No reply from the server to {action}.") from None
+        finally:
+            self._pending.pop(request_id, None)
+
+        self._timed(f"ws:{action}", start, frame['type'] == 'ack')
+        if frame['type'] == 'error':
+            raise ValueError(frame['error'])
+        return frame['result']
+
+    async def _read(self) -> None:
+        """Hand acks to the frames waiting for them and notifications to on_notification."""
+        async for message in self.game_socket:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                continue
+            received_at = time.perf_counter()
+            frame = json.loads(message.data)
+            if frame.get('type') in ('ack', 'error'):
+                reply = self._pending.get(frame.get('id'))
+                if reply is not None and not reply.done():
+                    reply.set_result(frame)
+            elif 'message' in frame and self.on_notification is not None:
+                self.on_notification(frame['message'], received_at)
+
+    async def _checked(self, endpoint: str, path: str, data: dict) -> dict:
+        status, body = await self._request(endpoint, path, data)
+        if status >= 400:
+            raise ValueError(body.get('error', f"{endpoint} failed with status {status}."))
+        return body
+
+    async def _request(self, endpoint: str, path: str, data: dict) -> tuple:
+        """POST the data to a path, or GET it when there is no data, and time the request."""
+        start = time.perf_counter()
+        method = 'GET' if data is None else 'POST'
+        async with self.session.request(method, f"{self.base_url}/{path}/", data=data) as response:
+            try:
+                body = await response.json(content_type=None)
+            except ValueError:
+                body = {}
+        self._timed(endpoint, start, response.status < 400)
+        if not isinstance(body, dict):
+            body = {}
+        return response.status, body
+
+    def _timed(self, endpoint: str, start: float, ok: bool) -> None:
+        if self.on_request is not None:
+            self.on_request(endpoint, time.perf_counter() - start, ok)
@@ -10,6 +10,7 @@ import json
 SERVER_IP = "127.0.0.1:8000"
 SERVER_URL = f"http://{SERVER_IP}"
 WS_URL = f"ws://{SERVER_IP}/ws/notifications/"
+GAME_WS_URL = f"ws://{SERVER_IP}/ws/games/{{}}/"
 
 class cmdClientIF(cmd.Cmd):
 
@@ -41,8 +42,21 @@ class cmdClientIF(cmd.Cmd):
                                     on_close=self.on_close)
         ws.run_forever()
 
+    def start_game_websocket(self, game_id):
+        # The game socket needs the session cookie so the server knows who is playing
+        cookie = "; ".join(f"{name}={value}" for name, value in self.client.session.cookies.items())
+        ws = websocket.WebSocketApp(GAME_WS_URL.format(game_id),
+                                    cookie=cookie,
+                                    on_open=lambda ws: self.client.useSocket(ws, game_id),
+                                    on_message=self.on_message,
+                                    on_error=self.on_error,
+                                    on_close=self.on_close)
+        ws.run_forever()
+
     def on_message(self, ws, message):
         data = json.loads(message)
+        if self.client.handleFrame(data):
+            return  # Reply to a game action, printed by the action itself
         print(f"\nNotification: {data['message']}")  # Print the notification message
         print(self.prompt, end='')  # Reprint the prompt after displaying the notification
 
@@ -91,17 +105,34 @@ class cmdClientIF(cmd.Cmd):
         """Leave a game lobby: leaveGame"""
         self.client.leaveGame()
 
-    def do_startGame(self, ws):
-        """Start a game: leaveGame"""
-        self.client.startGame()
+    def do_selectGame(self, arg):
+        """Choose the game your actions are sent to: selectGame <game_id>"""
+        self.client.selectGame(arg)
+
+    def do_startGame(self, arg):
+        """Start a game: startGame [game_id]"""
+        self.client.startGame(arg)
 
     def do_chooseCharacter(self, arg):
         """Choose a character: chooseCharacter <character_name>"""
         self.client.chooseCharacter(arg)
         
+    def do_useSocket(self, arg):
+        """Send game actions over the game's WebSocket: useSocket <game_id>"""
+        try:
+            game_id = int(arg)
+        except ValueError:
+            print("Error: Please provide a game id.")
+            return
+        threading.Thread(target=self.start_game_websocket, args=(game_id,), daemon=True).start()
+
+    def do_useHttp(self, arg):
+        """Send game actions as HTTP requests: useHttp"""
+        self.client.useHttp()
+
     def do_playerMove(self, arg):
         """Move your piece: playerMove <room>"""
-        self.client.chooseCharacter(arg)
+        self.client.playerMove(arg)
 
     def do_makeSuggestion(self, arg):
         """Make a suggestion: makeSuggestion <perpetrator> <weapon> <room>"""
@@ -113,7 +144,7 @@ class cmdClientIF(cmd.Cmd):
 
     def do_EndTurn(self, ws):
         """End your turn: endTurn"""
-        self.client.endTurn()
+        self.client.EndTurn(ws)
 
     def do_EndGameEarlyRequest(self):
         """End game early request: endGameEarly"""
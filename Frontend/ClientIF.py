@@ -1,3 +1,6 @@
+import itertools
+import json
+import threading
 import requests
 import uuid
 
@@ -12,6 +15,10 @@ class ClientIF():
         base_url (str): The base URL of the server.
         session (requests.Session): The HTTP session used for making requests.
         is_logged_in (bool): A flag indicating whether the user is logged in.
+        game_id (int): The game the player's actions are sent to.
+        game_socket (websocket.WebSocketApp): When set, game actions are sent as frames
+            over this socket instead of HTTP requests.
+        timeout (float): Seconds to wait for the server to acknowledge a frame.
     """
 
     def __init__(self, base_url: str) -> None:
@@ -24,6 +31,11 @@ class ClientIF():
         self.base_url = base_url
         self.session = requests.Session()  # Create a session for persistent connections
         self.is_logged_in = False  # Track login status
+        self.game_id = None
+        self.game_socket = None
+        self.timeout = 5.0
+        self._request_ids = itertools.count(1)
+        self._pending = {}  # Request id -> reply slot of the frames awaiting an ack
         print(f"Client IF: base URL: {base_url}")
 
     def setCookies(self, args: str) -> None:
@@ -132,7 +144,7 @@ class ClientIF():
         try:
             response = self.session.post(f"{self.base_url}/create_game/")
             response.raise_for_status()  # Raise an error for bad responses
-            print(response.json())
+            self._rememberGame(response.json())
 
         except requests.RequestException as e:
             print(f"Create game lobby failed: {e}")
@@ -157,7 +169,7 @@ class ClientIF():
 
             response = self.session.post(f"{self.base_url}/join_game/", data=data)
             response.raise_for_status()  # Raise an error for bad responses
-            print(response.json())
+            self._rememberGame(response.json())
 
         except ValueError:
             print("Error: Please provide a valid UUID key.")
@@ -179,15 +191,42 @@ class ClientIF():
         except requests.RequestException as e:
             print(f"Leave game lobby failed: {e}")
 
-    def startGame(self):
+    def selectGame(self, arg) -> None:
+        """
+        Choose the game that game actions are sent to.
+
+        Args:
+            arg (str): The game's id.
+        """
+        try:
+            self.game_id = int(arg)
+            print(f"Game {self.game_id} selected.")
+        except ValueError:
+            print("Error: Please provide a game id.")
+
+    def _rememberGame(self, body: dict) -> None:
+        """Print a lobby response and select the game it names, if any."""
+        print(body)
+        if body.get('game_id') is not None:
+            self.game_id = body['game_id']
+
+    def startGame(self, arg: str = "") -> None:
         """
         Starts a game.
 
+        Args:
+            arg (str): The game's id; the selected game when empty.
+
         Raises:
             RequestException: If the start game request fails.
         """
+        if arg:
+            self.selectGame(arg)
+        if self.game_id is None:
+            print("Start game failed: no game selected. Use selectGame <game_id> first.")
+            return
         try:
-            response = self.session.post(f"{self.base_url}/start_game/")
+            response = self.session.post(f"{self.base_url}/start_game/", data={'game_id': self.game_id})
             response.raise_for_status()  # Raise an error for bad responses
             print(response.json())
 
@@ -214,6 +253,87 @@ class ClientIF():
         except requests.RequestException as e:
             print(f"Choose character failed: {e}")
 
+    def useSocket(self, ws, game_id: int) -> None:
+        """
+        Send game actions over a game WebSocket instead of one HTTP request each.
+
+        Args:
+            ws (websocket.WebSocketApp): An open socket to ws/games/<game_id>/.
+            game_id (int): The game the socket belongs to.
+        """
+        self.game_socket = ws
+        self.game_id = game_id
+
+    def useHttp(self) -> None:
+        """Go back to sending game actions as HTTP requests."""
+        self.game_socket = None
+
+    def handleFrame(self, frame: dict) -> bool:
+        """
+        Hand an ack or error frame to the action waiting for it.
+
+        Args:
+            frame (dict): A frame received on the game socket.
+
+        Returns:
+            bool: True if the frame answered a pending action.
+        """
+        if frame.get('type') not in ('ack', 'error'):
+            return False
+        reply = self._pending.get(frame.get('id'))
+        if reply is None:
+            return False
+        reply['frame'] = frame
+        reply['received'].set()
+        return True
+
+    def _gameAction(self, action: str, data: dict, path: str, label: str) -> None:
+        """
+        Send a game action over the game socket if there is one, else as an HTTP POST.
+
+        Args:
+            action (str): The action name used in socket frames.
+            data (dict): The action's fields.
+            path (str): The URL path of the HTTP view for the action.
+            label (str): Describes the action in error messages.
+        """
+        if self.game_id is None:
+            print(f"{label} failed: no game selected. Use selectGame <game_id> first.")
+            return
+        if self.game_socket is not None:
+            self._sendFrame(action, data, label)
+            return
+
+        try:
+            response = self.session.post(f"{self.base_url}/{path}/", data={'game_id': self.game_id, **data})
+            response.raise_for_status()  # Raise an error for bad responses
+            print(response.json())
+
+        except requests.RequestException as e:
+            print(f"{label} failed: {e}")
+
+    def _sendFrame(self, action: str, data: dict, label: str) -> None:
+        """Send an action frame and wait for the server's ack."""
+        request_id = next(self._request_ids)
+        reply = {'received': threading.Event(), 'frame': None}
+        self._pending[request_id] = reply
+        try:
+            self.game_socket.send(json.dumps({'type': 'action', 'id': request_id, 'action': action, 'data': data}))
+            if not reply['received'].wait(self.timeout):
+                print(f"{label} failed: no reply from the server.")
+                return
+        except Exception as e:
+            print(f"{label} failed: {e}")
+            return
+        finally:
+            self._pending.pop(request_id, None)
+
+        frame = reply['frame']
+        if frame['type'] == 'ack':
+            print(frame['result'])
+        else:
+            print(f"{label} failed: {frame['error']}")
+
     def playerMove(self, arg):
         """
         Move a player token.
@@ -225,14 +345,8 @@ class ClientIF():
         data = {
                 'room': arg,
             }
-        
-        try:
-            response = self.session.post(f"{self.base_url}/player_move/", data=data)
-            response.raise_for_status()  # Raise an error for bad responses
-            print(response.json())
 
-        except requests.RequestException as e:
-            print(f"Player move failed: {e}")
+        self._gameAction('move', data, 'player_move', "Player move")
 
     def makeSuggestion(self, args):
         """
@@ -248,14 +362,8 @@ class ClientIF():
                 'weapon': weapon,
                 'room': room,
             }
-        
-        try:
-            response = self.session.post(f"{self.base_url}/make_suggestion/", data=data)
-            response.raise_for_status()  # Raise an error for bad responses
-            print(response.json())
 
-        except requests.RequestException as e:
-            print(f"Make suggestion failed: {e}")
+        self._gameAction('suggestion', data, 'make_suggestion', "Make suggestion")
 
     def makeAccusation(self, args):
         """
@@ -271,14 +379,8 @@ class ClientIF():
                 'weapon': weapon,
                 'room': room,
             }
-        
-        try:
-            response = self.session.post(f"{self.base_url}/make_accusation/", data=data)
-            response.raise_for_status()  # Raise an error for bad responses
-            print(response.json())
 
-        except requests.RequestException as e:
-            print(f"Make accusation failed: {e}")
+        self._gameAction('accusation', data, 'make_accusation', "Make accusation")
 
     def EndTurn(self, ws):
         """
@@ -287,13 +389,7 @@ class ClientIF():
         Raises:
             RequestException: If the end turn request fails.
         """
-        try:
-            response = self.session.post(f"{self.base_url}/end_turn/")
-            response.raise_for_status()  # Raise an error for bad responses
-            print(response.json())
-
-        except requests.RequestException as e:
-            print(f"End turn failed: {e}")
+        self._gameAction('end_turn', {}, 'end_turn', "End turn")
 
     def EndGameEarlyRequest(self, ws):
         """
@@ -9,18 +9,29 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 
 import os
 from django.core.asgi import get_asgi_application
-from channels.routing import ProtocolTypeRouter, URLRouter
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "clue_less.settings")
+
+# Set Django up before importing the consumers, which use the apps' models
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ChannelNameRouter, ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 from Backend.MessageTranslator import routing as message_routing# Import your app's routing file
+from Backend.GameManagement.consumers import ShardConsumer
+from Backend.GameManagement.sharding import shard_channel
+from django.conf import settings
 from channels.layers import get_channel_layer
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "clue_less.settings")
-
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
+    "http": django_asgi_app,
     "websocket": AuthMiddlewareStack(
         URLRouter(
             message_routing.websocket_urlpatterns  # Define WebSocket URLs in routing.py
         )
     ),
+    # Game calls forwarded to the shard a `runworker` process owns
+    "channel": ChannelNameRouter({
+        shard_channel(shard): ShardConsumer.as_asgi() for shard in range(settings.GAME_SHARDS)
+    }),
 })
\ No newline at end of file
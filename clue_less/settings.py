@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -50,6 +51,19 @@ CHANNEL_LAYERS = {
     },
 }
 
+# To run several daphne workers on one host, start `manage.py run_channel_broker`
+# and set CLUE_LESS_CHANNEL_BROKER to its socket path in every worker.
+CHANNEL_BROKER_PATH = os.environ.get('CLUE_LESS_CHANNEL_BROKER')
+if CHANNEL_BROKER_PATH:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'Backend.MessageTranslator.broker.BrokerChannelLayer',
+            'CONFIG': {
+                'path': CHANNEL_BROKER_PATH,
+            },
+        },
+    }
+
 #CHANNEL_LAYERS = {
 #    'default': {
 #        'BACKEND': 'channels_redis.core.RedisChannelLayer',
@@ -59,6 +73,13 @@ CHANNEL_LAYERS = {
 #    },
 #}
 
+# Live games are split across GAME_SHARDS shard processes by game id. A process
+# started with CLUE_LESS_SHARD=<n> (normally `manage.py runworker game-shard-<n>`)
+# owns shard n's games; processes without it, such as the daphne front-ends,
+# forward every game call. Sharding needs a channel layer shared by the processes.
+GAME_SHARDS = int(os.environ.get('CLUE_LESS_SHARDS', '1'))
+GAME_SHARD = int(os.environ['CLUE_LESS_SHARD']) if 'CLUE_LESS_SHARD' in os.environ else (0 if GAME_SHARDS == 1 else None)
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
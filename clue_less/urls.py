@@ -18,7 +18,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 from Backend.Authentication.views import RegisterView, LoginView, LogoutView
-from Backend.MessageTranslator.views import MessageView
+from Backend.MessageTranslator.views import MessageView, MessageBulkView
 from Backend.GameManagement.views import *
 
 urlpatterns = [
@@ -30,7 +30,9 @@ urlpatterns = [
     path('login/', LoginView.as_view(), name='login'),
     path('logout/', LogoutView.as_view(), name='logout'),
     path('messages/', MessageView.as_view(), name='messages'),
+    path('messages/bulk/', MessageBulkView.as_view(), name='messages_bulk'),
     path('games/', GameView.as_view(), name='games'),
+    path('games/<int:game_id>/', GameView.as_view(), name='game_state'),
     path('create_game/', CreateGameView.as_view(), name='create_game'),
     path('leave_game/', JoinGameView.as_view(), name='leave_game'),
     path('join_game/', LeaveGameView.as_view(), name='join_game'),